@@ -3,7 +3,7 @@ Provides a class for the Additional Participant Info Strings output
 by Project CARS
 """
 
-from hashlib import md5
+from struct import Struct
 
 from replayenhancer.Packet import Packet
 
@@ -16,38 +16,28 @@ class AdditionalParticipantPacket(Packet):
     The additional participant info string packet has a length of
     1028, and is packet type 2.
     """
+    __slots__ = (
+        'build_version_number', 'offset', 'name')
+
     def __init__(self, packet_data):
-        self.data_hash = md5(packet_data).hexdigest()
+        self._packet_data = packet_data
         unpacked_data = self._unpack_data(packet_data)
 
-        try:
-            self.build_version_number = int(unpacked_data.popleft())
-
-            self._test_packet_type(unpacked_data.popleft())
+        self.build_version_number = unpacked_data[0]
 
-            self.offset = int(unpacked_data.popleft())
+        self._test_packet_type(unpacked_data[1])
 
-            self.name = list()
-            for _ in range(16):
-                self.name.append(
-                    str(
-                        unpacked_data.popleft(),
-                        encoding='utf-8',
-                        errors='strict').split('\x00', 1)[0])
+        self.offset = unpacked_data[2]
 
-        except ValueError:
-            raise
+        self.name = tuple(
+            self._unpack_string(string_data)
+            for string_data in unpacked_data[3:19])
 
     @property
     def packet_type(self):
         return 2
 
-    @property
-    def _packet_string(self):
-        packet_string = "HBB"
-        packet_string += "64s"*16
-
-        return packet_string
+    _packet_struct = Struct("HBB" + "64s"*16)
 
     def __str__(self):
         return "AdditionalParticipantPacket"
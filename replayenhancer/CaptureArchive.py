@@ -0,0 +1,285 @@
+"""
+Provides reading and writing of compressed capture archives for the
+UDP telemetry packets output by Project CARS.
+
+An archive is a file header, a series of independently compressed
+chunks and a chunk table. Each chunk holds a run of consecutive
+packets stored as capture log records (a length prefix, the time the
+packet was received and the payload). Consecutive packets differ in
+only a few bytes, so chunks compress well, and because each chunk can
+be decompressed on its own a reader only decompresses the chunks
+holding the packets it needs.
+"""
+import lzma
+import os
+import time
+import zlib
+from bisect import bisect_right
+from collections import namedtuple
+from struct import Struct
+
+CAPTURE_ARCHIVE_FILENAME = 'capture.archive'
+
+COMPRESSION = {'zlib': 0, 'lzma': 1}
+
+_FILE_HEADER = Struct('<8sHBQ')
+_MAGIC = b'PCREARC\x00'
+_VERSION = 1
+
+_TABLE_HEADER = Struct('<I')
+_CHUNK_ENTRY = Struct('<QIII')
+_RECORD_HEADER = Struct('<Id')
+
+_COMPRESSORS = {
+    0: zlib.compress,
+    1: lzma.compress}
+_DECOMPRESSORS = {
+    0: zlib.decompress,
+    1: lzma.decompress}
+
+ChunkEntry = namedtuple('ChunkEntry', [
+    'offset',
+    'size',
+    'first_sequence',
+    'packet_count'])
+
+
+def is_capture_archive(filename):
+    """Determines if a file is a capture archive."""
+    try:
+        with open(filename, 'rb') as archive_file:
+            header = archive_file.read(_FILE_HEADER.size)
+    except (IsADirectoryError, FileNotFoundError, PermissionError):
+        return False
+
+    return len(header) == _FILE_HEADER.size \
+        and _FILE_HEADER.unpack(header)[0] == _MAGIC
+
+
+def find_capture_archive(path):
+    """
+    Returns the capture archive for a path, or None if the path does
+    not hold one.
+
+    The path may name the archive itself, or a capture directory that
+    contains an archive named `CAPTURE_ARCHIVE_FILENAME`.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, CAPTURE_ARCHIVE_FILENAME)
+
+    return path if is_capture_archive(path) else None
+
+
+class CaptureArchiveReader:
+    """
+    Reads the packets stored in a capture archive.
+
+    The most recently decompressed chunk is kept, so reading packets
+    in order decompresses each chunk once.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the capture archive.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+        with open(self.filename, 'rb') as archive_file:
+            header = archive_file.read(_FILE_HEADER.size)
+            if len(header) != _FILE_HEADER.size:
+                raise ValueError("Capture archive header is truncated.")
+
+            magic, version, self.compression, table_offset = \
+                _FILE_HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError("File is not a capture archive.")
+            if version != _VERSION:
+                raise ValueError(
+                    "Unsupported capture archive version {}.".format(
+                        version))
+            if self.compression not in _DECOMPRESSORS:
+                raise ValueError(
+                    "Unsupported capture archive compression {}.".format(
+                        self.compression))
+            if table_offset == 0:
+                raise ValueError("Capture archive is incomplete.")
+
+            archive_file.seek(table_offset)
+            count, = _TABLE_HEADER.unpack(
+                archive_file.read(_TABLE_HEADER.size))
+            table = archive_file.read(count * _CHUNK_ENTRY.size)
+            if len(table) != count * _CHUNK_ENTRY.size:
+                raise ValueError("Capture archive chunk table is truncated.")
+
+        self.chunks = [
+            ChunkEntry(*_CHUNK_ENTRY.unpack_from(table, offset))
+            for offset in range(0, len(table), _CHUNK_ENTRY.size)]
+        self._first_sequences = [chunk.first_sequence for chunk in self.chunks]
+
+        self._file = None
+        self._cached_chunk = None
+        self._cached_records = None
+
+    def __del__(self):
+        self.close()
+
+    def __iter__(self):
+        return self.packets()
+
+    def __len__(self):
+        return sum(chunk.packet_count for chunk in self.chunks)
+
+    def chunk(self, number):
+        """
+        Returns the (timestamp, payload) tuples of the packets held in
+        a chunk.
+        """
+        if number != self._cached_chunk:
+            entry = self.chunks[number]
+            if self._file is None:
+                self._file = open(self.filename, 'rb')
+            self._file.seek(entry.offset)
+            data = _DECOMPRESSORS[self.compression](
+                self._file.read(entry.size))
+
+            records = list()
+            offset = 0
+            for _ in range(entry.packet_count):
+                length, timestamp = _RECORD_HEADER.unpack_from(data, offset)
+                offset += _RECORD_HEADER.size
+                records.append((timestamp, data[offset:offset+length]))
+                offset += length
+
+            self._cached_chunk = number
+            self._cached_records = records
+
+        return self._cached_records
+
+    def chunk_number(self, sequence):
+        """Returns the number of the chunk holding a packet."""
+        if not 0 <= sequence < len(self):
+            raise IndexError("Packet {} is not in the archive.".format(
+                sequence))
+        return bisect_right(self._first_sequences, sequence) - 1
+
+    def packet(self, sequence):
+        """Returns the payload of a single packet."""
+        number = self.chunk_number(sequence)
+        return self.chunk(number)[
+            sequence - self.chunks[number].first_sequence][1]
+
+    def packets(self, *, reverse=False):
+        """
+        Yields packet payloads in capture order, or reverse capture
+        order if requested.
+        """
+        if reverse:
+            for number in reversed(range(len(self.chunks))):
+                for _, payload in reversed(self.chunk(number)):
+                    yield payload
+        else:
+            for _, payload in self.timed_packets():
+                yield payload
+
+    def timed_packets(self):
+        """Yields (timestamp, payload) tuples in capture order."""
+        for number in range(len(self.chunks)):
+            yield from self.chunk(number)
+
+    def close(self):
+        """Closes the archive if it was opened for reading chunks."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CaptureArchiveWriter:
+    """
+    Writes packets to a new capture archive.
+
+    The archive is only readable once closed, when the chunk table is
+    written.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the capture archive.
+    compression : str
+        Compression used for the chunks, 'zlib' or 'lzma'.
+    chunk_packets : int
+        Number of packets stored in each chunk.
+    """
+    def __init__(self, filename, *, compression='zlib', chunk_packets=256):
+        if compression not in COMPRESSION:
+            raise ValueError(
+                "Unsupported compression {}.".format(compression))
+
+        self.filename = filename
+        self.compression = COMPRESSION[compression]
+        self.chunk_packets = chunk_packets
+        self.packet_count = 0
+
+        self._chunks = list()
+        self._pending = bytearray()
+        self._pending_count = 0
+
+        self._file = open(self.filename, 'wb')
+        self._file.write(_FILE_HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            self.compression,
+            0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def write(self, packet_data, timestamp=None):
+        """Adds a packet to the archive."""
+        if timestamp is None:
+            timestamp = time.time()
+
+        self._pending += _RECORD_HEADER.pack(len(packet_data), timestamp)
+        self._pending += packet_data
+        self._pending_count += 1
+        self.packet_count += 1
+
+        if self._pending_count == self.chunk_packets:
+            self._write_chunk()
+
+    def close(self):
+        """Writes the last chunk and the chunk table, and closes."""
+        if self._file is None:
+            return
+
+        if self._pending_count:
+            self._write_chunk()
+
+        table_offset = self._file.tell()
+        self._file.write(_TABLE_HEADER.pack(len(self._chunks)))
+        for chunk in self._chunks:
+            self._file.write(_CHUNK_ENTRY.pack(*chunk))
+
+        self._file.seek(0)
+        self._file.write(_FILE_HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            self.compression,
+            table_offset))
+        self._file.close()
+        self._file = None
+
+    def _write_chunk(self):
+        data = _COMPRESSORS[self.compression](bytes(self._pending))
+        self._chunks.append(ChunkEntry(
+            self._file.tell(),
+            len(data),
+            self.packet_count - self._pending_count,
+            self._pending_count))
+        self._file.write(data)
+
+        self._pending = bytearray()
+        self._pending_count = 0
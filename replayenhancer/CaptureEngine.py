@@ -0,0 +1,190 @@
+"""
+Provides a capture engine that decouples receiving UDP telemetry
+packets from writing them to disk.
+
+A receive thread does nothing but copy datagrams into a preallocated
+ring buffer. A writer thread drains the ring buffer in batches, so a
+stalled disk fills the ring buffer instead of the kernel socket
+buffer. If the ring buffer itself fills, packets are dropped and
+counted rather than blocking the receive thread.
+"""
+import socket
+import threading
+import time
+
+
+class CaptureEngine:
+    """
+    Receives packets from a socket and hands them to a writer.
+
+    Parameters
+    ----------
+    udp_socket : socket.socket
+        Bound socket to receive packets from.
+    writer
+        Object with a `write(packet_data, timestamp)` method that
+        stores a packet. If it has a `flush()` method, it is called
+        after each batch.
+    slots : int
+        Number of packets the ring buffer holds.
+    slot_size : int
+        Size of each ring buffer slot. Larger datagrams are truncated.
+    batch_size : int
+        Number of packets the writer thread waits for before writing,
+        unless `flush_interval` passes first.
+    flush_interval : float
+        Longest time, in seconds, a packet waits in the ring buffer.
+    stats : CaptureStats, optional
+        Statistics to record each written packet in.
+    descriptor : DescriptorWriter, optional
+        Descriptor to track the race boundaries of each written packet.
+    """
+    def __init__(self, udp_socket, writer, *, slots=4096, slot_size=2048,
+                 batch_size=64, flush_interval=0.25, stats=None,
+                 descriptor=None):
+        self._socket = udp_socket
+        self._writer = writer
+        self._stats = stats
+        self._descriptor = descriptor
+
+        self.slots = slots
+        self._slot_size = slot_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+        self._buffer = memoryview(bytearray(slots * slot_size))
+        self._scratch = bytearray(slot_size)
+        self._lengths = [0] * slots
+        self._timestamps = [0.0] * slots
+
+        # _head is only advanced by the receive thread, _tail only by
+        # the writer thread; both are read under the condition.
+        self._head = 0
+        self._tail = 0
+        self._condition = threading.Condition()
+
+        self._running = False
+        self._receive_thread = None
+        self._writer_thread = None
+
+        self.packets_received = 0
+        self.packets_written = 0
+        self.high_water_mark = 0
+        self.overflows = 0
+
+    @property
+    def buffered(self):
+        """Number of packets waiting in the ring buffer."""
+        with self._condition:
+            return self._head - self._tail
+
+    def receive(self):
+        """
+        Receives a single packet into the ring buffer.
+
+        Returns True if the packet was buffered, False if it was
+        dropped because the ring buffer is full.
+        """
+        with self._condition:
+            full = self._head - self._tail >= self.slots
+            slot = self._head % self.slots
+
+        if full:
+            self._socket.recv_into(self._scratch)
+            self.packets_received += 1
+            self.overflows += 1
+            return False
+
+        start = slot * self._slot_size
+        self._lengths[slot] = self._socket.recv_into(
+            self._buffer[start:start + self._slot_size])
+        self._timestamps[slot] = time.time()
+        self.packets_received += 1
+
+        with self._condition:
+            self._head += 1
+            self.high_water_mark = max(
+                self.high_water_mark,
+                self._head - self._tail)
+            if self._head - self._tail >= self._batch_size:
+                self._condition.notify()
+
+        return True
+
+    def flush(self):
+        """Writes every packet currently in the ring buffer."""
+        with self._condition:
+            head = self._head
+        tail = self._tail
+
+        while tail < head:
+            slot = tail % self.slots
+            start = slot * self._slot_size
+            packet_data = self._buffer[start:start + self._lengths[slot]]
+            self._writer.write(packet_data, self._timestamps[slot])
+            if self._descriptor is not None:
+                self._descriptor.write(packet_data)
+            if self._stats is not None:
+                self._stats.record(
+                    self._lengths[slot],
+                    self._timestamps[slot])
+            tail += 1
+            self.packets_written += 1
+
+            # Release slots batch by batch so the receive thread is
+            # never starved while a long backlog is written.
+            if tail % self._batch_size == 0:
+                with self._condition:
+                    self._tail = tail
+
+        with self._condition:
+            self._tail = tail
+
+        try:
+            self._writer.flush()
+        except AttributeError:
+            pass
+
+    def start(self):
+        """Starts the receive and writer threads."""
+        self._running = True
+        self._socket.settimeout(self._flush_interval)
+
+        self._receive_thread = threading.Thread(
+            target=self._receive_loop,
+            name="CaptureEngine receive",
+            daemon=True)
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name="CaptureEngine writer",
+            daemon=True)
+        self._writer_thread.start()
+        self._receive_thread.start()
+
+    def stop(self):
+        """Stops the threads and writes any packets still buffered."""
+        self._running = False
+        with self._condition:
+            self._condition.notify()
+
+        for thread in (self._receive_thread, self._writer_thread):
+            if thread is not None:
+                thread.join()
+
+        self.flush()
+
+    def _receive_loop(self):
+        while self._running:
+            try:
+                self.receive()
+            except socket.timeout:
+                pass
+
+    def _writer_loop(self):
+        while self._running:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._running
+                    or self._head - self._tail >= self._batch_size,
+                    timeout=self._flush_interval)
+            self.flush()
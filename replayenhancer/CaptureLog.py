@@ -0,0 +1,214 @@
+"""
+Provides reading and writing of single-file capture logs for the
+UDP telemetry packets output by Project CARS.
+
+A capture log is a file header followed by one record per packet.
+Each record is a length prefix, the time the packet was received and
+the packet payload. Records are only ever appended; a record torn by
+an interrupted capture is discarded by the reader and truncated away
+the next time the log is opened for writing.
+"""
+import mmap
+import os
+import time
+from struct import Struct
+
+CAPTURE_LOG_FILENAME = 'capture.log'
+
+_FILE_HEADER = Struct('<8sH')
+_MAGIC = b'PCRELOG\x00'
+_VERSION = 1
+
+_RECORD_HEADER = Struct('<Id')
+
+
+def is_capture_log(filename):
+    """Determines if a file is a capture log."""
+    try:
+        with open(filename, 'rb') as log_file:
+            header = log_file.read(_FILE_HEADER.size)
+    except (IsADirectoryError, FileNotFoundError, PermissionError):
+        return False
+
+    return len(header) == _FILE_HEADER.size \
+        and _FILE_HEADER.unpack(header)[0] == _MAGIC
+
+
+def find_capture_log(path):
+    """
+    Returns the capture log for a path, or None if the path does not
+    hold one.
+
+    The path may name the log itself, or a capture directory that
+    contains a log named `CAPTURE_LOG_FILENAME`.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, CAPTURE_LOG_FILENAME)
+
+    return path if is_capture_log(path) else None
+
+
+class CaptureLogReader:
+    """
+    Reads the packets stored in a capture log.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the capture log.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+        with open(self.filename, 'rb') as log_file:
+            self._check_header(log_file)
+
+    def __iter__(self):
+        return self.packets()
+
+    def __len__(self):
+        return sum(1 for _ in self.records())
+
+    def packets(self, *, reverse=False):
+        """
+        Yields packet payloads in capture order, or reverse capture
+        order if requested.
+        """
+        with open(self.filename, 'rb') as log_file:
+            if reverse:
+                for offset, length, _ in reversed(list(self.records())):
+                    log_file.seek(offset)
+                    yield log_file.read(length)
+            else:
+                for _, _, _, payload in self._read_records(log_file):
+                    yield payload
+
+    def timed_packets(self):
+        """Yields (timestamp, payload) tuples in capture order."""
+        with open(self.filename, 'rb') as log_file:
+            for _, _, timestamp, payload in self._read_records(log_file):
+                yield timestamp, payload
+
+    def payload_records(self):
+        """
+        Yields (offset, length, timestamp, payload) tuples for each
+        complete record, reading the log sequentially.
+        """
+        with open(self.filename, 'rb') as log_file:
+            yield from self._read_records(log_file)
+
+    def records(self, start=None):
+        """
+        Yields (offset, length, timestamp) tuples describing each
+        complete record, where offset is the position of the payload
+        within the file.
+
+        If `start` is the offset of a record, as yielded, the records
+        from that one on are yielded without reading those before it.
+        """
+        with open(self.filename, 'rb') as log_file:
+            offset = self._check_header(log_file)
+            if start is not None:
+                offset = start - _RECORD_HEADER.size
+            size = os.fstat(log_file.fileno()).st_size
+            if offset + _RECORD_HEADER.size > size:
+                return
+
+            # The record headers are read from a mapping of the log, so
+            # payloads are skipped without being read.
+            with mmap.mmap(
+                    log_file.fileno(),
+                    size,
+                    access=mmap.ACCESS_READ) as log_data:
+                while offset + _RECORD_HEADER.size <= size:
+                    length, timestamp = _RECORD_HEADER.unpack_from(
+                        log_data,
+                        offset)
+                    offset += _RECORD_HEADER.size
+                    if offset + length > size:
+                        break
+                    yield offset, length, timestamp
+                    offset += length
+
+    @staticmethod
+    def _check_header(log_file):
+        header = log_file.read(_FILE_HEADER.size)
+        if len(header) != _FILE_HEADER.size:
+            raise ValueError("Capture log header is truncated.")
+
+        magic, version = _FILE_HEADER.unpack(header)
+        if magic != _MAGIC:
+            raise ValueError("File is not a capture log.")
+        if version != _VERSION:
+            raise ValueError(
+                "Unsupported capture log version {}.".format(version))
+
+        return _FILE_HEADER.size
+
+    @classmethod
+    def _read_records(cls, log_file):
+        offset = cls._check_header(log_file)
+        while True:
+            header = log_file.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+
+            length, timestamp = _RECORD_HEADER.unpack(header)
+            offset += _RECORD_HEADER.size
+            payload = log_file.read(length)
+            if len(payload) < length:
+                return
+
+            yield offset, length, timestamp, payload
+            offset += length
+
+
+class CaptureLogWriter:
+    """
+    Appends packets to a capture log, creating it if needed.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the capture log.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.packet_count = 0
+
+        if os.path.exists(self.filename):
+            end = 0
+            for offset, length, _ in CaptureLogReader(
+                    self.filename).records():
+                end = offset + length
+                self.packet_count += 1
+
+            self._file = open(self.filename, 'r+b')
+            self._file.truncate(max(end, _FILE_HEADER.size))
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(self.filename, 'wb')
+            self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def write(self, packet_data, timestamp=None):
+        """Appends a packet to the log."""
+        if timestamp is None:
+            timestamp = time.time()
+
+        self._file.write(_RECORD_HEADER.pack(len(packet_data), timestamp))
+        self._file.write(packet_data)
+        self.packet_count += 1
+
+    def flush(self):
+        """Flushes written packets to the operating system."""
+        self._file.flush()
+
+    def close(self):
+        """Closes the log."""
+        self._file.close()
@@ -0,0 +1,162 @@
+"""
+Provides packet-loss and throughput statistics for a live telemetry
+capture.
+"""
+import threading
+
+PACKET_TYPES = {
+    1367: 'telemetry',
+    1347: 'participant',
+    1028: 'additional_participant'}
+
+
+class CaptureStats:
+    """
+    Accumulates statistics for the packets of a capture.
+
+    Packets are classified by length. Gaps are intervals between
+    consecutive packets, by receive time, longer than `gap_threshold`
+    seconds; Project CARS broadcasts continuously, so a gap means lost
+    packets or a stalled broadcast.
+
+    Parameters
+    ----------
+    gap_threshold : float
+        Shortest interval between packets, in seconds, counted as a gap.
+    """
+    _max_gaps = 100
+
+    def __init__(self, gap_threshold=0.5):
+        self.gap_threshold = gap_threshold
+
+        self._lock = threading.Lock()
+
+        self.packets = 0
+        self.bytes = 0
+        self.packet_counts = dict.fromkeys(
+            list(PACKET_TYPES.values()) + ['unknown'], 0)
+        self.byte_counts = dict.fromkeys(self.packet_counts, 0)
+
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.gaps = list()
+        self.gap_count = 0
+        self.gap_time = 0.0
+        self.longest_gap = 0.0
+
+        self._window_time = None
+        self._window_packets = dict(self.packet_counts)
+        self._window_bytes = 0
+
+    def record(self, length, timestamp):
+        """Records a packet of the given length and receive time."""
+        packet_type = PACKET_TYPES.get(length, 'unknown')
+
+        with self._lock:
+            self.packets += 1
+            self.bytes += length
+            self.packet_counts[packet_type] += 1
+            self.byte_counts[packet_type] += length
+
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            else:
+                interval = timestamp - self.last_timestamp
+                if interval > self.gap_threshold:
+                    self.gap_count += 1
+                    self.gap_time += interval
+                    self.longest_gap = max(self.longest_gap, interval)
+                    if len(self.gaps) < self._max_gaps:
+                        self.gaps.append((
+                            self.last_timestamp - self.first_timestamp,
+                            interval))
+            self.last_timestamp = timestamp
+
+    def rates(self, now):
+        """
+        Returns packets per second for each packet type and bytes per
+        second since the previous call, as a (dict, float) tuple.
+        """
+        with self._lock:
+            if self._window_time is None or now <= self._window_time:
+                elapsed = None
+            else:
+                elapsed = now - self._window_time
+
+            packet_rates = {
+                packet_type: 0.0 if elapsed is None else
+                (count - self._window_packets[packet_type]) / elapsed
+                for packet_type, count in self.packet_counts.items()}
+            byte_rate = 0.0 if elapsed is None \
+                else (self.bytes - self._window_bytes) / elapsed
+
+            self._window_time = now
+            self._window_packets = dict(self.packet_counts)
+            self._window_bytes = self.bytes
+
+        return packet_rates, byte_rate
+
+    def status_line(self, now, engine=None):
+        """
+        Returns a one-line status of the capture, with rates measured
+        since the previous call.
+        """
+        packet_rates, byte_rate = self.rates(now)
+        status = "{} packets | telemetry {:.1f}/s, participant {:.1f}/s, " \
+            "additional {:.1f}/s | {:.1f} KB/s | {} gaps".format(
+                self.packets,
+                packet_rates['telemetry'],
+                packet_rates['participant'],
+                packet_rates['additional_participant'],
+                byte_rate / 1024,
+                self.gap_count)
+        if packet_rates['unknown']:
+            status += " | unknown {:.1f}/s".format(packet_rates['unknown'])
+        if engine is not None:
+            status += " | ring {}/{}, {} overflows".format(
+                engine.buffered,
+                engine.slots,
+                engine.overflows)
+
+        return status
+
+    def summary(self, engine=None):
+        """Returns a summary of the capture, suitable for JSON."""
+        with self._lock:
+            duration = 0.0 if self.first_timestamp is None \
+                else self.last_timestamp - self.first_timestamp
+
+            summary = {
+                'packets': self.packets,
+                'bytes': self.bytes,
+                'start_time': self.first_timestamp,
+                'end_time': self.last_timestamp,
+                'duration': duration,
+                'bytes_per_second':
+                    self.bytes / duration if duration else None,
+                'packet_types': {
+                    packet_type: {
+                        'packets': self.packet_counts[packet_type],
+                        'bytes': self.byte_counts[packet_type],
+                        'packets_per_second':
+                            self.packet_counts[packet_type] / duration
+                            if duration else None}
+                    for packet_type in self.packet_counts},
+                'gaps': {
+                    'threshold': self.gap_threshold,
+                    'count': self.gap_count,
+                    'total_time': self.gap_time,
+                    'longest': self.longest_gap,
+                    'first_gaps': [
+                        {'offset': offset, 'duration': interval}
+                        for offset, interval in self.gaps]}}
+
+        if engine is not None:
+            summary['ring_buffer'] = {
+                'slots': engine.slots,
+                'high_water_mark': engine.high_water_mark,
+                'overflows': engine.overflows}
+            summary['packets_received'] = engine.packets_received
+            summary['packets_written'] = engine.packets_written
+
+        return summary
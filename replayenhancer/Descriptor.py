@@ -0,0 +1,77 @@
+"""
+Provides reading and writing of telemetry descriptors.
+
+A descriptor records the boundaries of the last complete race in a
+capture: the packet before the green flag (race_start), the last
+packet of racing (race_finish) and the end of the race results
+(race_end).
+
+Version 2 descriptors identify each boundary packet by its sequence
+number within the capture, with a CRC-32 checksum of its data so a
+descriptor that no longer matches its capture can be detected. Version
+1 descriptors identify packets by the md5 hash of their data; they are
+still read, and TelemetryData migrates them to version 2.
+"""
+import json
+import os
+from zlib import crc32
+
+DESCRIPTOR_VERSION = 2
+
+BOUNDARIES = ('race_end', 'race_finish', 'race_start')
+
+
+def packet_checksum(packet_data):
+    """Returns the checksum of a packet."""
+    return crc32(packet_data)
+
+
+def make_descriptor(boundaries):
+    """
+    Returns a version 2 descriptor.
+
+    Parameters
+    ----------
+    boundaries : dict
+        (sequence, checksum) tuples keyed by boundary name. The
+        checksum may be None.
+    """
+    descriptor = {'version': DESCRIPTOR_VERSION}
+    for name in BOUNDARIES:
+        sequence, checksum = boundaries[name]
+        descriptor[name] = {'sequence': sequence}
+        if checksum is not None:
+            descriptor[name]['checksum'] = checksum
+
+    return descriptor
+
+
+def descriptor_version(descriptor):
+    """Returns the version of a descriptor."""
+    return descriptor.get('version', 1)
+
+
+def load_descriptor(filename):
+    """
+    Returns the descriptor stored in a file, or None if it is missing
+    or unreadable.
+    """
+    try:
+        with open(filename) as descriptor_file:
+            descriptor = json.load(descriptor_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if not isinstance(descriptor, dict) \
+            or any(name not in descriptor for name in BOUNDARIES):
+        return None
+
+    return descriptor
+
+
+def save_descriptor(filename, descriptor):
+    """Writes a descriptor to a file, replacing it atomically."""
+    temporary_filename = filename + '.tmp'
+    with open(temporary_filename, 'w') as descriptor_file:
+        json.dump(descriptor, descriptor_file)
+    os.replace(temporary_filename, filename)
@@ -0,0 +1,224 @@
+"""
+Provides streaming detection of the race boundaries recorded in a
+telemetry descriptor.
+
+The descriptor marks the start of the last complete race in a capture,
+the last packet of racing and the end of the race results. Detection
+only needs the header of each telemetry packet, so packets are never
+fully decoded.
+"""
+from replayenhancer.Descriptor import make_descriptor, packet_checksum, \
+    save_descriptor
+
+TELEMETRY_PACKET_LENGTH = 1367
+
+_GAME_SESSION_STATE_OFFSET = 3
+_RACE_STATE_FLAGS_OFFSET = 10
+
+
+def race_phase(game_session_state, race_state_flags):
+    """
+    Returns the race state of a telemetry packet, and whether it is in
+    a race session while playing.
+    """
+    return race_state_flags & int('00000111', 2), \
+        game_session_state & int('00001111', 2) == 2 \
+        and (game_session_state & int('11110000', 2)) >> 4 == 5
+
+
+def state_summary(states):
+    """
+    Returns the summary of part of a capture for
+    DescriptorBuilder.add_summary.
+
+    The summary holds the (key, game_session_state, race_state_flags)
+    of the first and last telemetry packet of each run of telemetry
+    packets with the same race phase, see race_phase. Replaying the
+    summaries of consecutive parts of a capture produces the same
+    descriptor as adding every packet, so parts can be summarized
+    independently.
+
+    Parameters
+    ----------
+    states : iterable
+        (key, game_session_state, race_state_flags) of each packet,
+        with None states for packets other than telemetry packets.
+    """
+    summary = list()
+    phase = None
+    last = None
+    for state in states:
+        if state[1] is None:
+            continue
+
+        packet_phase = race_phase(state[1], state[2])
+        if packet_phase != phase:
+            if last is not None and last is not summary[-1]:
+                summary.append(last)
+            summary.append(state)
+            phase = packet_phase
+        last = state
+
+    if last is not None and last is not summary[-1]:
+        summary.append(last)
+
+    return summary
+
+
+class DescriptorBuilder:
+    """
+    Tracks race_state, session_state and game_state transitions of a
+    stream of packets and produces the descriptor of the last complete
+    race seen.
+
+    Each packet is identified by a key supplied with it; the
+    descriptor holds the keys of the boundary packets.
+
+    The boundaries are those found by a forward and reverse pass over
+    the capture:
+
+    race_end
+        The packet before the first telemetry packet that follows the
+        last run of finished (race_state 3) telemetry packets, or the
+        last packet if the capture ends while finished.
+    race_finish
+        The last racing (race_state 2) telemetry packet before that run.
+    race_start
+        The last telemetry packet before the green flag (race_state 0
+        or 1), extended back over the unbroken run of earlier telemetry
+        packets that are in a race session (session_state 5) while
+        playing (game_state 2).
+    """
+    def __init__(self):
+        self.descriptor = None
+
+        self._previous_key = None
+        self._finished = False
+        self._run_start = None
+        self._start = None
+        self._racing = None
+
+    def add_packet(self, key, packet_data):
+        """
+        Adds the next packet of the capture.
+
+        Returns True if the descriptor changed.
+        """
+        if len(packet_data) == TELEMETRY_PACKET_LENGTH:
+            return self.add_state(
+                key,
+                packet_data[_GAME_SESSION_STATE_OFFSET],
+                packet_data[_RACE_STATE_FLAGS_OFFSET])
+        else:
+            return self.add_state(key)
+
+    def add_state(self, key, game_session_state=None, race_state_flags=None):
+        """
+        Adds the next packet of the capture from its header fields.
+        Packets other than telemetry packets have no header fields.
+
+        Returns True if the descriptor changed.
+        """
+        changed = False
+
+        if game_session_state is not None:
+            race_state, in_race = race_phase(
+                game_session_state,
+                race_state_flags)
+
+            if self._finished and race_state != 3:
+                changed = self._end_race(self._previous_key)
+            if race_state == 3:
+                self._finished = True
+
+            if race_state == 0 or race_state == 1:
+                self._start = key if self._run_start is None \
+                    else self._run_start
+            elif race_state == 2 and self._start is not None:
+                self._racing = (key, self._start)
+
+            if not in_race:
+                self._run_start = None
+            elif self._run_start is None:
+                self._run_start = key
+
+        self._previous_key = key
+        return changed
+
+    def add_summary(self, summary):
+        """
+        Adds the packets of a state summary, see state_summary. Keys
+        must be consecutive integers, such as sequence numbers.
+
+        Returns True if the descriptor changed.
+        """
+        changed = False
+        for key, game_session_state, race_state_flags in summary:
+            self.add_state(key - 1)
+            changed |= self.add_state(
+                key,
+                game_session_state,
+                race_state_flags)
+
+        return changed
+
+    def finish(self):
+        """
+        Marks the end of the capture.
+
+        Returns True if the descriptor changed.
+        """
+        if self._finished:
+            return self._end_race(self._previous_key)
+        return False
+
+    def _end_race(self, key):
+        self._finished = False
+        if self._racing is None:
+            return False
+
+        race_finish, race_start = self._racing
+        self.descriptor = {
+            'race_end': key,
+            'race_finish': race_finish,
+            'race_start': race_start}
+        return True
+
+
+class DescriptorWriter:
+    """
+    Maintains a descriptor file for a capture in progress.
+
+    Packets are identified by their sequence number in the capture and
+    their checksum, matching the descriptors built by TelemetryData.
+    The file is rewritten each time a race is completed, so it always
+    describes the last complete race captured so far.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the descriptor file.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._builder = DescriptorBuilder()
+        self._sequence = 0
+
+    @property
+    def descriptor(self):
+        """The current descriptor, or None if no race is complete."""
+        if self._builder.descriptor is None:
+            return None
+        return make_descriptor(self._builder.descriptor)
+
+    def write(self, packet_data, _=None):
+        """Adds the next packet of the capture."""
+        key = (self._sequence, packet_checksum(packet_data))
+        self._sequence += 1
+        if self._builder.add_packet(key, packet_data):
+            save_descriptor(self.filename, self.descriptor)
+
+    def close(self):
+        """Marks the end of the capture."""
+        if self._builder.finish():
+            save_descriptor(self.filename, self.descriptor)
@@ -201,6 +201,8 @@ class GTStandings:
         for entry in sorted(
                 self._race_data.classification,
                 key=lambda x: x.position):
+            # The entries of the classification are shared.
+            entry = copy(entry)
             try:
                 if entry.driver_name in self._subject_name:
                     entry.viewed_driver = True
@@ -1121,10 +1123,8 @@ class GapTimeFlyout(TimeFlyout):
             - self._driver.laps_complete
 
         if lap_difference == 0:
-            leader_time = sum(
-                classification[0].driver.lap_times)
-            driver_time = sum(
-                self._driver.lap_times)
+            leader_time = classification[0].driver.completed_lap_time
+            driver_time = self._driver.completed_lap_time
 
             # If gap time is less than zero (which can happen in the
             # first few laps of a race), we just turn this into a
@@ -3,21 +3,33 @@ Provides base class for the UDP Packets output by Project CARS.
 """
 
 import abc
-from collections import deque
-from struct import unpack
+from hashlib import md5
+from struct import error
 
 
 class Packet(metaclass=abc.ABCMeta):
     """
     Defines base Packet class for UDP Packets output by Project CARS.
+
+    Subclasses keep the packet data as `_packet_data`.
     """
+    __slots__ = ('_packet_data',)
+
+    @property
+    def data_hash(self):
+        """
+        Returns the md5 hash of the packet data. The hash is only
+        computed on request.
+        """
+        return md5(self._packet_data).hexdigest()
+
     @abc.abstractproperty
     def packet_type(self):
         """Define the packet type number of the packet."""
 
     @abc.abstractproperty
-    def _packet_string(self):
-        """Define the binary unpacking string for the packet."""
+    def _packet_struct(self):
+        """Define the precompiled Struct that unpacks the packet."""
 
     def _test_packet_type(self, packet_type):
         """
@@ -36,12 +48,27 @@ class Packet(metaclass=abc.ABCMeta):
         else:
             return True
 
-    def _unpack_data(self, packet_data):
+    def _unpack_data(self, packet_data, packet_struct=None):
         """
-        Unpacks the binary data according to the string that
-        represents the data structure.
+        Unpacks the binary data according to the Struct that
+        represents the data structure, without copying it. Another
+        Struct may be given to unpack only the leading fields.
         """
-        return deque(unpack(self._packet_string, packet_data))
+        packet_data = memoryview(packet_data)
+        if len(packet_data) != self._packet_struct.size:
+            raise error(
+                "unpack requires a buffer of {} bytes".format(
+                    self._packet_struct.size))
+        return (self._packet_struct if packet_struct is None
+                else packet_struct).unpack_from(packet_data)
+
+    @staticmethod
+    def _unpack_string(string_data):
+        """Decodes a null-terminated string field."""
+        return str(
+            string_data,
+            encoding='utf-8',
+            errors='strict').split('\x00', 1)[0]
 
     def __repr__(self):
         return self.__str__()
@@ -0,0 +1,332 @@
+"""
+Provides a compact binary index of the packets in a capture.
+
+The index is stored as a sidecar file next to the capture. For each
+packet it records the sequence number, packet type, byte offset and
+length, and for telemetry packets the game and session state, race
+state, current time and number of participants. This lets readers
+seek straight to the packets they need and skip the rest unread.
+
+The index is built from the packet headers alone, in one pass that
+also finds the race boundaries, see DescriptorBuilder. Large captures
+are indexed in parallel chunks, whose race state summaries are merged.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from struct import Struct, error as StructError
+
+from tqdm import tqdm
+
+from replayenhancer.DescriptorBuilder import DescriptorBuilder, \
+    state_summary
+
+INDEX_FILENAME = 'packet_index.bin'
+
+PARALLEL_PACKETS = 100000
+
+PACKET_TYPES = {1367: 0, 1347: 1, 1028: 2}
+UNKNOWN_PACKET_TYPE = 255
+
+_HEADER = Struct('<8sHBQI')
+_MAGIC = b'PCREIDX\x00'
+_VERSION = 1
+
+_ENTRY = Struct('<IBQIBBfb')
+
+# Game and session state, number of participants, race state flags and
+# current time, at their offsets within a telemetry packet.
+_TELEMETRY_FIELDS = Struct('=3xBxb4xB9xf')
+
+IndexEntry = namedtuple('IndexEntry', [
+    'sequence',
+    'packet_type',
+    'offset',
+    'length',
+    'game_session_state',
+    'race_state',
+    'current_time',
+    'num_participants'])
+
+_NO_TELEMETRY_FIELDS = (None, None, None, None)
+
+_UNKNOWN = object()
+
+
+def _unpack_entries(data, offset=0):
+    """
+    Yields the fields of each packed entry in data, from an offset.
+    Struct.iter_unpack needs Python 3.4.
+    """
+    for position in range(offset, len(data), _ENTRY.size):
+        yield _ENTRY.unpack_from(data, position)
+
+
+def _index_chunk(chunk):
+    """
+    Indexes the packets of a chunk of a capture in a worker process,
+    see the chunks method of the packet sources.
+
+    Returns the packed entries, the state summary of the chunk and the
+    number of packets, see DescriptorBuilder.state_summary.
+    """
+    entries = [
+        PacketIndex._entry(sequence, offset, length, header)
+        for sequence, offset, length, header in chunk.headers(
+            _TELEMETRY_FIELDS.size)]
+
+    return b''.join(
+        _ENTRY.pack(*PacketIndex._pack_entry(entry))
+        for entry in entries), \
+        state_summary(
+            (entry.sequence, entry.game_session_state, entry.race_state)
+            for entry in entries), \
+        len(entries)
+
+
+class PacketIndex:
+    """
+    Index of the packets of a capture.
+
+    Entries for packets other than telemetry packets have None for the
+    telemetry fields.
+
+    Parameters
+    ----------
+    entries : list of IndexEntry
+        One entry per packet, in capture order.
+    kind : int
+        Kind of packet source the index was built from.
+    fingerprint : int
+        Fingerprint of the packet source the index was built from.
+    """
+    def __init__(self, entries, kind, fingerprint):
+        self.entries = entries
+        self.kind = kind
+        self.fingerprint = fingerprint
+        self._descriptor = _UNKNOWN
+
+    def __getitem__(self, sequence):
+        return self.entries[sequence]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, source, *, workers=None):
+        """
+        Builds the index, and the descriptor, in a single pass over the
+        headers of the packets of a source.
+
+        Captures of at least PARALLEL_PACKETS packets are split into
+        chunks indexed in parallel by `workers` processes, defaulting
+        to one per CPU core. Pass workers=1 to index in this process.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        count = len(source)
+        progress = cls._progress(count)
+        index = None
+        if workers > 1 and count >= PARALLEL_PACKETS:
+            try:
+                index = cls._build_parallel(source, count, workers, progress)
+            except (OSError, BrokenProcessPool):
+                # Started again, as tqdm.reset needs tqdm 4.32.
+                progress.close()
+                progress = cls._progress(count)
+        if index is None:
+            index = cls._build_sequential(source, progress)
+        progress.close()
+
+        return index
+
+    @staticmethod
+    def _progress(count):
+        return tqdm(
+            desc='Indexing Telemetry Data',
+            total=count,
+            unit='packets')
+
+    @classmethod
+    def _build_sequential(cls, source, progress):
+        entries = list()
+        builder = DescriptorBuilder()
+        for sequence, offset, length, header in source.headers(
+                _TELEMETRY_FIELDS.size):
+            entry = cls._entry(sequence, offset, length, header)
+            builder.add_state(
+                sequence,
+                entry.game_session_state,
+                entry.race_state)
+            entries.append(entry)
+            progress.update()
+        builder.finish()
+
+        index = cls(entries, source.kind, source.fingerprint)
+        index._descriptor = builder.descriptor
+        return index
+
+    @classmethod
+    def _build_parallel(cls, source, count, workers, progress):
+        chunk_packets = -(-count // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_index_chunk, chunk)
+                for chunk in source.chunks(chunk_packets)]
+            for future in as_completed(futures):
+                progress.update(future.result()[2])
+
+            return cls._build_chunks(
+                [future.result() for future in futures],
+                source)
+
+    @classmethod
+    def _build_chunks(cls, chunks, source):
+        """
+        Merges the packed entries and state summaries of consecutive
+        chunks of a source into an index.
+        """
+        entries = [
+            cls._unpack_entry(*fields)
+            for packed_entries, _, _ in chunks
+            for fields in _unpack_entries(packed_entries)]
+
+        builder = DescriptorBuilder()
+        for _, summary, _ in chunks:
+            builder.add_summary(summary)
+        if entries:
+            builder.add_state(entries[-1].sequence)
+        builder.finish()
+
+        index = cls(entries, source.kind, source.fingerprint)
+        index._descriptor = builder.descriptor
+        return index
+
+    @classmethod
+    def load(cls, filename, source):
+        """
+        Loads an index from a file. Returns None if the file does not
+        exist, is unreadable or does not match the source.
+        """
+        try:
+            with open(filename, 'rb') as index_file:
+                data = index_file.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            magic, version, kind, fingerprint, count = \
+                _HEADER.unpack_from(data)
+        except StructError:
+            return None
+
+        if magic != _MAGIC \
+                or version != _VERSION \
+                or kind != source.kind \
+                or fingerprint != source.fingerprint \
+                or len(data) != _HEADER.size + count * _ENTRY.size:
+            return None
+
+        entries = [
+            cls._unpack_entry(*fields)
+            for fields in _unpack_entries(data, _HEADER.size)]
+
+        return cls(entries, kind, fingerprint)
+
+    @classmethod
+    def open(cls, source, filename=None):
+        """
+        Loads the index of a source, building and saving it if it is
+        missing or out of date.
+        """
+        if filename is None:
+            filename = os.path.join(source.directory, INDEX_FILENAME)
+
+        index = cls.load(filename, source)
+        if index is None:
+            index = cls.build(source)
+            try:
+                index.save(filename)
+            except OSError:
+                pass
+
+        return index
+
+    def save(self, filename):
+        """Writes the index to a file."""
+        temporary_filename = filename + '.tmp'
+        with open(temporary_filename, 'wb') as index_file:
+            index_file.write(_HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                self.kind,
+                self.fingerprint,
+                len(self.entries)))
+            for entry in self.entries:
+                index_file.write(_ENTRY.pack(*self._pack_entry(entry)))
+        os.replace(temporary_filename, filename)
+
+    def telemetry(self, start=0, stop=None):
+        """Yields the entries of telemetry packets in a sequence range."""
+        for entry in self.entries[start:stop]:
+            if entry.packet_type == 0:
+                yield entry
+
+    def descriptor(self):
+        """
+        Returns the descriptor of the capture, with packets identified
+        by sequence number, or None if it holds no complete race.
+        """
+        if self._descriptor is _UNKNOWN:
+            builder = DescriptorBuilder()
+            for entry in self.entries:
+                builder.add_state(
+                    entry.sequence,
+                    entry.game_session_state,
+                    entry.race_state)
+            builder.finish()
+            self._descriptor = builder.descriptor
+
+        return self._descriptor
+
+    @staticmethod
+    def _entry(sequence, offset, length, packet_data):
+        packet_type = PACKET_TYPES.get(length, UNKNOWN_PACKET_TYPE)
+        if packet_type == 0:
+            game_session_state, num_participants, race_state_flags, \
+                current_time = _TELEMETRY_FIELDS.unpack_from(packet_data)
+            return IndexEntry(
+                sequence,
+                packet_type,
+                offset,
+                length,
+                game_session_state,
+                race_state_flags & int('00000111', 2),
+                current_time,
+                num_participants)
+        else:
+            return IndexEntry(
+                sequence,
+                packet_type,
+                offset,
+                length,
+                *_NO_TELEMETRY_FIELDS)
+
+    @staticmethod
+    def _pack_entry(entry):
+        if entry.packet_type == 0:
+            return entry
+        else:
+            return entry[:4] + (0, 0, 0.0, 0)
+
+    @staticmethod
+    def _unpack_entry(*fields):
+        if fields[1] == 0:
+            return IndexEntry(*fields)
+        else:
+            return IndexEntry(*fields[:4] + _NO_TELEMETRY_FIELDS)
@@ -0,0 +1,225 @@
+"""
+Provides a cached manifest of the packet files of a capture directory.
+
+Listing and naturally sorting a directory of many thousands of `pdata`
+files is slow, and a capture is opened several times while a video is
+made. The manifest records the sorted file list, with the size and
+modification time of each file, in a sidecar file in the directory.
+
+The manifest also records the modification time of the directory,
+which changes whenever a file is added, removed or replaced, so a
+manifest is validated with a single stat of the directory. The
+directory also changes when sidecar files such as the packet index are
+written beside the capture. When its time has changed, the packet
+files are checked against the manifest: the same files must be listed,
+and each is stat'ed again, so files rewritten with new sizes or times
+are updated without the directory being sorted again.
+
+A file added in the same tick of the directory's clock as the manifest
+was checked does not change the directory time. The files are also
+checked while the manifest was checked too recently for that to be
+ruled out. A file rewritten in place, which does not change the
+directory time, is not seen once that time has passed.
+"""
+import json
+import os
+import time
+from collections import namedtuple
+from fnmatch import fnmatch
+from hashlib import md5
+
+from natsort import natsorted
+
+MANIFEST_FILENAME = 'packet_manifest.json'
+
+PACKET_FILE_PATTERN = 'pdata*'
+
+# Longest tick of a file system clock, in nanoseconds: FAT records
+# modification times to 2 seconds.
+CLOCK_RESOLUTION = 2 * 10 ** 9
+
+_VERSION = 3
+
+ManifestEntry = namedtuple(
+    'ManifestEntry',
+    ['filename', 'size', 'mtime_ns'])
+
+
+class PacketManifest:
+    """
+    Manifest of the packet files of a capture directory.
+
+    Parameters
+    ----------
+    directory : str
+        The capture directory.
+    entries : list of ManifestEntry
+        One entry per packet file, in natural sort order. Filenames
+        are relative to the directory.
+    directory_mtime : int, optional
+        Modification time of the directory, in nanoseconds, when the
+        files were listed.
+    checked_time : int, optional
+        Time, in nanoseconds, when the files were last listed or
+        checked.
+    """
+    def __init__(self, directory, entries, directory_mtime=None,
+                 checked_time=None):
+        self.directory = directory
+        self.entries = entries
+        self.directory_mtime = directory_mtime
+        self.checked_time = checked_time
+        self._refreshed = False
+
+    def __getitem__(self, sequence):
+        return self.entries[sequence]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fingerprint(self):
+        """
+        Returns a 64-bit hash of the entries: the name, size and
+        modification time of each packet file. As load checks the
+        entries again whenever the directory changes, it changes when a
+        packet file is added, removed, renamed or replaced.
+        """
+        entries_hash = md5(json.dumps(
+            [list(entry) for entry in self.entries]).encode('utf-8'))
+        return int.from_bytes(entries_hash.digest()[:8], 'little')
+
+    def filenames(self):
+        """Returns the paths of the packet files."""
+        return [
+            os.path.join(self.directory, entry.filename)
+            for entry in self.entries]
+
+    @classmethod
+    def build(cls, directory):
+        """Builds the manifest by listing the directory."""
+        directory_mtime = os.stat(directory).st_mtime_ns
+        checked_time = _now()
+
+        return cls(
+            directory,
+            [_manifest_entry(directory, name)
+             for name in natsorted(_packet_files(directory))],
+            directory_mtime,
+            checked_time)
+
+    @classmethod
+    def load(cls, directory, filename=None):
+        """
+        Loads the manifest of a directory. Returns None if it does not
+        exist, is unreadable or packet files have been added to,
+        removed from or renamed in the directory since it was written.
+        Files that have been rewritten are updated.
+        """
+        if filename is None:
+            filename = os.path.join(directory, MANIFEST_FILENAME)
+
+        try:
+            with open(filename) as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest['version'] != _VERSION:
+                return None
+
+            entries = [ManifestEntry(*entry) for entry in manifest['files']]
+            manifest = cls(
+                directory,
+                entries,
+                manifest['directory_mtime'],
+                manifest['checked_time'])
+
+            directory_mtime = os.stat(directory).st_mtime_ns
+            if directory_mtime == manifest.directory_mtime \
+                    and manifest.checked_time - directory_mtime \
+                    >= CLOCK_RESOLUTION:
+                return manifest
+
+            checked_time = _now()
+            filenames = [entry.filename for entry in entries]
+            if sorted(_packet_files(directory)) != sorted(filenames):
+                return None
+            entries = [
+                _manifest_entry(directory, filename)
+                for filename in filenames]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        manifest.entries = entries
+        manifest.directory_mtime = directory_mtime
+        manifest.checked_time = checked_time
+        manifest._refreshed = True
+        return manifest
+
+    @classmethod
+    def open(cls, directory, filename=None):
+        """
+        Loads the manifest of a directory, building and saving it if it
+        is missing or out of date.
+        """
+        if filename is None:
+            filename = os.path.join(directory, MANIFEST_FILENAME)
+
+        manifest = cls.load(directory, filename)
+        if manifest is None:
+            try:
+                manifest = cls._build_and_save(directory, filename)
+            except OSError:
+                manifest = cls.build(directory)
+        elif manifest._refreshed:
+            try:
+                manifest.save(filename)
+            except OSError:
+                pass
+
+        return manifest
+
+    @classmethod
+    def _build_and_save(cls, directory, filename):
+        # The manifest file is created before the directory is listed,
+        # so the directory time it records is not changed by its own
+        # creation. It is then rewritten in place, which leaves the
+        # directory time alone.
+        with open(filename, 'a'):
+            pass
+        manifest = cls.build(directory)
+        manifest.save(filename)
+
+        return manifest
+
+    def save(self, filename):
+        """
+        Writes the manifest to a file. The file is rewritten in place,
+        so that an existing manifest does not change the directory's
+        modification time.
+        """
+        with open(filename, 'w') as manifest_file:
+            json.dump({
+                'version': _VERSION,
+                'directory_mtime': self.directory_mtime,
+                'checked_time': self.checked_time,
+                'files': [list(entry) for entry in self.entries]},
+                manifest_file)
+
+
+def _manifest_entry(directory, filename):
+    """Returns the manifest entry of a packet file."""
+    stat = os.stat(os.path.join(directory, filename))
+    return ManifestEntry(filename, stat.st_size, stat.st_mtime_ns)
+
+
+def _packet_files(directory):
+    """Returns the names of the packet files in a directory."""
+    return [
+        filename for filename in os.listdir(directory)
+        if fnmatch(filename, PACKET_FILE_PATTERN)]
+
+
+def _now():
+    """Returns the time in nanoseconds."""
+    return int(time.time() * 10 ** 9)
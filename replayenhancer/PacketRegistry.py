@@ -0,0 +1,130 @@
+"""
+Provides dispatch of packet data to the packet classes that decode it.
+
+Packets are identified by their length, the packet type in the low bits
+of their third byte and, where decoders differ between game builds,
+their build version number. Packets that match no decoder, or that
+their decoder rejects, are counted rather than silently dropped.
+"""
+from collections import Counter
+from functools import partial
+from struct import Struct, error
+
+from replayenhancer.AdditionalParticipantPacket \
+    import AdditionalParticipantPacket
+from replayenhancer.ParticipantPacket import ParticipantPacket
+from replayenhancer.TelemetryDataPacket import TelemetryDataPacket
+
+_BUILD_VERSION = Struct('H')
+_PACKET_TYPE_OFFSET = 2
+
+
+def packet_registry(*, lazy=False):
+    """
+    Returns a registry of the packet classes of Project CARS.
+
+    Telemetry packets are decoded lazily if `lazy` is True, see
+    TelemetryDataPacket.
+    """
+    registry = PacketRegistry()
+    registry.register(
+        TelemetryDataPacket._packet_struct.size,
+        0,
+        partial(TelemetryDataPacket, lazy=lazy))
+    registry.register(
+        ParticipantPacket._packet_struct.size,
+        1,
+        ParticipantPacket)
+    registry.register(
+        AdditionalParticipantPacket._packet_struct.size,
+        2,
+        AdditionalParticipantPacket)
+
+    return registry
+
+
+class PacketRegistry:
+    """
+    Maps the length, packet type and build version of packets to the
+    decoders that decode them.
+
+    A decoder is any callable that takes the packet data and returns
+    the decoded packet, raising struct.error, ValueError or
+    UnicodeDecodeError if the data is malformed.
+
+    Packets with no decoder are counted in `unknown`, and packets
+    whose decoder fails in `malformed`, keyed by (length, packet type).
+    """
+    def __init__(self):
+        self._decoders = dict()
+        self.unknown = Counter()
+        self.malformed = Counter()
+
+    def register(self, length, packet_type, decoder, *, build_version=None):
+        """
+        Registers the decoder of packets of a length and packet type.
+
+        A decoder registered for a build version takes precedence over
+        one registered for all builds (build_version None).
+        """
+        self._decoders.setdefault(
+            (length, packet_type),
+            dict())[build_version] = decoder
+
+    @staticmethod
+    def packet_type(packet_data):
+        """Returns the packet type of packet data, read from its header."""
+        return packet_data[_PACKET_TYPE_OFFSET] & int('00000011', 2)
+
+    def packet_types(self):
+        """Returns the packet types that have a registered decoder."""
+        return {packet_type for _, packet_type in self._decoders}
+
+    def decoder(self, packet_data):
+        """Returns the decoder of packet data, or None if there is none."""
+        try:
+            decoders = self._decoders[
+                (len(packet_data), self.packet_type(packet_data))]
+        except (KeyError, IndexError):
+            return None
+
+        if len(decoders) > 1:
+            build_version, = _BUILD_VERSION.unpack_from(packet_data)
+            if build_version in decoders:
+                return decoders[build_version]
+
+        return decoders.get(None)
+
+    def decode(self, packet_data, packet_types=None):
+        """
+        Decodes packet data, or returns None if it is unknown,
+        malformed or not one of the requested packet types.
+
+        Parameters
+        ----------
+        packet_data : bytes-like
+            The data of the packet.
+        packet_types : container of int, optional
+            The packet types to decode. The packet type is read from
+            the header, so other packets are skipped without decoding.
+        """
+        if packet_types is not None \
+                and self._key(packet_data)[1] not in packet_types:
+            return None
+
+        decoder = self.decoder(packet_data)
+        if decoder is None:
+            self.unknown[self._key(packet_data)] += 1
+            return None
+
+        try:
+            return decoder(packet_data)
+        except (error, ValueError, UnicodeDecodeError):
+            self.malformed[self._key(packet_data)] += 1
+            return None
+
+    def _key(self, packet_data):
+        try:
+            return len(packet_data), self.packet_type(packet_data)
+        except IndexError:
+            return len(packet_data), None
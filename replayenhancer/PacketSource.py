@@ -0,0 +1,473 @@
+"""
+Provides uniform access to the packets of a capture, however the
+capture is stored.
+"""
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from weakref import WeakValueDictionary
+
+from replayenhancer.CaptureArchive import CaptureArchiveReader, \
+    find_capture_archive
+from replayenhancer.CaptureLog import CaptureLogReader, find_capture_log
+from replayenhancer.PacketManifest import PacketManifest
+
+READ_AHEAD_DEPTH = 64
+READ_AHEAD_WORKERS = 4
+
+_mappings = WeakValueDictionary()
+
+
+def packet_source(path, *, memory_map=True):
+    """
+    Returns the packet source for a capture.
+
+    The path may name a directory of `pdata` files, a directory holding
+    a capture archive or capture log, or the archive or log itself.
+    Capture logs are memory-mapped unless `memory_map` is False, see
+    PacketLog.
+    """
+    capture_archive = find_capture_archive(path)
+    if capture_archive is not None:
+        return PacketArchive(capture_archive)
+
+    capture_log = find_capture_log(path)
+    if capture_log is not None:
+        return PacketLog(capture_log, memory_map=memory_map)
+    elif os.path.isdir(path):
+        return PacketDirectory(path)
+    else:
+        raise NotADirectoryError
+
+
+class FileMapping:
+    """
+    Read-only memory map of a file, shared by all its readers in a
+    process, see map_file.
+    """
+    __slots__ = ('view', '__weakref__')
+
+    def __init__(self, file):
+        self.view = memoryview(
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        return len(self.view)
+
+
+def map_file(filename):
+    """
+    Returns the shared memory map of a file, or None if the file cannot
+    be mapped.
+
+    Readers of the same unchanged file share one mapping for as long as
+    any of them holds it, so the file is paged in once however many
+    times it is read.
+    """
+    try:
+        stat = os.stat(filename)
+        key = (os.path.realpath(filename), stat.st_size, stat.st_mtime_ns)
+        mapping = _mappings.get(key)
+        if mapping is None:
+            with open(filename, 'rb') as mapped_file:
+                mapping = FileMapping(mapped_file)
+            _mappings[key] = mapping
+    except (OSError, ValueError):
+        return None
+
+    return mapping
+
+
+def read_ahead(source, entries, *,
+               depth=READ_AHEAD_DEPTH, workers=READ_AHEAD_WORKERS):
+    """
+    Yields the data of packets of a source, in order, reading ahead of
+    the consumer on a pool of threads.
+
+    Reads are queued up to `depth` packets ahead, so reading overlaps
+    with decoding and slow storage is read with several requests in
+    flight. Sources that do not support concurrent reads, and a depth
+    below 1, read each packet on demand instead.
+
+    Parameters
+    ----------
+    source : PacketDirectory, PacketLog or PacketArchive
+        The packet source.
+    entries : iterable
+        (sequence, offset, length) of each packet to read.
+    depth : int, optional
+        Maximum number of packets read ahead.
+    workers : int, optional
+        Number of reading threads.
+    """
+    if depth < 1 or not source.concurrent_reads:
+        for entry in entries:
+            yield source.read(*entry)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for entry in entries:
+            pending.append(executor.submit(source.read, *entry[:3]))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Reads not yet started are abandoned when the consumer stops
+        # early. Executor.shutdown cancels them itself only from
+        # Python 3.9.
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class PacketDirectory:
+    """
+    Reads a capture stored as one `pdata` file per packet.
+
+    Packets are numbered by their position in the naturally sorted
+    file list, which is cached in the directory, see PacketManifest.
+    Each packet is a separate file, so packets may be read
+    concurrently.
+    """
+    kind = 0
+    concurrent_reads = True
+
+    def __init__(self, directory):
+        self.directory = os.path.realpath(directory)
+        self.manifest = PacketManifest.open(self.directory)
+        self._filenames = self.manifest.filenames()
+        self._fingerprint = None
+
+    def __len__(self):
+        return len(self._filenames)
+
+    @property
+    def fingerprint(self):
+        """
+        Value that changes when the packet files of the capture change,
+        see PacketManifest.fingerprint.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self.manifest.fingerprint()
+        return self._fingerprint
+
+    def files(self):
+        """Returns the files that store the packets."""
+        return list(self._filenames)
+
+    def packets(self, *, reverse=False):
+        """Yields the data of each packet."""
+        for filename in (
+                reversed(self._filenames) if reverse else self._filenames):
+            with open(filename, 'rb') as packet_file:
+                yield packet_file.read()
+
+    def timed_packets(self):
+        """
+        Yields (timestamp, data) tuples for each packet, where the
+        timestamp is the modification time of the packet file.
+        """
+        for filename, entry in zip(self._filenames, self.manifest):
+            with open(filename, 'rb') as packet_file:
+                yield entry.mtime_ns / 10 ** 9, packet_file.read()
+
+    def records(self):
+        """
+        Yields (sequence, offset, length, data) tuples for each packet.
+        """
+        for sequence, packet_data in enumerate(self.packets()):
+            yield sequence, 0, len(packet_data), packet_data
+
+    def chunks(self, chunk_packets):
+        """
+        Returns a DirectoryChunk for each `chunk_packets` packets,
+        holding the names and sizes of its files.
+        """
+        return [
+            self._chunk(start, start + chunk_packets)
+            for start in range(0, len(self), chunk_packets)]
+
+    def headers(self, size, start=0, stop=None):
+        """
+        Yields (sequence, offset, length, header) tuples for the
+        packets in a sequence range, where header is at most the first
+        `size` bytes of the packet. Lengths come from the manifest, so
+        only the headers are read.
+        """
+        return self._chunk(start, stop).headers(size)
+
+    def read(self, sequence, offset=0, length=None):
+        """Returns the data of a single packet."""
+        with open(self._filenames[sequence], 'rb') as packet_file:
+            packet_file.seek(offset)
+            return packet_file.read() if length is None \
+                else packet_file.read(length)
+
+    def close(self):
+        """Nothing to close; present for symmetry with PacketLog."""
+
+    def _chunk(self, start, stop):
+        return DirectoryChunk(
+            start,
+            self._filenames[start:stop],
+            [entry.size for entry in self.manifest.entries[start:stop]])
+
+
+class PacketLog:
+    """
+    Reads a capture stored as a capture log.
+
+    Packets are numbered by their position in the log. Unless
+    `memory_map` is False, the log is memory-mapped when a packet is
+    first read and packets are read as memoryview slices of the
+    mapping, without copying. The mapping is shared with the other
+    readers of the log, see map_file.
+    """
+    kind = 1
+    concurrent_reads = False
+
+    def __init__(self, filename, *, memory_map=True):
+        self.filename = filename
+        self.directory = os.path.dirname(os.path.realpath(filename))
+        self._reader = CaptureLogReader(filename)
+        self._file = None
+        self._memory_map = memory_map
+        self._mapping = None
+
+    def __len__(self):
+        return len(self._reader)
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def fingerprint(self):
+        """Value that changes when packets are added to the capture."""
+        return os.path.getsize(self.filename)
+
+    def files(self):
+        """Returns the files that store the packets."""
+        return [self.filename]
+
+    def packets(self, *, reverse=False):
+        """Yields the data of each packet."""
+        return self._reader.packets(reverse=reverse)
+
+    def timed_packets(self):
+        """Yields (timestamp, data) tuples for each packet."""
+        return self._reader.timed_packets()
+
+    def records(self):
+        """
+        Yields (sequence, offset, length, data) tuples for each packet.
+        """
+        for sequence, (offset, length, _, packet_data) in enumerate(
+                self._reader.payload_records()):
+            yield sequence, offset, length, packet_data
+
+    def chunks(self, chunk_packets):
+        """
+        Returns a LogChunk for each `chunk_packets` packets, holding the
+        offset of its first record. The record headers are read once.
+        """
+        chunks = list()
+        for sequence, (offset, _, _) in enumerate(self._reader.records()):
+            if sequence % chunk_packets == 0:
+                chunks.append(LogChunk(self.filename, sequence, offset))
+            chunks[-1].count += 1
+        return chunks
+
+    def headers(self, size, start=0, stop=None, *, record_offset=None):
+        """
+        Yields (sequence, offset, length, header) tuples for the
+        packets in a sequence range, where header is at most the first
+        `size` bytes of the packet. Only the record headers and packet
+        headers are read.
+
+        If `record_offset` is the offset of packet `start`, as given
+        by CaptureLogReader.records, the records before it are not
+        read.
+        """
+        if record_offset is None:
+            records = islice(self._reader.records(), start, stop)
+        else:
+            records = islice(
+                self._reader.records(record_offset),
+                None if stop is None else stop - start)
+        for sequence, (offset, length, _) in enumerate(records, start):
+            yield sequence, offset, length, \
+                self.read(sequence, offset, min(length, size))
+
+    def read(self, _, offset, length):
+        """
+        Returns the data of a single packet, as a memoryview if the log
+        is memory-mapped.
+        """
+        if self._memory_map:
+            if self._mapping is None:
+                self._mapping = map_file(self.filename)
+                self._memory_map = self._mapping is not None
+            if self._memory_map and offset + length <= len(self._mapping):
+                return self._mapping.view[offset:offset+length]
+
+        if self._file is None:
+            self._file = open(self.filename, 'rb')
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def close(self):
+        """
+        Closes the log if it was opened for random reads. The mapping
+        is released once no packet read from it is still held.
+        """
+        self._mapping = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PacketArchive:
+    """
+    Reads a capture stored as a compressed capture archive.
+
+    Packets are numbered by their position in the archive. Reading a
+    packet decompresses only the chunk that holds it.
+    """
+    kind = 2
+    concurrent_reads = False
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.directory = os.path.dirname(os.path.realpath(filename))
+        self._reader = CaptureArchiveReader(filename)
+
+    def __len__(self):
+        return len(self._reader)
+
+    @property
+    def fingerprint(self):
+        """Value that changes when the archive is rewritten."""
+        return os.path.getsize(self.filename)
+
+    def files(self):
+        """Returns the files that store the packets."""
+        return [self.filename]
+
+    def packets(self, *, reverse=False):
+        """Yields the data of each packet."""
+        return self._reader.packets(reverse=reverse)
+
+    def timed_packets(self):
+        """Yields (timestamp, data) tuples for each packet."""
+        return self._reader.timed_packets()
+
+    def records(self):
+        """
+        Yields (sequence, offset, length, data) tuples for each packet.
+        Offsets are always zero, as packets are read by sequence.
+        """
+        for sequence, packet_data in enumerate(self.packets()):
+            yield sequence, 0, len(packet_data), packet_data
+
+    def chunks(self, chunk_packets):
+        """Returns an ArchiveChunk for each `chunk_packets` packets."""
+        return [
+            ArchiveChunk(
+                self.filename,
+                start,
+                min(start + chunk_packets, len(self)))
+            for start in range(0, len(self), chunk_packets)]
+
+    def headers(self, size, start=0, stop=None):
+        """
+        Yields (sequence, offset, length, header) tuples for the
+        packets in a sequence range, where header is at most the first
+        `size` bytes of the packet. Chunks are decompressed whole, so
+        every packet of the range is read.
+        """
+        for sequence in range(start, len(self) if stop is None else stop):
+            packet_data = self._reader.packet(sequence)
+            yield sequence, 0, len(packet_data), packet_data[:size]
+
+    def read(self, sequence, offset=0, length=None):
+        """Returns the data of a single packet."""
+        packet_data = self._reader.packet(sequence)
+        return packet_data[offset:] if length is None \
+            else packet_data[offset:offset+length]
+
+    def close(self):
+        """Closes the archive if it was opened for reading chunks."""
+        self._reader.close()
+
+
+class DirectoryChunk:
+    """
+    A sequence range of a PacketDirectory, which is read from its
+    files without listing the directory, see PacketDirectory.chunks.
+    """
+    def __init__(self, start, filenames, sizes):
+        self.start = start
+        self.filenames = filenames
+        self.sizes = sizes
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def headers(self, size):
+        """See PacketDirectory.headers."""
+        for sequence, (filename, length) in enumerate(
+                zip(self.filenames, self.sizes),
+                self.start):
+            with open(filename, 'rb') as packet_file:
+                yield sequence, 0, length, packet_file.read(size)
+
+
+class LogChunk:
+    """
+    A sequence range of a PacketLog, which is read from the offset of
+    its first record, see PacketLog.chunks.
+    """
+    def __init__(self, filename, start, record_offset, count=0):
+        self.filename = filename
+        self.start = start
+        self.record_offset = record_offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def headers(self, size):
+        """See PacketLog.headers."""
+        source = PacketLog(self.filename)
+        try:
+            yield from source.headers(
+                size,
+                self.start,
+                self.start + self.count,
+                record_offset=self.record_offset)
+        finally:
+            source.close()
+
+
+class ArchiveChunk:
+    """A sequence range of a PacketArchive, see PacketArchive.chunks."""
+    def __init__(self, filename, start, stop):
+        self.filename = filename
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def headers(self, size):
+        """See PacketArchive.headers."""
+        source = PacketArchive(self.filename)
+        try:
+            yield from source.headers(size, self.start, self.stop)
+        finally:
+            source.close()
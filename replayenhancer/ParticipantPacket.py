@@ -3,7 +3,7 @@ Provides a class for the Participant Info Strings output by
 Project CARS
 """
 
-from hashlib import md5
+from struct import Struct
 
 from replayenhancer.Packet import Packet
 
@@ -15,50 +15,32 @@ class ParticipantPacket(Packet):
     The participant info string packet has a length of 1347, and is
     packet type 1.
     """
+    __slots__ = (
+        'build_version_number', 'car_name', 'car_class_name',
+        'track_location', 'track_variation', 'name')
+
     def __init__(self, packet_data):
-        self.data_hash = md5(packet_data).hexdigest()
+        self._packet_data = packet_data
         unpacked_data = self._unpack_data(packet_data)
 
-        self.build_version_number = int(unpacked_data.popleft())
+        self.build_version_number = unpacked_data[0]
 
-        self._test_packet_type(unpacked_data.popleft())
+        self._test_packet_type(unpacked_data[1])
 
-        self.car_name = str(
-            unpacked_data.popleft(),
-            encoding='utf-8',
-            errors='strict').split('\x00', 1)[0]
-        self.car_class_name = str(
-            unpacked_data.popleft(),
-            encoding='utf-8',
-            errors='strict').split('\x00', 1)[0]
-        self.track_location = str(
-            unpacked_data.popleft(),
-            encoding='utf-8',
-            errors='strict').split('\x00', 1)[0]
-        self.track_variation = str(
-            unpacked_data.popleft(),
-            encoding='utf-8',
-            errors='strict').split('\x00', 1)[0]
+        self.car_name, self.car_class_name, self.track_location, \
+            self.track_variation = [
+                self._unpack_string(string_data)
+                for string_data in unpacked_data[2:6]]
 
-        self.name = list()
-        for _ in range(16):
-            self.name.append(
-                str(
-                    unpacked_data.popleft(),
-                    encoding='utf-8',
-                    errors='strict').split('\x00', 1)[0])
+        self.name = tuple(
+            self._unpack_string(string_data)
+            for string_data in unpacked_data[6:22])
 
     @property
     def packet_type(self):
         return 1
 
-    @property
-    def _packet_string(self):
-        packet_string = "HB64s64s64s64s"
-        packet_string += "64s"*16
-        packet_string += "64x"
-
-        return packet_string
+    _packet_struct = Struct("HB64s64s64s64s" + "64s"*16 + "64x")
 
     def __str__(self):
         return "ParticipantPacket"
@@ -2,32 +2,51 @@
 Provides classes for the reading and processing of captured Project
 CARS telemetry data.
 """
-import json
 import os.path
-from glob import glob
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
 from hashlib import md5
 from itertools import tee
 from math import ceil
 
-from natsort import natsorted
-from tqdm import tqdm
+from replayenhancer.Descriptor import BOUNDARIES, DESCRIPTOR_VERSION, \
+    descriptor_version, load_descriptor, make_descriptor, packet_checksum, \
+    save_descriptor
+from replayenhancer.PacketIndex import PacketIndex, UNKNOWN_PACKET_TYPE
+from replayenhancer.PacketRegistry import packet_registry
+from replayenhancer.PacketSource import READ_AHEAD_DEPTH, packet_source, \
+    read_ahead
+from replayenhancer.TrackRegistry import track_registry
 
-from replayenhancer.AdditionalParticipantPacket \
-    import AdditionalParticipantPacket
-from replayenhancer.ParticipantPacket import ParticipantPacket
-from replayenhancer.TelemetryDataPacket import TelemetryDataPacket
-from replayenhancer.Track import Track
+
+SNAPSHOT_INTERVAL = 30.0
+
+_UNKNOWN = object()
+
+_Snapshot = namedtuple('_Snapshot', [
+    'sequence', 'elapsed_time', 'last_packet', 'next_packet', 'track',
+    'drivers', 'dropped_drivers', 'stopped_drivers'])
 
 
 class RaceData:
     """
     Holds data regarding the race.
+
+    A snapshot of the state of the race is kept every
+    `snapshot_interval` seconds of elapsed time as it is read, so that
+    the race can be moved to any time already reached without reading
+    it again from the start, see seek. Snapshots are not kept if
+    `snapshot_interval` is None.
     """
     def __init__(self, telemetry_directory, *,
-                 descriptor_filename='descriptor.json'):
+                 descriptor_filename='descriptor.json',
+                 snapshot_interval=SNAPSHOT_INTERVAL):
         self._starting_grid = list()
         self.drivers = dict()
         self._dropped_drivers = dict()
+        self._drivers_by_index = list()
+        self._driver_table = list()
 
         self._stopped_drivers = set()
 
@@ -35,6 +54,13 @@ class RaceData:
         self._last_packet = None
         self._next_packet = None
 
+        # Counts the changes to the state of the race, by packet or
+        # seek. Derived data such as the classification is kept for
+        # the version it was made from.
+        self.version = 0
+        self._classification = None
+        self._classification_version = None
+
         self.track = None
 
         self._descriptor_filename = descriptor_filename
@@ -42,25 +68,26 @@ class RaceData:
         self.telemetry_data = TelemetryData(
             telemetry_directory,
             descriptor_filename=descriptor_filename)
+        # telemetry_data is replaced as drivers are read ahead.
+        self.capture = self.telemetry_data
+        self._position = 0
 
-        self.get_data()
+        self._snapshot_interval = snapshot_interval
+        self._snapshots = list()
+        self._snapshot_times = list()
 
-        if self.laps_in_event == 0:
-            time_data = TelemetryData(
-                telemetry_directory,
-                descriptor_filename=descriptor_filename)
-            packet = next(time_data)
-            while (packet.packet_type == 0 and packet.race_state == 1) \
-                    or packet.packet_type != 0:
-                packet = next(time_data)
+        self._total_time = _UNKNOWN
 
-            self.total_time = ceil(packet.event_time_remaining)
-        else:
-            self.total_time = None
+        self.get_data()
 
     @property
     def all_driver_classification(self):
-        classification = self.classification
+        # Positions are changed below, so the entries are not the
+        # shared entries of classification.
+        classification = [
+            ClassificationEntry(entry.position, entry.driver,
+                                entry.viewed_driver)
+            for entry in self.classification]
         for driver in self._dropped_drivers.values():
             classification.append(ClassificationEntry(None, driver, False))
 
@@ -99,18 +126,20 @@ class RaceData:
     def classification(self):
         """
         Returns classification data at the current time.
+
+        The entries are made once per version and shared by every read
+        of that version, so are not to be changed.
         """
-        classification = list()
-        drivers_by_index = sorted(
-            [driver for driver in self.drivers.values()],
-            key=lambda x: x.index)
-        for index in range(self._next_packet.num_participants):
-            classification.append(ClassificationEntry(
-                self._next_packet.participant_info[index].race_position,
-                drivers_by_index[index],
-                self._next_packet.viewed_participant_index == index))
+        if self._classification_version != self.version:
+            self._classification = tuple([
+                ClassificationEntry(
+                    self._next_packet.participant_info[index].race_position,
+                    self._drivers_by_index[index],
+                    self._next_packet.viewed_participant_index == index)
+                for index in range(self._next_packet.num_participants)])
+            self._classification_version = self.version
 
-        return classification
+        return list(self._classification)
 
     @property
     def current_lap(self):
@@ -151,39 +180,38 @@ class RaceData:
     @property
     def starting_grid(self):
         """
-        Returns the starting grid for the race.
+        Returns the starting grid for the race, recorded from the first
+        packet of the race.
         """
-        if len(self._starting_grid):
-            return self._starting_grid
-        else:
-            grid_data = TelemetryData(
-                self._telemetry_directory,
-                descriptor_filename=self._descriptor_filename)
-            packet = None
-
-            while packet is None or packet.packet_type != 0:
-                packet = next(grid_data)
+        return self._starting_grid
 
-            drivers = sorted(
-                self._get_drivers(
-                    grid_data,
-                    packet.num_participants).values(),
-                key=lambda x: x.index)
+    @property
+    def total_time(self):
+        """
+        Returns the length of a timed race in seconds, or None if the
+        race is over a number of laps.
 
-            self._starting_grid = [
-                StartingGridEntry(
-                    participant_info.race_position,
-                    index,
-                    drivers[index].name)
-                if index < len(drivers) else None
-                for index, participant_info
-                in enumerate(packet.participant_info)]
+        The length is read from the first packet after the race start
+        unless it has been set, see RacePipeline.
+        """
+        if self._total_time is _UNKNOWN:
+            time_data = TelemetryData(
+                self._telemetry_directory,
+                descriptor_filename=self._descriptor_filename,
+                telemetry_only=True)
+            packet = next(time_data)
+            if packet.laps_in_event == 0:
+                while packet.race_state == 1:
+                    packet = next(time_data)
+                self._total_time = ceil(packet.event_time_remaining)
+            else:
+                self._total_time = None
 
-            self._starting_grid = [
-                entry for entry in self._starting_grid
-                if entry is not None]
+        return self._total_time
 
-            return self._starting_grid
+    @total_time.setter
+    def total_time(self, value):
+        self._total_time = value
 
     def driver_world_position(self, index):
         return self._next_packet.participant_info[index].world_position
@@ -200,9 +228,11 @@ class RaceData:
                 while self._next_packet is None \
                         or self._next_packet.packet_type != 0:
                     self._next_packet = next(self.telemetry_data)
+                    self._position += 1
             except StopIteration:
                 self._next_packet = self._last_packet
                 raise
+            self.version += 1
 
             if (self._next_packet is not None
                     and self._last_packet is None) \
@@ -231,20 +261,48 @@ class RaceData:
                 for key in current_drivers.keys():
                     self.drivers[key].index = current_drivers[key].index
 
-            self.track = Track(self._next_packet.track_length)
+                self._index_drivers()
+
+                if not self._starting_grid:
+                    self._set_starting_grid(current_drivers)
+
+            if self.track is None or self.track.track_length \
+                    != self._next_packet.track_length:
+                self.track = track_registry().track(
+                    self._next_packet.track_length)
             self._add_sector_times(self._next_packet)
             self._calc_elapsed_time()
+            self._take_snapshot()
 
             if at_time is None or self.elapsed_time >= at_time:
                 return self._next_packet
 
+    def seek(self, time):
+        """
+        Moves to the first telemetry packet at or after `time` seconds
+        of elapsed time, backward or forward. The race is restored from
+        the latest snapshot before `time` and read forward from there.
+        """
+        index = bisect_right(self._snapshot_times, time) - 1
+        if index < 0:
+            index = 0
+
+        if time < self.elapsed_time \
+                or (self._snapshots
+                    and self._snapshot_times[index] > self.elapsed_time):
+            self._restore_snapshot(self._snapshots[index])
+
+        if self.elapsed_time < time:
+            return self.get_data(time)
+        return self._next_packet
+
     def _add_sector_times(self, packet):
         for index, participant_info in enumerate(
                 packet.participant_info[:packet.num_participants]):
-            driver_name = None
-            for driver in self.drivers.values():
-                if driver.index == index:
-                    driver_name = driver.name
+            driver = self._driver(index)
+            if driver is None:
+                continue
+            driver_name = driver.name
 
             if participant_info.sector == 1:
                 sector = 3
@@ -269,7 +327,7 @@ class RaceData:
 
             if self.track.at_pit_exit(participant_info.world_position) \
                     and driver_name in self._stopped_drivers:
-                self.drivers[driver_name].stops += 1
+                driver.stops += 1
                 self._stopped_drivers.remove(driver_name)
 
             sector_time = SectorTime(
@@ -277,7 +335,7 @@ class RaceData:
                 sector,
                 participant_info.invalid_lap)
 
-            self.drivers[driver_name].add_sector_time(sector_time)
+            driver.add_sector_time(sector_time)
 
     def _best_sector(self, sector):
         try:
@@ -300,11 +358,82 @@ class RaceData:
             self.elapsed_time = 0.0
             self._last_packet = None
         else:
-            driver = next(
-                driver for driver in self.drivers.values()
-                if driver.index == self._next_packet.viewed_participant_index)
+            driver = self._driver(self._next_packet.viewed_participant_index)
+            if driver is None:
+                # The race cannot be followed without the viewed driver.
+                raise StopIteration
             self.elapsed_time = \
-                sum(driver.lap_times) + self._next_packet.current_time
+                driver.completed_lap_time + self._next_packet.current_time
+
+    def _driver(self, index):
+        """Returns the driver at a participant index, or None."""
+        try:
+            return self._driver_table[index] if index >= 0 else None
+        except IndexError:
+            return None
+
+    def _index_drivers(self):
+        """
+        Builds the tables of drivers by participant index, after the
+        drivers change.
+        """
+        self._drivers_by_index = sorted(
+            self.drivers.values(),
+            key=lambda x: x.index)
+
+        self._driver_table = [None] * (
+            self._drivers_by_index[-1].index + 1
+            if self._drivers_by_index else 0)
+        for driver in self._drivers_by_index:
+            self._driver_table[driver.index] = driver
+
+    def _restore_snapshot(self, snapshot):
+        self.capture.seek(snapshot.sequence + 1)
+        self.telemetry_data = self.capture
+        self._position = 0
+        self.version += 1
+
+        self.elapsed_time = snapshot.elapsed_time
+        self._last_packet = snapshot.last_packet
+        self._next_packet = snapshot.next_packet
+        self.track = snapshot.track
+        self.drivers = {
+            name: driver.copy() for name, driver in snapshot.drivers.items()}
+        self._dropped_drivers = {
+            name: driver.copy()
+            for name, driver in snapshot.dropped_drivers.items()}
+        self._stopped_drivers = set(snapshot.stopped_drivers)
+        self._index_drivers()
+
+    def _take_snapshot(self):
+        if self._snapshot_interval is None \
+                or (self._snapshots
+                    and self.elapsed_time < self._snapshot_times[-1]
+                    + self._snapshot_interval):
+            return
+
+        self._snapshots.append(_Snapshot(
+            self.capture.sequences[self._position - 1],
+            self.elapsed_time,
+            self._last_packet,
+            self._next_packet,
+            self.track,
+            {name: driver.copy() for name, driver in self.drivers.items()},
+            {name: driver.copy()
+             for name, driver in self._dropped_drivers.items()},
+            frozenset(self._stopped_drivers)))
+        self._snapshot_times.append(self.elapsed_time)
+
+    def _set_starting_grid(self, drivers):
+        drivers = sorted(drivers.values(), key=lambda x: x.index)
+        self._starting_grid = [
+            StartingGridEntry(
+                participant_info.race_position,
+                index,
+                drivers[index].name)
+            for index, participant_info
+            in enumerate(self._next_packet.participant_info)
+            if index < len(drivers)]
 
     @staticmethod
     def _get_drivers(telemetry_data, count):
@@ -381,8 +510,23 @@ class ClassificationEntry:
 class Driver:
     """
     Represents a driver in the race.
+
+    The lap times, best times and race time are kept as running totals
+    of the sector times, so reading them does not go over the whole
+    race. Only the last sector times can still change, when their lap
+    is invalidated, so the totals are brought up to date with the
+    others as they are read.
     """
-    _invalidate_next_sector_count = 0
+    __slots__ = (
+        'index', 'name', 'sector_times', 'stops',
+        '_invalidate_next_sector_count',
+        '_settled', '_first_lap', '_settled_lap_times',
+        '_settled_lap_invalid', '_settled_lap_total', '_best_settled_lap',
+        '_best_settled_sectors', '_timed', '_race_time')
+
+    # Sector times that may still change: the last two are invalidated
+    # with their lap, and the last is replaced when its validity does.
+    _OPEN_SECTORS = 3
 
     def __init__(self, index, name):
         self.index = index
@@ -390,12 +534,25 @@ class Driver:
 
         self.sector_times = list()
         self.stops = 0
+        self._invalidate_next_sector_count = 0
+
+        self._settled = 0
+        self._first_lap = None
+        self._settled_lap_times = list()
+        self._settled_lap_invalid = list()
+        self._settled_lap_total = 0
+        self._best_settled_lap = None
+        self._best_settled_sectors = dict()
+        self._timed = 0
+        self._race_time = 0
 
     @property
     def best_lap(self):
+        self._settle()
         valid_laps = list()
-        for invalid, time in zip(
-                self._lap_invalid(), self._lap_times()):
+        if self._best_settled_lap is not None:
+            valid_laps.append(self._best_settled_lap)
+        for time, invalid in self._open_laps():
             if not invalid:
                 valid_laps.append(time)
 
@@ -416,6 +573,13 @@ class Driver:
     def best_sector_3(self):
         return self._best_sector(3)
 
+    @property
+    def completed_lap_time(self):
+        """Total time of the complete laps, from the first sector 1."""
+        self._settle()
+        return self._settled_lap_total + sum([
+            time for time, _ in self._open_laps() if time is not None])
+
     @property
     def laps_complete(self):
         return len(self.sector_times) // 3
@@ -426,21 +590,62 @@ class Driver:
 
     @property
     def last_lap_invalid(self):
+        self._settle()
+        open_laps = self._open_laps()
+        if open_laps:
+            return open_laps[-1][1]
         try:
-            return self._lap_invalid()[-1]
+            return self._settled_lap_invalid[-1]
         except IndexError:
             return None
 
     @property
     def last_lap_time(self):
+        self._settle()
+        open_laps = self._open_laps()
+        if open_laps:
+            return open_laps[-1][0]
         try:
-            return self._lap_times()[-1]
+            return self._settled_lap_times[-1]
         except IndexError:
             return None
 
     @property
     def race_time(self):
-        return sum([sector_time.time for sector_time in self.sector_times])
+        # Sector times are never changed once added, only their
+        # validity, so the sum is extended rather than recomputed.
+        for sector_time in self.sector_times[self._timed:]:
+            self._race_time += sector_time.time
+            self._timed += 1
+        return self._race_time
+
+    def copy(self):
+        """
+        Returns a copy of the driver, which later sector times do not
+        change.
+        """
+        driver = Driver(self.index, self.name)
+        # Only the last two sector times are changed once added, when
+        # their lap is invalidated; earlier ones are shared.
+        driver.sector_times = self.sector_times[:-2] + [
+            SectorTime(sector_time.time, sector_time.sector,
+                       sector_time.invalid)
+            for sector_time in self.sector_times[-2:]]
+        driver.stops = self.stops
+        driver._invalidate_next_sector_count = \
+            self._invalidate_next_sector_count
+
+        driver._settled = self._settled
+        driver._first_lap = self._first_lap
+        driver._settled_lap_times = list(self._settled_lap_times)
+        driver._settled_lap_invalid = list(self._settled_lap_invalid)
+        driver._settled_lap_total = self._settled_lap_total
+        driver._best_settled_lap = self._best_settled_lap
+        driver._best_settled_sectors = dict(self._best_settled_sectors)
+        driver._timed = self._timed
+        driver._race_time = self._race_time
+
+        return driver
 
     def add_sector_time(self, sector_time):
         if sector_time.time == -123.0:
@@ -471,12 +676,17 @@ class Driver:
                 self._invalidate_lap(sector_time)
 
     def _best_sector(self, sector):
+        self._settle()
+        times = [
+            sector_time.time
+            for sector_time in self.sector_times[self._settled:]
+            if not sector_time.invalid
+            and sector_time.sector == sector]
+        if sector in self._best_settled_sectors:
+            times.append(self._best_settled_sectors[sector])
+
         try:
-            return min([
-                sector_time.time
-                for sector_time in self.sector_times
-                if not sector_time.invalid
-                and sector_time.sector == sector])
+            return min(times)
         except ValueError:
             return None
 
@@ -494,53 +704,85 @@ class Driver:
         else:
             raise ValueError("Invalid Sector Number")
 
-    def _lap_times(self):
-        """
-        Check to see if the first sector in the list is sector 1.
-        Trim if not.
-        """
-        sector_times = self.sector_times
+    @staticmethod
+    def _lap(sector_times):
+        """Returns the time and validity of the sector times of a lap."""
         try:
-            while sector_times[0].sector != 1:
-                sector_times = sector_times[1:]
-        except IndexError:
-            pass
+            time = sum([sector.time for sector in sector_times])
+        except TypeError:
+            time = None
+        return time, any([sector.invalid for sector in sector_times])
 
-        times = [sector.time for sector in sector_times]
-        lap_times = list()
-        for lap in zip(*[iter(times)]*3):
-            try:
-                lap_times.append(sum(lap))
-            except TypeError:
-                lap_times.append(None)
-        return lap_times
+    def _lap_times(self):
+        self._settle()
+        return self._settled_lap_times + [
+            time for time, _ in self._open_laps()]
 
     def _lap_invalid(self):
+        self._settle()
+        return self._settled_lap_invalid + [
+            invalid for _, invalid in self._open_laps()]
+
+    def _open_laps(self):
         """
-        Check to see if the first sector in the list is sector 1.
-        Trim if not.
+        Returns the time and validity of the complete laps that are not
+        yet settled, see _settle. Laps start from the first sector 1.
         """
-        sector_times = self.sector_times
-        try:
-            while sector_times[0].sector != 1:
-                sector_times = sector_times[1:]
-        except IndexError:
-            pass
-
-        invalids = [sector.invalid for sector in sector_times]
-        lap_validity = list()
-        for lap in zip(*[iter(invalids)]*3):
-            try:
-                lap_validity.append(any(lap))
-            except TypeError:
-                lap_validity.append(None)
-        return lap_validity
+        first_lap = self._first_lap
+        if first_lap is None:
+            first_lap = next(
+                (position for position in range(
+                    self._settled,
+                    len(self.sector_times))
+                 if self.sector_times[position].sector == 1),
+                None)
+            if first_lap is None:
+                return list()
+
+        start = first_lap + 3 * len(self._settled_lap_times)
+        return [
+            self._lap(self.sector_times[position:position + 3])
+            for position in range(start, len(self.sector_times) - 2, 3)]
+
+    def _settle(self):
+        """
+        Adds the sector times that can no longer change to the running
+        totals.
+        """
+        settled = len(self.sector_times) - self._OPEN_SECTORS
+        for position in range(self._settled, settled):
+            sector_time = self.sector_times[position]
+
+            if not sector_time.invalid:
+                best = self._best_settled_sectors.get(sector_time.sector)
+                if best is None or sector_time.time < best:
+                    self._best_settled_sectors[sector_time.sector] = \
+                        sector_time.time
+
+            if self._first_lap is None and sector_time.sector == 1:
+                self._first_lap = position
+            if self._first_lap is not None \
+                    and (position - self._first_lap) % 3 == 2:
+                time, invalid = self._lap(
+                    self.sector_times[position - 2:position + 1])
+                self._settled_lap_times.append(time)
+                self._settled_lap_invalid.append(invalid)
+                if time is not None:
+                    self._settled_lap_total += time
+                if not invalid and (
+                        self._best_settled_lap is None
+                        or time < self._best_settled_lap):
+                    self._best_settled_lap = time
+
+            self._settled = position + 1
 
 
 class SectorTime:
     """
     Represents a sector time.
     """
+    __slots__ = ('time', 'sector', 'invalid')
+
     def __init__(self, time, sector, invalid):
         self.time = time
         self.sector = sector
@@ -560,31 +802,56 @@ class StartingGridEntry:
 class TelemetryData:
     """
     Reads a directory of telemetry data and returns it as requested.
+
+    The telemetry may be stored either as one `pdata` file per packet
+    or as a single capture log. A capture log may be given directly,
+    in which case the descriptor is stored alongside it.
+
+    A packet index is kept beside the capture, so that reading can
+    start directly at the race start and packets that are not needed
+    are never read.
+
+    Packets are decoded through `registry`, which counts the packets
+    it cannot decode, see PacketRegistry. Telemetry packets are decoded
+    lazily unless `lazy` is False, see TelemetryDataPacket.
+
+    Up to `read_ahead` packets are read on background threads ahead of
+    decoding, see PacketSource.read_ahead.
+
+    The sequence numbers of the packets returned are kept in
+    `sequences`, in order, so that reading can later resume after any
+    of them, see seek.
     """
     def __init__(self, telemetry_directory, *,
                  reverse=False,
-                 descriptor_filename='descriptor.json'):
-        if not os.path.isdir(telemetry_directory):
-            raise NotADirectoryError
-
-        self.packet_count = len(
-            glob(telemetry_directory + os.sep + 'pdata*'))
-        descriptor = None
-        try:
-            with open(os.path.join(
-                os.path.realpath(telemetry_directory),
-                os.path.relpath(descriptor_filename))) \
-                    as descriptor_file:
-                descriptor = json.load(descriptor_file)
-        except (FileNotFoundError, ValueError):
-            descriptor = self._build_descriptor(
-                telemetry_directory,
-                descriptor_filename)
-        finally:
-            self._telemetry_data = self._get_telemetry_data(
-                telemetry_directory,
-                descriptor,
-                reverse=reverse)
+                 descriptor_filename='descriptor.json',
+                 telemetry_only=False,
+                 lazy=True,
+                 read_ahead=READ_AHEAD_DEPTH):
+        self.registry = packet_registry(lazy=lazy)
+        self._read_ahead = read_ahead
+        self._source = packet_source(telemetry_directory)
+        self.directory = self._source.directory
+        self.index = PacketIndex.open(self._source)
+        self.packet_count = len(self.index)
+
+        descriptor_path = os.path.join(
+            self._source.directory,
+            os.path.relpath(descriptor_filename))
+        descriptor = load_descriptor(descriptor_path)
+        if descriptor is not None \
+                and descriptor_version(descriptor) < DESCRIPTOR_VERSION:
+            descriptor = self._migrate_descriptor(descriptor, descriptor_path)
+        if descriptor is None or not self._valid_descriptor(descriptor):
+            descriptor = self._build_descriptor(descriptor_path)
+        self.descriptor = descriptor
+
+        self._telemetry_only = telemetry_only
+        self.sequences = array('q')
+        self._telemetry_data = self._get_telemetry_data(
+            descriptor,
+            reverse=reverse,
+            telemetry_only=telemetry_only)
 
     def __iter__(self):
         return self
@@ -592,133 +859,169 @@ class TelemetryData:
     def __next__(self):
         return next(self._telemetry_data)
 
-    def _build_descriptor(self, telemetry_directory, descriptor_filename):
-        descriptor = {
-            'race_end': None,
-            'race_finish': None,
-            'race_start': None}
+    def seek(self, sequence):
+        """
+        Continues reading forward from the packet at `sequence`, which
+        must be within the race. The packets are returned as they are,
+        without waiting for the participants to be populated, and
+        `sequences` starts again.
+        """
+        self._telemetry_data.close()
+        self.sequences = array('q')
+        self._telemetry_data = self._get_telemetry_data(
+            self.descriptor,
+            telemetry_only=self._telemetry_only,
+            start=sequence)
+
+    def _build_descriptor(self, descriptor_path):
+        """
+        Builds the descriptor of the last complete race from the packet
+        index and writes it.
+        """
+        boundaries = self.index.descriptor()
+        if boundaries is None:
+            raise ValueError("No complete race in telemetry data.")
 
-        telemetry_data = self._get_telemetry_data(telemetry_directory)
-        progress = tqdm(
-            desc='Detecting Race End',
-            total=self.packet_count,
-            unit='packets')
+        descriptor = make_descriptor({
+            name: (sequence, self._packet_checksum(sequence))
+            for name, sequence in boundaries.items()})
+        save_descriptor(descriptor_path, descriptor)
 
-        old_packet = None
-        try:
-            while True:
-                while True:
-                    packet = next(telemetry_data)
-                    progress.update()
-                    if packet.packet_type == 0 and packet.race_state == 3:
-                        break
-
-                # Exhaust packets until the race end.
-                # TODO: Support for other ways to finish a race?
-                while True:
-                    try:
-                        old_packet = packet
-                        packet = next(telemetry_data)
-                        progress.update()
-                        if packet.packet_type == 0 and packet.race_state != 3:
-                            break
-                    except StopIteration:
-                        old_packet = packet
-                        break
-
-        except StopIteration:
-            progress.close()
-            descriptor['race_end'] = old_packet.data_hash
-
-        telemetry_data = self._get_telemetry_data(
-            telemetry_directory,
-            reverse=True)
-        progress = tqdm(
-            desc='Analyzing Telemetry Data',
-            total=self.packet_count,
-            unit='packets')
+        return descriptor
 
-        # Exhaust packets until the race end.
-        while True:
-            packet = next(telemetry_data)
-            progress.update()
-            if packet.data_hash == descriptor['race_end']:
-                break
+    def _migrate_descriptor(self, descriptor, descriptor_path):
+        """
+        Rewrites a version 1 descriptor, which identifies packets by
+        md5 hash, as a version 2 descriptor. Returns None if the
+        packets cannot be found in the capture.
+        """
+        guess = self.index.descriptor() or dict()
 
-        # Exhaust packets after the race finish.
-        while True:
-            packet = next(telemetry_data)
-            progress.update()
-            if packet.packet_type == 0 and packet.race_state == 2:
-                break
+        race_start = self._find_packet(
+            descriptor['race_start'],
+            guess.get('race_start'),
+            self.index.telemetry())
+        if race_start is None:
+            return None
 
-        descriptor['race_finish'] = packet.data_hash
+        race_finish = self._find_packet(
+            descriptor['race_finish'],
+            guess.get('race_finish'),
+            self.index.telemetry(race_start+1))
+        race_end = self._find_packet(
+            descriptor['race_end'],
+            guess.get('race_end'),
+            self.index[race_start+1:])
+        if race_finish is None or race_end is None:
+            return None
 
-        # Exhaust packets after the green flag.
-        while True:
-            packet = next(telemetry_data)
-            progress.update()
-            if packet.packet_type == 0 and (
-                    packet.race_state == 0 or
-                    packet.race_state == 1):
-                break
-
-        old_packet = packet
-        # Exhaust packets after the race start, except one.
+        descriptor = make_descriptor({
+            name: (sequence, self._packet_checksum(sequence))
+            for name, sequence in (
+                ('race_end', race_end),
+                ('race_finish', race_finish),
+                ('race_start', race_start))})
         try:
-            while True:
-                if packet.packet_type == 0:
-                    old_packet = packet
-                packet = next(telemetry_data)
-                progress.update()
-                if packet.packet_type == 0 and (
-                        packet.session_state != 5 or
-                        packet.game_state != 2):
-                    break
-        # None found (no restarts?) so use the first packet.
-        # It is already on `old_packet`.
-        except StopIteration:
+            save_descriptor(descriptor_path, descriptor)
+        except OSError:
             pass
 
-        progress.close()
-        descriptor['race_start'] = old_packet.data_hash
+        return descriptor
 
-        with open(os.path.join(
-            os.path.realpath(telemetry_directory),
-            os.path.relpath(descriptor_filename)), 'w') \
-                as descriptor_file:
-            json.dump(descriptor, descriptor_file)
+    def _valid_descriptor(self, descriptor):
+        """
+        Returns True if the packets of a version 2 descriptor are in
+        the capture and match their checksums.
+        """
+        try:
+            sequences = [descriptor[name]['sequence'] for name in BOUNDARIES]
+            if not all(
+                    0 <= sequence < self.packet_count
+                    for sequence in sequences):
+                return False
+
+            return all(
+                self._packet_checksum(descriptor[name]['sequence'])
+                == descriptor[name]['checksum']
+                for name in BOUNDARIES
+                if 'checksum' in descriptor[name])
+        except (KeyError, TypeError):
+            return False
+
+    def _find_packet(self, data_hash, guess, entries):
+        """
+        Returns the sequence number of the first packet of the entries
+        with the given md5 hash, trying the guessed sequence number
+        first.
+        """
+        if guess is not None and self._packet_hash(guess) == data_hash:
+            return guess
 
-        return descriptor
+        for entry in entries:
+            if self._packet_hash(entry.sequence) == data_hash:
+                return entry.sequence
 
-    @staticmethod
-    def _get_telemetry_data(telemetry_directory, descriptor=None, *,
-                            reverse=False):
-        find_start = False if descriptor is None else True
-        find_populate = False
-
-        for packet in natsorted(
-                glob(telemetry_directory+os.sep+'pdata*'),
-                reverse=reverse):
-            with open(packet, 'rb') as packet_file:
-                packet_data = packet_file.read()
-
-            if descriptor is not None \
-                    and md5(packet_data).hexdigest() == descriptor['race_end']:
-                raise StopIteration
+        return None
+
+    def _packet_data(self, sequence):
+        entry = self.index[sequence]
+        return self._source.read(entry.sequence, entry.offset, entry.length)
+
+    def _packet_checksum(self, sequence):
+        return packet_checksum(self._packet_data(sequence))
 
-            if find_start and \
-                    md5(packet_data).hexdigest() == \
-                    descriptor['race_start']:
-                find_start = False
-                find_populate = True
-            elif find_start and \
-                    md5(packet_data).hexdigest() != \
-                    descriptor['race_start']:
+    def _packet_hash(self, sequence):
+        return md5(self._packet_data(sequence)).hexdigest()
+
+    def _race_packets(self, descriptor, *,
+                      reverse=False, packet_types=None, start=None):
+        """
+        Returns an iterator of the sequence number and data of the
+        packets between the race start, or `start`, and race end, using
+        the index to skip the rest of the capture and packets of other
+        types. Packets are read ahead of the consumer, see read_ahead.
+        """
+        if start is None:
+            start = descriptor['race_start']['sequence']+1
+        entries = self.index[start:descriptor['race_end']['sequence']]
+        if reverse:
+            entries.reverse()
+
+        if packet_types is not None:
+            entries = [
+                entry for entry in entries
+                if entry.packet_type == UNKNOWN_PACKET_TYPE
+                or entry.packet_type in packet_types]
+
+        return zip(
+            [entry.sequence for entry in entries],
+            read_ahead(
+                self._source,
+                ((entry.sequence, entry.offset, entry.length)
+                 for entry in entries),
+                depth=self._read_ahead))
+
+    def _get_telemetry_data(self, descriptor=None, *,
+                            reverse=False, telemetry_only=False, start=None):
+        packet_types = {0} if telemetry_only else None
+        if descriptor is not None:
+            packets = self._race_packets(
+                descriptor,
+                reverse=reverse,
+                packet_types=packet_types,
+                start=start)
+        else:
+            sequences = range(self.packet_count)
+            packets = zip(
+                reversed(sequences) if reverse else sequences,
+                self._source.packets(reverse=reverse))
+        find_populate = descriptor is not None and start is None
+
+        for sequence, packet_data in packets:
+            packet = self.registry.decode(packet_data, packet_types)
+            if packet is None:
                 continue
-            elif find_populate and \
-                    len(packet_data) == 1367:
-                packet = TelemetryDataPacket(packet_data)
+            elif find_populate and packet.packet_type == 0:
                 """
                 TODO: Make sure this is actually correct. I think it's due
                 to network lag during race loading.
@@ -734,10 +1037,8 @@ class TelemetryData:
                     continue
                 else:
                     find_populate = False
+                    self.sequences.append(sequence)
                     yield packet
-            elif len(packet_data) == 1367:
-                yield TelemetryDataPacket(packet_data)
-            elif len(packet_data) == 1347:
-                yield ParticipantPacket(packet_data)
-            elif len(packet_data) == 1028:
-                yield AdditionalParticipantPacket(packet_data)
+            else:
+                self.sequences.append(sequence)
+                yield packet
@@ -0,0 +1,129 @@
+"""
+Provides a single pass over the telemetry of a race that feeds every
+consumer of race-wide information at once.
+
+Making a video needs the duration of the telemetry, the points to
+synchronize the video to, the starting grid, the final classification
+and the length of a timed race. Each used to be found by reading and
+decoding the capture again; RacePipeline reads it once.
+"""
+from math import ceil
+
+from tqdm import tqdm
+
+
+class RacePipeline:
+    """
+    Reads a race once through a RaceData, passing it to each consumer
+    after every telemetry packet.
+
+    A consumer has an `update(race_data)` method, called with the race
+    data at each telemetry packet from the first, and a
+    `finish(race_data)` method, called once the race is read.
+
+    Once run, the RaceData holds the starting grid and the final
+    classification of the race.
+
+    Parameters
+    ----------
+    race_data : RaceData
+        The race data to read. It is read to the end.
+    consumers : iterable, optional
+        The consumers of the race data.
+    """
+    def __init__(self, race_data, consumers=()):
+        self.race_data = race_data
+        self.consumers = list(consumers)
+
+    def run(self):
+        """Reads the race, feeding each consumer."""
+        with tqdm(desc="Reading Telemetry Data", unit='packets') as progress:
+            while True:
+                for consumer in self.consumers:
+                    consumer.update(self.race_data)
+                progress.update()
+
+                try:
+                    self.race_data.get_data()
+                except StopIteration:
+                    break
+
+        for consumer in self.consumers:
+            consumer.finish(self.race_data)
+
+        return self
+
+
+class Duration:
+    """Finds the duration of the race telemetry, in seconds."""
+    def __init__(self):
+        self.duration = None
+
+    def update(self, race_data):
+        pass
+
+    def finish(self, race_data):
+        self.duration = race_data.elapsed_time
+
+
+class SyncPoints:
+    """
+    Finds the times to cut the video at when synchronizing it, from
+    `lead_in` seconds before the first driver completes a lap to
+    `lead_out` seconds after the last driver does.
+
+    If a driver never completes a lap, the video is cut `fallback`
+    seconds after the start.
+    """
+    def __init__(self, *, lead_in=10, lead_out=10, fallback=60):
+        self._lead_in = lead_in
+        self._lead_out = lead_out
+        self._fallback = fallback
+
+        self.start_time = None
+        self.end_time = None
+
+    def update(self, race_data):
+        if self.end_time is not None:
+            return
+
+        laps_complete = [
+            driver.laps_complete > 0
+            for driver in race_data.drivers.values()]
+        if self.start_time is None and any(laps_complete):
+            self.start_time = race_data.elapsed_time - self._lead_in
+        if self.start_time is not None and all(laps_complete):
+            self.end_time = race_data.elapsed_time + self._lead_out
+
+    def finish(self, race_data):
+        if self.start_time is None:
+            self.start_time = 0.0
+        if self.end_time is None:
+            self.end_time = self.start_time + self._fallback
+
+
+class TotalTime:
+    """
+    Finds the length of a timed race in seconds from the first packet
+    after the race start, or None if the race is over a number of
+    laps. See RaceData.total_time.
+    """
+    def __init__(self):
+        self.total_time = None
+        self._timed = None
+        self._found = False
+
+    def update(self, race_data):
+        if self._found:
+            return
+
+        if self._timed is None:
+            self._timed = race_data.laps_in_event == 0
+        if not self._timed:
+            self._found = True
+        elif race_data.race_state != 1:
+            self.total_time = ceil(race_data.event_time_remaining)
+            self._found = True
+
+    def finish(self, race_data):
+        pass
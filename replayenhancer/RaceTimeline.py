@@ -0,0 +1,395 @@
+"""
+Provides a persistent timeline of the state of a race.
+
+Reading a race through RaceData decodes every packet of the capture,
+which takes far longer than anything else when a video is re-rendered
+with only its configuration changed. The timeline records what a full
+read of the race produces: the elapsed time, race state and
+classification at each telemetry packet, the sector times and stops of
+each driver and the changes to the roster of drivers. It is stored
+beside the capture and replayed in place of the telemetry.
+
+A timeline is keyed by the identity of the capture, its descriptor and
+packet count, and by the version of the code that recorded it, so it is
+recorded again when either changes.
+"""
+import json
+import os
+from binascii import hexlify, unhexlify
+from functools import lru_cache
+from hashlib import md5
+
+from replayenhancer.RaceData import ClassificationEntry, Driver, \
+    SectorTime, StartingGridEntry
+
+TIMELINE_FILENAME = 'race_timeline.json'
+
+_VERSION = 1
+
+# The sources that determine the recorded state of a race, including
+# the decoders of the packets it is read from.
+_CODE_FILES = ('RaceData.py', 'RaceTimeline.py', 'Track.py',
+               'TrackRegistry.py', 'lib/track_data.json', 'Packet.py',
+               'PacketRegistry.py', 'TelemetryDataPacket.py',
+               'ParticipantPacket.py', 'AdditionalParticipantPacket.py')
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Returns the version of the code that reads races, a hash of its
+    sources.
+    """
+    code_hash = md5(str(_VERSION).encode('utf-8'))
+    for filename in _CODE_FILES:
+        try:
+            with open(os.path.join(
+                    os.path.dirname(__file__),
+                    filename), 'rb') as code_file:
+                code_hash.update(code_file.read())
+        except FileNotFoundError:
+            pass
+
+    return code_hash.hexdigest()
+
+
+def capture_identity(telemetry_data):
+    """Returns the identity of the capture read by a TelemetryData."""
+    return {
+        'descriptor': telemetry_data.descriptor,
+        'packet_count': telemetry_data.packet_count}
+
+
+class RaceTimeline:
+    """
+    Recorded state of a race, see TimelineRecorder.
+
+    Parameters
+    ----------
+    identity : dict
+        The identity of the capture, see capture_identity.
+    laps_in_event : int
+        The number of laps in the race, 0 for a timed race.
+    starting_grid : list
+        (position, driver index, driver name) of each starting driver.
+    packets : list
+        (elapsed time, race state, event time remaining, viewed driver
+        index, race positions by driver index) at each telemetry
+        packet. The race positions are stored as a hex string of bytes,
+        which is far quicker to load than a list.
+    names : list
+        The name of each driver, by driver number. A driver who leaves
+        the race and returns is given a new number.
+    rosters : list
+        (packet, [(driver number, driver index), ...]) at each change
+        to the roster of drivers.
+    sector_times : list
+        (packet, driver number, position, time, sector, invalid) at
+        each change to the sector times of a driver, where position is
+        the position of the sector time in the driver's list.
+    stops : list
+        (packet, driver number, stops) at each change to the number of
+        stops of a driver.
+    """
+    def __init__(self, identity, *, laps_in_event, starting_grid, packets,
+                 names, rosters, sector_times, stops):
+        self.identity = identity
+        self.laps_in_event = laps_in_event
+        self.starting_grid = starting_grid
+        self.packets = packets
+        self.names = names
+        self.rosters = rosters
+        self.sector_times = sector_times
+        self.stops = stops
+
+    def __len__(self):
+        return len(self.packets)
+
+    @classmethod
+    def load(cls, filename, identity):
+        """
+        Loads a timeline. Returns None if it does not exist, is
+        unreadable, or was recorded from another capture or by another
+        version of the code.
+        """
+        try:
+            with open(filename) as timeline_file:
+                timeline = json.load(timeline_file)
+            if timeline['code_version'] != code_version() \
+                    or timeline['identity'] != identity:
+                return None
+
+            return cls(
+                timeline['identity'],
+                laps_in_event=timeline['laps_in_event'],
+                starting_grid=timeline['starting_grid'],
+                packets=timeline['packets'],
+                names=timeline['names'],
+                rosters=timeline['rosters'],
+                sector_times=timeline['sector_times'],
+                stops=timeline['stops'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, filename):
+        """Writes the timeline to a file, replacing it atomically."""
+        temporary_filename = filename + '.tmp'
+        with open(temporary_filename, 'w') as timeline_file:
+            json.dump({
+                'code_version': code_version(),
+                'identity': self.identity,
+                'laps_in_event': self.laps_in_event,
+                'starting_grid': self.starting_grid,
+                'packets': self.packets,
+                'names': self.names,
+                'rosters': self.rosters,
+                'sector_times': self.sector_times,
+                'stops': self.stops}, timeline_file)
+        os.replace(temporary_filename, filename)
+
+    def replay(self):
+        """Returns a TimelineData at the first packet of the timeline."""
+        return TimelineData(self)
+
+
+class TimelineData:
+    """
+    Replays a RaceTimeline in place of a RaceData, for consumers of
+    the race-wide state of a race such as RacePipeline.
+
+    It provides the drivers, elapsed time, race state and
+    classification of a RaceData but none of its telemetry.
+    """
+    def __init__(self, timeline):
+        self._timeline = timeline
+        self._packet = -1
+        self._rosters = iter(timeline.rosters)
+        self._sector_times = iter(timeline.sector_times)
+        self._stops = iter(timeline.stops)
+        self._next_roster = next(self._rosters, None)
+        self._next_sector_time = next(self._sector_times, None)
+        self._next_stops = next(self._stops, None)
+
+        self._drivers = dict()
+        self._by_index = list()
+        self.drivers = dict()
+        self._dropped_drivers = dict()
+
+        self.starting_grid = [
+            StartingGridEntry(*entry) for entry in timeline.starting_grid]
+        self.laps_in_event = timeline.laps_in_event
+        self.total_time = None
+
+        self.get_data()
+
+    @property
+    def all_driver_classification(self):
+        classification = self.classification
+        for driver in self._dropped_drivers.values():
+            classification.append(ClassificationEntry(None, driver, False))
+
+        position = 0
+        for entry in sorted(
+                classification,
+                key=lambda x: (-x.driver.laps_complete, x.driver.race_time)):
+            position += 1
+            entry.position = position
+
+        return classification
+
+    @property
+    def classification(self):
+        return [
+            ClassificationEntry(
+                position,
+                self._by_index[index],
+                self._viewed_index == index)
+            for index, position in enumerate(self._positions)]
+
+    @property
+    def elapsed_time(self):
+        return self._state[0]
+
+    @property
+    def event_time_remaining(self):
+        return self._state[2]
+
+    @property
+    def race_state(self):
+        return self._state[1]
+
+    @property
+    def _positions(self):
+        return unhexlify(self._state[4])
+
+    @property
+    def _state(self):
+        return self._timeline.packets[self._packet]
+
+    @property
+    def _viewed_index(self):
+        return self._state[3]
+
+    def get_data(self, at_time=None):
+        """
+        Advances to the next packet of the timeline, or to the first
+        packet at or after `at_time`.
+        """
+        while True:
+            if self._packet + 1 >= len(self._timeline):
+                raise StopIteration
+            self._packet += 1
+
+            while self._next_roster is not None \
+                    and self._next_roster[0] == self._packet:
+                self._set_roster(self._next_roster[1])
+                self._next_roster = next(self._rosters, None)
+
+            while self._next_sector_time is not None \
+                    and self._next_sector_time[0] == self._packet:
+                _, number, position, time, sector, invalid = \
+                    self._next_sector_time
+                sector_times = self._drivers[number].sector_times
+                sector_time = SectorTime(time, sector, invalid)
+                if position < len(sector_times):
+                    sector_times[position] = sector_time
+                else:
+                    sector_times.append(sector_time)
+                self._next_sector_time = next(self._sector_times, None)
+
+            while self._next_stops is not None \
+                    and self._next_stops[0] == self._packet:
+                _, number, stops = self._next_stops
+                self._drivers[number].stops = stops
+                self._next_stops = next(self._stops, None)
+
+            if at_time is None or self.elapsed_time >= at_time:
+                return self._state
+
+    def _set_roster(self, roster):
+        numbers = {number for number, _ in roster}
+        for number, driver in self._drivers.items():
+            if number not in numbers \
+                    and self.drivers.get(driver.name) is driver:
+                self._dropped_drivers[driver.name] = driver
+                del self.drivers[driver.name]
+
+        for number, index in roster:
+            if number not in self._drivers:
+                self._drivers[number] = Driver(
+                    index,
+                    self._timeline.names[number])
+            driver = self._drivers[number]
+            driver.index = index
+            self.drivers[driver.name] = driver
+
+        self._by_index = [
+            self._drivers[number]
+            for number, _ in sorted(roster, key=lambda x: x[1])]
+
+
+class TimelineRecorder:
+    """
+    Records a RaceTimeline as a consumer of RacePipeline.
+
+    Parameters
+    ----------
+    identity : dict
+        The identity of the capture, see capture_identity.
+    """
+    def __init__(self, identity):
+        self.timeline = None
+
+        self._identity = identity
+        self._laps_in_event = None
+        self._starting_grid = None
+        self._packets = list()
+        self._names = list()
+        self._rosters = list()
+        self._sector_times = list()
+        self._stops = list()
+
+        self._numbers = dict()
+        self._recorded = list()
+        self._roster = None
+
+    def update(self, race_data):
+        packet = len(self._packets)
+        if packet == 0:
+            self._laps_in_event = race_data.laps_in_event
+            self._starting_grid = [
+                (entry.position, entry.driver_index, entry.driver_name)
+                for entry in race_data.starting_grid]
+
+        roster = [
+            (self._number(driver), driver.index)
+            for driver in sorted(
+                race_data.drivers.values(),
+                key=lambda x: x.index)]
+        if roster != self._roster:
+            self._rosters.append((packet, roster))
+            self._roster = roster
+
+        for number, _ in roster:
+            self._record_driver(packet, number)
+
+        viewed_index = None
+        positions = list()
+        for index, entry in enumerate(race_data.classification):
+            positions.append(entry.position)
+            if entry.viewed_driver:
+                viewed_index = index
+
+        self._packets.append((
+            race_data.elapsed_time,
+            race_data.race_state,
+            race_data.event_time_remaining,
+            viewed_index,
+            hexlify(bytes(positions)).decode('ascii')))
+
+    def finish(self, race_data):
+        self.timeline = RaceTimeline(
+            self._identity,
+            laps_in_event=self._laps_in_event,
+            starting_grid=self._starting_grid,
+            packets=self._packets,
+            names=self._names,
+            rosters=self._rosters,
+            sector_times=self._sector_times,
+            stops=self._stops)
+
+    def _number(self, driver):
+        # Drivers are numbered by object, as a driver who leaves the
+        # race and returns is a new Driver with no history.
+        try:
+            return self._numbers[id(driver)]
+        except KeyError:
+            number = len(self._recorded)
+            self._numbers[id(driver)] = number
+            self._names.append(driver.name)
+            self._recorded.append((driver, list(), 0))
+            return number
+
+    def _record_driver(self, packet, number):
+        driver, recorded, stops = self._recorded[number]
+
+        # Only the last sector times of a driver change once added: a
+        # time is replaced when its validity changes, and the earlier
+        # sectors of a lap are marked invalid when the lap is.
+        sector_times = driver.sector_times
+        for position in range(
+                max(0, len(recorded) - 3),
+                len(sector_times)):
+            sector_time = sector_times[position]
+            entry = (sector_time.time, sector_time.sector, sector_time.invalid)
+            if position < len(recorded):
+                if recorded[position] == entry:
+                    continue
+                recorded[position] = entry
+            else:
+                recorded.append(entry)
+            self._sector_times.append((packet, number, position) + entry)
+
+        if driver.stops != stops:
+            self._stops.append((packet, number, driver.stops))
+            self._recorded[number] = (driver, recorded, driver.stops)
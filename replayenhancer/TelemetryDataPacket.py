@@ -3,38 +3,59 @@ Provides a class for the Telemetry Data packets output by
 Project CARS
 """
 
-from hashlib import md5
+from struct import Struct, calcsize
 
 from replayenhancer.Packet import Packet
 
 
+def _field_group_layout(header_format, field_groups):
+    """
+    Returns the Structs for a packet made of a header followed by field
+    groups: one for the whole packet, one for the header and one per
+    group keyed by its decoding method, and a map of each field to the
+    method decoding it.
+
+    Each group Struct skips the bytes before the group, so it unpacks
+    the group straight from the packet data with native alignment.
+    """
+    packet_format = header_format
+    group_structs = dict()
+    group_fields = dict()
+
+    for decoder, group_format, fields in field_groups:
+        group_structs[decoder] = Struct(
+            "{}x".format(calcsize(packet_format)) + group_format)
+        group_fields.update((field, decoder) for field in fields)
+        packet_format += group_format
+
+    return Struct(packet_format), Struct(header_format), group_structs, \
+        group_fields
+
+
 class ParticipantInfo:
     """
     Creates an object containing the participant info from the
     telemetry data.
     """
+    __slots__ = (
+        '_world_position', 'current_lap_distance', '_race_position',
+        '_laps_completed', 'current_lap', '_sector', 'last_sector_time')
+
     def __init__(self, unpacked_data):
-        self._world_position = list()
-        for _ in range(3):
-            self._world_position.append(int(unpacked_data.popleft()))
+        self._world_position = unpacked_data[0:3]
 
-        self.current_lap_distance = int(unpacked_data.popleft())
-        self._race_position = int(unpacked_data.popleft())
-        self._laps_completed = int(unpacked_data.popleft())
-        self.current_lap = int(unpacked_data.popleft())
-        self._sector = int(unpacked_data.popleft())
-        self.last_sector_time = float(unpacked_data.popleft())
+        self.current_lap_distance, self._race_position, \
+            self._laps_completed, self.current_lap, self._sector, \
+            self.last_sector_time = unpacked_data[3:9]
 
     @property
     def world_position(self):
         """Returns world position (high accuracy for x and z)."""
-        world_position = [float(x) for x in self._world_position]
-        world_position[0] += float(
-            ((self._sector & int('00011000', 2)) >> 3) / 4)
-        world_position[2] += float(
-            ((self._sector & int('01100000', 2)) >> 5) / 4)
-
-        return world_position
+        x, y, z = self._world_position
+        return (
+            x + ((self._sector & int('00011000', 2)) >> 3) / 4,
+            float(y),
+            z + ((self._sector & int('01100000', 2)) >> 5) / 4)
 
     @property
     def is_active(self):
@@ -88,244 +109,174 @@ class TelemetryDataPacket(Packet):
 
     The telemetry data packet has a length of 1367 and is packet type
     0.
+
+    The header fields (states, timings and the number of participants)
+    are always decoded. In lazy mode the remaining field groups are
+    decoded the first time one of their fields is accessed; otherwise
+    everything is decoded immediately.
     """
-    def __init__(self, packet_data):
-        self.data_hash = md5(packet_data).hexdigest()
-        unpacked_data = self._unpack_data(packet_data)
-
-        self.build_version_number = int(unpacked_data.popleft())
-
-        self._test_packet_type(unpacked_data.popleft())
-
-        self._game_session_state = int(unpacked_data.popleft())
-
-        self.viewed_participant_index = int(unpacked_data.popleft())
-        self.num_participants = int(unpacked_data.popleft())
-
-        self.unfiltered_throttle = int(unpacked_data.popleft())
-        self.unfiltered_brake = int(unpacked_data.popleft())
-        self.unfiltered_steering = int(unpacked_data.popleft())
-        self.unfiltered_clutch = int(unpacked_data.popleft())
-        self._race_state_flags = int(unpacked_data.popleft())
-
-        self.laps_in_event = int(unpacked_data.popleft())
-
-        self.best_lap_time = float(unpacked_data.popleft())
-        self.last_lap_time = float(unpacked_data.popleft())
-        self.current_time = float(unpacked_data.popleft())
-        self.split_time_ahead = float(unpacked_data.popleft())
-        self.split_time_behind = float(unpacked_data.popleft())
-        self.split_time = float(unpacked_data.popleft())
-        self.event_time_remaining = float(unpacked_data.popleft())
-        self.personal_fastest_lap_time = float(
-            unpacked_data.popleft())
-        self.world_fastest_lap_time = float(unpacked_data.popleft())
-        self.current_s1_time = float(unpacked_data.popleft())
-        self.current_s2_time = float(unpacked_data.popleft())
-        self.current_s3_time = float(unpacked_data.popleft())
-        self.fastest_s1_time = float(unpacked_data.popleft())
-        self.fastest_s2_time = float(unpacked_data.popleft())
-        self.fastest_s3_time = float(unpacked_data.popleft())
-        self.personal_fastest_s1_time = float(
-            unpacked_data.popleft())
-        self.personal_fastest_s2_time = float(
-            unpacked_data.popleft())
-        self.personal_fastest_s3_time = float(
-            unpacked_data.popleft())
-        self.world_fastest_s1_time = float(unpacked_data.popleft())
-        self.world_fastest_s2_time = float(unpacked_data.popleft())
-        self.world_fastest_s3_time = float(unpacked_data.popleft())
-
-        self.joypad = int(unpacked_data.popleft())
-
-        self.highest_flag = int(unpacked_data.popleft())
-
-        self.pit_mode_schedule = int(unpacked_data.popleft())
-
-        self.oil_temp = int(unpacked_data.popleft())
-        self.oil_pressure = int(unpacked_data.popleft())
-        self.water_temp = int(unpacked_data.popleft())
-        self.water_pressure = int(unpacked_data.popleft())
-        self.fuel_pressure = int(unpacked_data.popleft())
-        self.car_flags = int(unpacked_data.popleft())
-        self.fuel_capacity = int(unpacked_data.popleft())
-        self.brake = int(unpacked_data.popleft())
-        self.throttle = int(unpacked_data.popleft())
-        self.clutch = int(unpacked_data.popleft())
-        self.steering = int(unpacked_data.popleft())
-        self.fuel_level = float(unpacked_data.popleft())
-        self.speed = float(unpacked_data.popleft())
-        self.rpm = int(unpacked_data.popleft())
-        self.max_rpm = int(unpacked_data.popleft())
-        self.gear_num_gears = int(unpacked_data.popleft())
-        self.boost_amount = int(unpacked_data.popleft())
-        self.enforced_pit_stop_lap = int(unpacked_data.popleft())
-        self.crash_state = int(unpacked_data.popleft())
-
-        self.odometer = float(unpacked_data.popleft())
-        self.orientation = list()
-        self.local_velocity = list()
-        self.world_velocity = list()
-        self.angular_velocity = list()
-        self.local_acceleration = list()
-        self.world_acceleration = list()
-        self.extents_centre = list()
-        for _ in range(3):
-            self.orientation.append(float(
-                unpacked_data.popleft()))
-        for _ in range(3):
-            self.local_velocity.append(float(
-                unpacked_data.popleft()))
-        for _ in range(3):
-            self.world_velocity.append(float(
-                unpacked_data.popleft()))
-        for _ in range(3):
-            self.angular_velocity.append(float(
-                unpacked_data.popleft()))
-        for _ in range(3):
-            self.local_acceleration.append(float(
-                unpacked_data.popleft()))
-        for _ in range(3):
-            self.world_acceleration.append(float(
-                unpacked_data.popleft()))
-        for _ in range(3):
-            self.extents_centre.append(float(
-                unpacked_data.popleft()))
-
-        self.tyre_flags = list()
-        self.terrain = list()
-        self.tyre_y = list()
-        self.tyre_rps = list()
-        self.tyre_slip_speed = list()
-        self.tyre_temp = list()
-        self.tyre_grip = list()
-        self.tyre_height_above_ground = list()
-        self.tyre_lateral_stiffness = list()
-        self.tyre_wear = list()
-        self.brake_damage = list()
-        self.suspension_damage = list()
-        self.brake_temp = list()
-        self.tyre_tread_temp = list()
-        self.tyre_layer_temp = list()
-        self.tyre_carcass_temp = list()
-        self.tyre_rim_temp = list()
-        self.tyre_internal_air_temp = list()
-        self.wheel_local_position_y = list()
-        self.ride_height = list()
-        self.suspension_travel = list()
-        self.suspension_velocity = list()
-        self.air_pressure = list()
-
-        for _ in range(4):
-            self.tyre_flags.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.terrain.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_y.append(float(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_rps.append(float(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_slip_speed.append(float(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_temp.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_grip.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_height_above_ground.append(
-                float(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_lateral_stiffness.append(float(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_wear.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.brake_damage.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.suspension_damage.append(int(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.brake_temp.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_tread_temp.append(int(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_layer_temp.append(int(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_carcass_temp.append(int(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_rim_temp.append(int(unpacked_data.popleft()))
-        for _ in range(4):
-            self.tyre_internal_air_temp.append(int(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.wheel_local_position_y.append(float(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.ride_height.append(float(unpacked_data.popleft()))
-        for _ in range(4):
-            self.suspension_travel.append(float(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.suspension_velocity.append(float(
-                unpacked_data.popleft()))
-        for _ in range(4):
-            self.air_pressure.append(int(unpacked_data.popleft()))
-
-        self.engine_speed = float(unpacked_data.popleft())
-        self.engine_torque = float(unpacked_data.popleft())
-
-        self.aero_damage = int(unpacked_data.popleft())
-        self.engine_damage = int(unpacked_data.popleft())
-
-        self.ambient_temperature = int(unpacked_data.popleft())
-        self.track_temperature = int(unpacked_data.popleft())
-        self.rain_density = int(unpacked_data.popleft())
-        self.wind_speed = int(unpacked_data.popleft())
-        self.wind_direction_x = int(unpacked_data.popleft())
-        self.wind_direction_y = int(unpacked_data.popleft())
-
-        self.participant_info = list()
-        for _ in range(56):
-            self.participant_info.append(ParticipantInfo(
-                unpacked_data))
-
-        self.track_length = float(unpacked_data.popleft())
-        self.wings = list()
-        for _ in range(2):
-            self.wings.append(int(unpacked_data.popleft()))
-        self.d_pad = int(unpacked_data.popleft())
+    _header_format = "HB" "B" "bb" "BBbBB" "B" "21f"
+
+    # Field groups in packet order: decoding method, binary format and
+    # the attributes the method sets.
+    _field_groups = (
+        ('_decode_car', "H" "B" "B" "hHhHHBBBBBbffHHBBbB" "f", (
+            'joypad', 'highest_flag', 'pit_mode_schedule', 'oil_temp',
+            'oil_pressure', 'water_temp', 'water_pressure',
+            'fuel_pressure', 'car_flags', 'fuel_capacity', 'brake',
+            'throttle', 'clutch', 'steering', 'fuel_level', 'speed', 'rpm',
+            'max_rpm', 'gear_num_gears', 'boost_amount',
+            'enforced_pit_stop_lap', 'crash_state', 'odometer')),
+        ('_decode_motion', "21f", (
+            'orientation', 'local_velocity', 'world_velocity',
+            'angular_velocity', 'local_acceleration', 'world_acceleration',
+            'extents_centre')),
+        ('_decode_wheels', "8B12f8B8f12B4h20H16f4H", (
+            'tyre_flags', 'terrain', 'tyre_y', 'tyre_rps',
+            'tyre_slip_speed', 'tyre_temp', 'tyre_grip',
+            'tyre_height_above_ground', 'tyre_lateral_stiffness',
+            'tyre_wear', 'brake_damage', 'suspension_damage', 'brake_temp',
+            'tyre_tread_temp', 'tyre_layer_temp', 'tyre_carcass_temp',
+            'tyre_rim_temp', 'tyre_internal_air_temp',
+            'wheel_local_position_y', 'ride_height', 'suspension_travel',
+            'suspension_velocity', 'air_pressure')),
+        ('_decode_environment', "2f" "2B" "bbBbbb", (
+            'engine_speed', 'engine_torque', 'aero_damage',
+            'engine_damage', 'ambient_temperature', 'track_temperature',
+            'rain_density', 'wind_speed', 'wind_direction_x',
+            'wind_direction_y')),
+        ('_decode_participants', "hhhHBBBBf"*56, (
+            'participant_info',)),
+        ('_decode_track', "fBBB", (
+            'track_length', 'wings', 'd_pad')))
+
+    _packet_struct, _header_struct, _group_structs, _group_fields = \
+        _field_group_layout(_header_format, _field_groups)
+
+    __slots__ = (
+        'build_version_number', '_game_session_state',
+        'viewed_participant_index', 'num_participants',
+        'unfiltered_throttle', 'unfiltered_brake', 'unfiltered_steering',
+        'unfiltered_clutch', '_race_state_flags', 'laps_in_event',
+        'best_lap_time', 'last_lap_time', 'current_time',
+        'split_time_ahead', 'split_time_behind', 'split_time',
+        'event_time_remaining', 'personal_fastest_lap_time',
+        'world_fastest_lap_time', 'current_s1_time', 'current_s2_time',
+        'current_s3_time', 'fastest_s1_time', 'fastest_s2_time',
+        'fastest_s3_time', 'personal_fastest_s1_time',
+        'personal_fastest_s2_time', 'personal_fastest_s3_time',
+        'world_fastest_s1_time', 'world_fastest_s2_time',
+        'world_fastest_s3_time') + tuple(
+            field
+            for _, _, fields in _field_groups
+            for field in fields)
+
+    def __init__(self, packet_data, *, lazy=False):
+        unpacked_data = self._unpack_data(packet_data, self._header_struct)
+
+        self.build_version_number = unpacked_data[0]
+
+        self._test_packet_type(unpacked_data[1])
+
+        self._game_session_state, self.viewed_participant_index, \
+            self.num_participants, self.unfiltered_throttle, \
+            self.unfiltered_brake, self.unfiltered_steering, \
+            self.unfiltered_clutch, self._race_state_flags, \
+            self.laps_in_event = unpacked_data[2:11]
+
+        self.best_lap_time, self.last_lap_time, self.current_time, \
+            self.split_time_ahead, self.split_time_behind, \
+            self.split_time, self.event_time_remaining, \
+            self.personal_fastest_lap_time, self.world_fastest_lap_time, \
+            self.current_s1_time, self.current_s2_time, \
+            self.current_s3_time, self.fastest_s1_time, \
+            self.fastest_s2_time, self.fastest_s3_time, \
+            self.personal_fastest_s1_time, self.personal_fastest_s2_time, \
+            self.personal_fastest_s3_time, self.world_fastest_s1_time, \
+            self.world_fastest_s2_time, self.world_fastest_s3_time = \
+            unpacked_data[11:32]
+
+        self._packet_data = packet_data
+        if not lazy:
+            for decoder, group_struct in self._group_structs.items():
+                getattr(self, decoder)(group_struct.unpack_from(packet_data))
+
+    def __getattr__(self, name):
+        """Decodes the field group of a field on first access."""
+        try:
+            decoder = self._group_fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        getattr(self, decoder)(self._group_structs[decoder].unpack_from(
+            self._packet_data))
+
+        return object.__getattribute__(self, name)
+
+    def _decode_car(self, unpacked_data):
+        self.joypad, self.highest_flag, self.pit_mode_schedule, \
+            self.oil_temp, self.oil_pressure, self.water_temp, \
+            self.water_pressure, self.fuel_pressure, self.car_flags, \
+            self.fuel_capacity, self.brake, self.throttle, self.clutch, \
+            self.steering, self.fuel_level, self.speed, self.rpm, \
+            self.max_rpm, self.gear_num_gears, self.boost_amount, \
+            self.enforced_pit_stop_lap, self.crash_state, \
+            self.odometer = unpacked_data
+
+    def _decode_motion(self, unpacked_data):
+        self.orientation = unpacked_data[0:3]
+        self.local_velocity = unpacked_data[3:6]
+        self.world_velocity = unpacked_data[6:9]
+        self.angular_velocity = unpacked_data[9:12]
+        self.local_acceleration = unpacked_data[12:15]
+        self.world_acceleration = unpacked_data[15:18]
+        self.extents_centre = unpacked_data[18:21]
+
+    def _decode_wheels(self, unpacked_data):
+        self.tyre_flags = unpacked_data[0:4]
+        self.terrain = unpacked_data[4:8]
+        self.tyre_y = unpacked_data[8:12]
+        self.tyre_rps = unpacked_data[12:16]
+        self.tyre_slip_speed = unpacked_data[16:20]
+        self.tyre_temp = unpacked_data[20:24]
+        self.tyre_grip = unpacked_data[24:28]
+        self.tyre_height_above_ground = unpacked_data[28:32]
+        self.tyre_lateral_stiffness = unpacked_data[32:36]
+        self.tyre_wear = unpacked_data[36:40]
+        self.brake_damage = unpacked_data[40:44]
+        self.suspension_damage = unpacked_data[44:48]
+        self.brake_temp = unpacked_data[48:52]
+        self.tyre_tread_temp = unpacked_data[52:56]
+        self.tyre_layer_temp = unpacked_data[56:60]
+        self.tyre_carcass_temp = unpacked_data[60:64]
+        self.tyre_rim_temp = unpacked_data[64:68]
+        self.tyre_internal_air_temp = unpacked_data[68:72]
+        self.wheel_local_position_y = unpacked_data[72:76]
+        self.ride_height = unpacked_data[76:80]
+        self.suspension_travel = unpacked_data[80:84]
+        self.suspension_velocity = unpacked_data[84:88]
+        self.air_pressure = unpacked_data[88:92]
+
+    def _decode_environment(self, unpacked_data):
+        self.engine_speed, self.engine_torque, self.aero_damage, \
+            self.engine_damage, self.ambient_temperature, \
+            self.track_temperature, self.rain_density, self.wind_speed, \
+            self.wind_direction_x, self.wind_direction_y = unpacked_data
+
+    def _decode_participants(self, unpacked_data):
+        self.participant_info = tuple(
+            ParticipantInfo(unpacked_data[offset:offset+9])
+            for offset in range(0, 504, 9))
+
+    def _decode_track(self, unpacked_data):
+        self.track_length = unpacked_data[0]
+        self.wings = unpacked_data[1:3]
+        self.d_pad = unpacked_data[3]
 
     @property
     def packet_type(self):
         return 0
 
-    @property
-    def _packet_string(self):
-        packet_string = "HB"
-        packet_string += "B"
-        packet_string += "bb"
-        packet_string += "BBbBB"
-        packet_string += "B"
-        packet_string += "21f"
-        packet_string += "H"
-        packet_string += "B"
-        packet_string += "B"
-        packet_string += "hHhHHBBBBBbffHHBBbB"
-        packet_string += "22f"
-        packet_string += "8B12f8B8f12B4h20H16f4H"
-        packet_string += "2f"
-        packet_string += "2B"
-        packet_string += "bbBbbb"
-
-        packet_string += "hhhHBBBBf"*56
-
-        packet_string += "fBBB"
-
-        return packet_string
-
     def __str__(self):
         return "TelemetryDataPacket"
 
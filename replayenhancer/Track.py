@@ -11,6 +11,10 @@ https://github.com/mrbelowski/CrewChiefV4/
 import os
 from json import load
 
+TRACK_DATA_FILENAME = os.path.join(
+    os.path.dirname(__file__),
+    'lib/track_data.json')
+
 
 class Track:
     """Represents a Project CARS track.
@@ -24,19 +28,23 @@ class Track:
     ----------
     track_length : float
         Length of the track, as found in the telemetry data.
+    track : dict, optional
+        The data of the track, as matched by a TrackRegistry. Found in
+        `lib/track_data.json` if not given.
     """
-    def __init__(self, track_length):
+    def __init__(self, track_length, *, track=None):
+        self.track_length = track_length
+
         try:
-            with open(os.path.join(
-                    os.path.dirname(__file__),
-                    'lib/track_data.json')) as json_file:
-                json_data = load(json_file)
-
-            matching_tracks = sorted(
-                json_data.values(),
-                key=lambda x: abs(x['length'] - float(track_length))
-            )
-            track = matching_tracks[0]
+            if track is None:
+                with open(TRACK_DATA_FILENAME) as json_file:
+                    json_data = load(json_file)
+
+                matching_tracks = sorted(
+                    json_data.values(),
+                    key=lambda x: abs(x['length'] - float(track_length))
+                )
+                track = matching_tracks[0]
 
             try:
                 # If all the pit keys are present, we populate the pit
@@ -0,0 +1,89 @@
+"""
+Provides a registry of the tracks of Project CARS, loaded once per
+process.
+
+A track is identified by the track length in the telemetry data, which
+is matched to the nearest length in `lib/track_data.json`. RaceData
+needs the track at every telemetry packet, so the track data is loaded
+and ordered by length once, matching a length is a bisection and the
+Track of each length is built only once.
+"""
+from bisect import bisect_left
+from functools import lru_cache
+from json import load
+
+from replayenhancer.Track import TRACK_DATA_FILENAME, Track
+
+
+@lru_cache(maxsize=None)
+def track_registry():
+    """Returns the registry of the tracks in `lib/track_data.json`."""
+    return TrackRegistry.load(TRACK_DATA_FILENAME)
+
+
+class TrackRegistry:
+    """
+    Matches track lengths to the tracks of Project CARS.
+
+    Where two tracks are equally near a length, the track that comes
+    first in the track data is matched, as by Track.
+
+    Parameters
+    ----------
+    tracks : iterable of dict
+        The data of each track, see `lib/track_data.json`.
+    """
+    def __init__(self, tracks):
+        # Tracks ordered by length, each with its position in the
+        # track data. Of tracks of the same length, only the first
+        # can be matched.
+        ordered = dict()
+        for order, track in enumerate(tracks):
+            ordered.setdefault(track['length'], (order, track))
+        ordered = sorted(ordered.items())
+
+        self._lengths = [length for length, _ in ordered]
+        self._tracks = [track for _, track in ordered]
+        self._cache = dict()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Loads the registry of the tracks in a track data file. The
+        registry is empty if the file does not exist.
+        """
+        try:
+            with open(filename) as json_file:
+                return cls(load(json_file).values())
+        except FileNotFoundError:
+            return cls(())
+
+    def match(self, track_length):
+        """
+        Returns the data of the track nearest in length to
+        `track_length`, or None if there are no tracks.
+        """
+        track_length = float(track_length)
+        position = bisect_left(self._lengths, track_length)
+        candidates = self._tracks[max(0, position - 1):position + 1]
+        if not candidates:
+            return None
+
+        _, track = min(
+            candidates,
+            key=lambda x: (abs(x[1]['length'] - track_length), x[0]))
+        return track
+
+    def track(self, track_length):
+        """Returns the Track of a track length, built once per length."""
+        try:
+            return self._cache[track_length]
+        except KeyError:
+            track = self.match(track_length)
+            self._cache[track_length] = Track(
+                track_length,
+                track=track if track is not None else dict())
+            return self._cache[track_length]
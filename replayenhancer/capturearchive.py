@@ -0,0 +1,190 @@
+"""
+Packs telemetry captures into compressed capture archives, and unpacks
+archives back into packet directories or capture logs.
+
+Packing accepts any capture the Replay Enhancer can read, so existing
+"packetdata" directories can be converted with
+
+    capturearchive pack packetdata-*
+
+which writes "capture.archive" into each directory. With --remove the
+original packet files, and their manifest, are deleted once the
+archive is written.
+"""
+import argparse
+import os
+
+from tqdm import tqdm
+
+from replayenhancer.CaptureArchive import CAPTURE_ARCHIVE_FILENAME, \
+    COMPRESSION, CaptureArchiveWriter
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogWriter
+from replayenhancer.PacketManifest import MANIFEST_FILENAME
+from replayenhancer.PacketSource import packet_source
+
+
+def pack(source_path, archive_filename=None, *,
+         compression='zlib', chunk_packets=256, remove=False):
+    """
+    Packs a capture into a capture archive and returns the sizes of the
+    capture and the archive, in bytes.
+
+    The archive is written beside the capture unless a filename is
+    given.
+    """
+    source = packet_source(source_path)
+    if archive_filename is None:
+        archive_filename = os.path.join(
+            source.directory,
+            CAPTURE_ARCHIVE_FILENAME)
+
+    source_files = source.files()
+    source_size = sum(os.path.getsize(filename) for filename in source_files)
+
+    temporary_filename = archive_filename + '.tmp'
+    progress = tqdm(
+        desc='Packing {}'.format(source_path),
+        total=len(source),
+        unit='packets')
+    with CaptureArchiveWriter(
+            temporary_filename,
+            compression=compression,
+            chunk_packets=chunk_packets) as writer:
+        for timestamp, packet_data in source.timed_packets():
+            writer.write(packet_data, timestamp)
+            progress.update()
+    progress.close()
+    source.close()
+
+    os.replace(temporary_filename, archive_filename)
+    archive_filename = os.path.realpath(archive_filename)
+
+    if remove:
+        for filename in source_files:
+            if os.path.realpath(filename) != archive_filename:
+                os.remove(filename)
+        try:
+            os.remove(os.path.join(source.directory, MANIFEST_FILENAME))
+        except FileNotFoundError:
+            pass
+
+    return source_size, os.path.getsize(archive_filename)
+
+
+def unpack(archive_path, destination, *, log=False):
+    """
+    Unpacks a capture archive into a directory, as one `pdata` file
+    per packet or as a capture log. Returns the number of packets.
+    """
+    source = packet_source(archive_path)
+    os.makedirs(destination, exist_ok=True)
+
+    progress = tqdm(
+        desc='Unpacking {}'.format(archive_path),
+        total=len(source),
+        unit='packets')
+    if log:
+        with CaptureLogWriter(os.path.join(
+                destination,
+                CAPTURE_LOG_FILENAME)) as writer:
+            for timestamp, packet_data in source.timed_packets():
+                writer.write(packet_data, timestamp)
+                progress.update()
+        packet_count = writer.packet_count
+    else:
+        packet_count = 0
+        for timestamp, packet_data in source.timed_packets():
+            filename = os.path.join(
+                destination,
+                'pdata{}'.format(packet_count))
+            with open(filename, 'wb') as packet_file:
+                packet_file.write(packet_data)
+            os.utime(filename, (timestamp, timestamp))
+            packet_count += 1
+            progress.update()
+    progress.close()
+    source.close()
+
+    return packet_count
+
+
+def main(argv=None):
+    """
+    Packs or unpacks capture archives.
+    """
+    parser = argparse.ArgumentParser(
+        description="Project CARS Telemetry Capture Archiver")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    pack_parser = subparsers.add_parser(
+        'pack',
+        help="pack captures into capture archives")
+    pack_parser.add_argument(
+        'source',
+        nargs='+',
+        help="capture directory, capture log or capture archive")
+    pack_parser.add_argument(
+        '-o',
+        '--output',
+        default=None,
+        help="archive filename, when packing a single capture")
+    pack_parser.add_argument(
+        '-c',
+        '--compression',
+        choices=sorted(COMPRESSION.keys()),
+        default='zlib',
+        help="chunk compression; lzma is smaller, zlib is faster to read")
+    pack_parser.add_argument(
+        '-n',
+        '--chunk-packets',
+        type=int,
+        default=256,
+        help="number of packets in each compressed chunk")
+    pack_parser.add_argument(
+        '--remove',
+        action='store_true',
+        help="remove the original packet files once packed")
+
+    unpack_parser = subparsers.add_parser(
+        'unpack',
+        help="unpack a capture archive")
+    unpack_parser.add_argument(
+        'archive',
+        help="capture archive, or capture directory holding one")
+    unpack_parser.add_argument(
+        'destination',
+        help="directory to unpack the packets into")
+    unpack_parser.add_argument(
+        '-l',
+        '--log',
+        action='store_true',
+        help="unpack to a single capture log")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        if args.output is not None and len(args.source) > 1:
+            parser.error("--output requires a single source")
+
+        for source_path in args.source:
+            source_size, archive_size = pack(
+                source_path,
+                args.output,
+                compression=args.compression,
+                chunk_packets=args.chunk_packets,
+                remove=args.remove)
+            print("Packed {}: {} bytes to {} bytes ({:.1%}).".format(
+                source_path,
+                source_size,
+                archive_size,
+                archive_size / source_size if source_size else 0.0))
+    else:
+        packet_count = unpack(args.archive, args.destination, log=args.log)
+        print("Unpacked {} packets to {}.".format(
+            packet_count,
+            args.destination))
+
+if __name__ == '__main__':
+    main()
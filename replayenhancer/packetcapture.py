@@ -4,23 +4,107 @@ Enhancer. Run on the network to which Project CARS is broadcasting
 
 Writes the packets to a directory named "packetdata" with an
 appended timestamp. Each packet is named "pdata" with an appended
-sequence number.
+sequence number. With the --log option, all packets are instead
+appended to a single capture log in that directory.
+
+Packets are received on one thread and written on another, see
+CaptureEngine. A status line with packet rates is shown while
+capturing, and a summary of the capture is written to the directory
+as "capture_summary.json" when it closes. The race boundaries are
+tracked as packets arrive and written to "descriptor.json", so the
+capture needs no analysis before its first use.
 
 Stop telemetry packet capture by hitting CTRL+C.
 """
+import argparse
 import datetime
+import json
 import os
 import socket
+import time
+
+from replayenhancer.CaptureEngine import CaptureEngine
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogWriter
+from replayenhancer.CaptureStats import CaptureStats
+from replayenhancer.DescriptorBuilder import DescriptorWriter
+
+DESCRIPTOR_FILENAME = 'descriptor.json'
+SUMMARY_FILENAME = 'capture_summary.json'
+
+
+class PacketDirectoryWriter:
+    """
+    Writes each packet to its own numbered file in a directory.
+    """
+    def __init__(self, directory_name):
+        self.directory_name = directory_name
+        self.packet_count = 0
+
+    def write(self, packet_data, _=None):
+        """Writes a packet to the next numbered file."""
+        file = open(
+            './'+self.directory_name+'/pdata'+str(self.packet_count), 'wb')
+        file.write(packet_data)
+        file.close()
+        self.packet_count += 1
 
+    def close(self):
+        """Nothing to close; present for symmetry with log writers."""
 
-def main(*, runonce=False):
+
+def main(argv=None, *, runonce=False):
     """
     Captures telemetry packets. CTRL+C to exit.
     runonce exists only for unit testing. Don't ever actually use.
     """
+    parser = argparse.ArgumentParser(
+        description="Project CARS Telemetry Packet Capture")
+
+    parser.add_argument(
+        '-l',
+        '--log',
+        action='store_true',
+        help="write packets to a single capture log")
+
+    parser.add_argument(
+        '-b',
+        '--receive-buffer',
+        type=int,
+        default=None,
+        help="socket receive buffer size, in bytes")
+
+    parser.add_argument(
+        '-r',
+        '--ring-slots',
+        type=int,
+        default=4096,
+        help="number of packets held in the capture ring buffer")
+
+    parser.add_argument(
+        '-i',
+        '--status-interval',
+        type=float,
+        default=1.0,
+        help="seconds between status line updates")
+
+    parser.add_argument(
+        '-g',
+        '--gap-threshold',
+        type=float,
+        default=0.5,
+        help="seconds without packets counted as a gap")
+
+    args = parser.parse_args(argv)
+
     # Create a new UDP socket.
     udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if args.receive_buffer is not None:
+        udp_socket.setsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_RCVBUF,
+            args.receive_buffer)
 
     # Bind the socket to the port
     server_address = ("", 5606)
@@ -28,28 +112,72 @@ def main(*, runonce=False):
     udp_socket.bind(server_address)
 
     i = 0
+    writer = None
+    descriptor = None
+    engine = None
+    stats = CaptureStats(args.gap_threshold)
     directory_name = "packetdata-"+datetime.datetime.now().strftime(
         "%Y%m%d-%H%M%S")
+    log_name = './'+directory_name+'/'+CAPTURE_LOG_FILENAME
     try:
         if not os.path.exists(directory_name):
             os.makedirs(directory_name)
-        while True:
-            data, _ = udp_socket.recvfrom(65565)
-            print("Writing packet {}".format(i))
-            file = open('./'+directory_name+'/pdata'+str(i), 'wb')
-            file.write(data)
-            file.close()
-            i += 1
+        if args.log:
+            writer = CaptureLogWriter(log_name)
+        else:
+            writer = PacketDirectoryWriter(directory_name)
+        descriptor = DescriptorWriter(
+            './'+directory_name+'/'+DESCRIPTOR_FILENAME)
 
-            if runonce:
-                i = 0
-                raise KeyboardInterrupt
+        engine = CaptureEngine(
+            udp_socket,
+            writer,
+            slots=args.ring_slots,
+            stats=stats,
+            descriptor=descriptor)
+        if runonce:
+            engine.receive()
+            engine.flush()
+            raise KeyboardInterrupt
+
+        engine.start()
+        stats.rates(time.time())
+        while True:
+            time.sleep(args.status_interval)
+            print(
+                "\r" + stats.status_line(time.time(), engine),
+                end='',
+                flush=True)
 
     except KeyboardInterrupt:
+        print()
         print("Closing listener on port {}".format(server_address[1]))
 
     finally:
+        if engine is not None:
+            if not runonce:
+                engine.stop()
+            i = engine.packets_written
+            print(
+                "Received {} packets. Ring buffer high-water mark "
+                "{} of {} slots, {} overflows.".format(
+                    engine.packets_received,
+                    engine.high_water_mark,
+                    engine.slots,
+                    engine.overflows))
+        if writer is not None:
+            writer.close()
+        if descriptor is not None:
+            descriptor.close()
+        if runonce:
+            i = 0
+        if i != 0:
+            with open(os.path.join(directory_name, SUMMARY_FILENAME), 'w') \
+                    as summary_file:
+                json.dump(stats.summary(engine), summary_file, indent=4)
         if i == 0:
+            if args.log:
+                os.remove(log_name)
             os.rmdir(directory_name)
 
 if __name__ == '__main__':
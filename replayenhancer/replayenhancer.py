@@ -10,13 +10,16 @@ from copy import copy
 import moviepy.editor as mpy
 from PIL import Image, ImageDraw
 from moviepy.video.io.bindings import PIL_to_npimage
-from tqdm import tqdm
 
 from replayenhancer.DefaultCards \
     import SeriesChampion, SeriesStandings, StartingGrid
 from replayenhancer.GTStandings import GTStandings
 from replayenhancer.RaceData import RaceData
+from replayenhancer.RacePipeline import Duration, RacePipeline, SyncPoints, \
+    TotalTime
 from replayenhancer.RaceResultsWithChange import RaceResultsWithChange
+from replayenhancer.RaceTimeline import RaceTimeline, TIMELINE_FILENAME, \
+    TimelineRecorder, capture_identity
 from replayenhancer.SeriesStandingsWithChange \
     import SeriesStandingsWithChange
 
@@ -25,7 +28,6 @@ def make_video(config_file, *, framerate=None, sync=False):
     configuration = json.load(open(config_file))
     try:
         race_data = RaceData(configuration['source_telemetry'])
-        result_data = RaceData(configuration['source_telemetry'])
     except KeyError:
         sys.exit("Configuration Error: Source Telemetry not found.")
 
@@ -55,6 +57,31 @@ def make_video(config_file, *, framerate=None, sync=False):
     except KeyError:
         video_skipend = None
 
+    duration = Duration()
+    sync_points = SyncPoints()
+    total_time = TotalTime()
+    consumers = [duration, sync_points, total_time] if sync \
+        else [duration, total_time]
+
+    timeline_filename = os.path.join(
+        race_data.capture.directory,
+        TIMELINE_FILENAME)
+    identity = capture_identity(race_data.capture)
+    timeline = RaceTimeline.load(timeline_filename, identity)
+    if timeline is None:
+        recorder = TimelineRecorder(identity)
+        result_data = RaceData(configuration['source_telemetry'])
+        RacePipeline(result_data, consumers + [recorder]).run()
+        try:
+            recorder.timeline.save(timeline_filename)
+        except OSError:
+            pass
+    else:
+        result_data = timeline.replay()
+        RacePipeline(result_data, consumers).run()
+    race_data.total_time = total_time.total_time
+    result_data.total_time = total_time.total_time
+
     if 'source_video' in configuration \
             and configuration['source_video'] is not None:
         source_video = mpy.VideoFileClip(
@@ -65,16 +92,8 @@ def make_video(config_file, *, framerate=None, sync=False):
         if framerate is None:
             framerate = source_video.fps
     else:
-        time_data = RaceData(configuration['source_telemetry'])
-        with tqdm(desc="Detecting Telemetry Duration") as progress:
-            while True:
-                try:
-                    _ = time_data.get_data()
-                    progress.update()
-                except StopIteration:
-                    break
         source_video = mpy.ColorClip((1280, 1024)).set_duration(
-            time_data.elapsed_time)
+            duration.duration)
 
         if framerate is None:
             framerate = 30
@@ -105,30 +124,8 @@ def make_video(config_file, *, framerate=None, sync=False):
             duration=source_video.duration
         ).set_position(('center', 'top'))
 
-        first_lap_data = RaceData(configuration['source_telemetry'])
-        with tqdm(desc="Detecting Video Start") as progress:
-            while not any(
-                    [x.laps_complete > 0
-                     for x in first_lap_data.drivers.values()]):
-                _ = first_lap_data.get_data()
-                progress.update()
-
-        start_time = first_lap_data.elapsed_time - 10
-        end_time = None
-
-        with tqdm(desc="Detecting Video End") as progress:
-            while not all(
-                    [x.laps_complete > 0
-                     for x in first_lap_data.drivers.values()]):
-                try:
-                    _ = first_lap_data.get_data()
-                    progress.update()
-                except StopIteration:
-                    end_time = start_time + 60
-                    break
-
-        if end_time is None:
-            end_time = first_lap_data.elapsed_time + 10
+        start_time = sync_points.start_time
+        end_time = sync_points.end_time
 
         main_event = mpy.CompositeVideoClip(
             [source_video, standings_clip, timecode_clip]
@@ -150,12 +147,6 @@ def make_video(config_file, *, framerate=None, sync=False):
     starting_grid = mpy.ImageClip(
         pcre_starting_grid.to_frame()).set_duration(5)
 
-    while True:
-        try:
-            result_data.get_data()
-        except StopIteration:
-            break
-
     end_titles = list()
 
     if 'car_classes' in configuration and len(configuration['car_classes']):
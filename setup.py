@@ -32,7 +32,7 @@ setup(
     ],
     keywords='gaming racing video data streaming',
     packages=find_packages(exclude=['assets', 'tests', 'utils']),
-    install_requires=['moviepy', 'natsort', 'Pillow', 'tqdm'],
+    install_requires=['moviepy', 'natsort', 'numpy', 'Pillow', 'tqdm'],
     extras_require={
         'dev': [],
         'test': []
@@ -46,7 +46,8 @@ setup(
     entry_points={
         'console_scripts': [
             'replayenhancer=replayenhancer.replayenhancer:main',
-            'packetcapture=replayenhancer.packetcapture:main'
+            'packetcapture=replayenhancer.packetcapture:main',
+            'capturearchive=replayenhancer.capturearchive:main'
         ],
     },
 )
@@ -97,13 +97,13 @@ class TestAdditionalParticipantPacket(unittest.TestCase):
     def test_property_name(self):
         instance = AdditionalParticipantPacket(self.binary_data())
         expected_result = self.expected_name
-        self.assertListEqual(instance.name, expected_result)
+        self.assertTupleEqual(instance.name, tuple(expected_result))
 
     def test_property_name_split_on_null(self):
         instance = AdditionalParticipantPacket(self.binary_data(
             name=[name+'\x00Garbage Data' for name in self.expected_name]))
         expected_result = self.expected_name
-        self.assertListEqual(instance.name, expected_result)
+        self.assertTupleEqual(instance.name, tuple(expected_result))
 
     def test_property_offset(self):
         instance = AdditionalParticipantPacket(self.binary_data())
@@ -0,0 +1,110 @@
+"""
+Tests CaptureArchive.py.
+"""
+import os
+import tempfile
+import unittest
+
+from replayenhancer.CaptureArchive import CAPTURE_ARCHIVE_FILENAME, \
+    CaptureArchiveReader, CaptureArchiveWriter, find_capture_archive, \
+    is_capture_archive
+
+
+class TestCaptureArchive(unittest.TestCase):
+    """
+    Tests reading and writing capture archives.
+    """
+    packets = [bytes([value]) * (1367, 1347, 1028)[value % 3]
+               for value in range(10)]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(
+            self.directory.name,
+            CAPTURE_ARCHIVE_FILENAME)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_packets(self, compression='zlib'):
+        with CaptureArchiveWriter(
+                self.filename,
+                compression=compression,
+                chunk_packets=4) as writer:
+            for timestamp, packet in enumerate(self.packets):
+                writer.write(packet, float(timestamp))
+
+    def test_method_packets(self):
+        self.write_packets()
+        self.assertListEqual(
+            list(CaptureArchiveReader(self.filename)),
+            self.packets)
+
+    def test_method_packets_lzma(self):
+        self.write_packets('lzma')
+        self.assertListEqual(
+            list(CaptureArchiveReader(self.filename)),
+            self.packets)
+
+    def test_method_packets_reverse(self):
+        self.write_packets()
+        self.assertListEqual(
+            list(CaptureArchiveReader(self.filename).packets(reverse=True)),
+            self.packets[::-1])
+
+    def test_method_timed_packets(self):
+        self.write_packets()
+        self.assertListEqual(
+            list(CaptureArchiveReader(self.filename).timed_packets()),
+            [(float(timestamp), packet)
+             for timestamp, packet in enumerate(self.packets)])
+
+    def test_method_packet(self):
+        self.write_packets()
+        reader = CaptureArchiveReader(self.filename)
+        for sequence in (9, 0, 5, 4, 3):
+            self.assertEqual(reader.packet(sequence), self.packets[sequence])
+        with self.assertRaises(IndexError):
+            reader.packet(10)
+        reader.close()
+
+    def test_chunks(self):
+        self.write_packets()
+        reader = CaptureArchiveReader(self.filename)
+        self.assertListEqual(
+            [(chunk.first_sequence, chunk.packet_count)
+             for chunk in reader.chunks],
+            [(0, 4), (4, 4), (8, 2)])
+        self.assertEqual(len(reader), len(self.packets))
+        self.assertLess(
+            os.path.getsize(self.filename),
+            sum(len(packet) for packet in self.packets))
+
+    def test_incomplete(self):
+        writer = CaptureArchiveWriter(self.filename)
+        writer.write(self.packets[0])
+        with self.assertRaises(ValueError):
+            CaptureArchiveReader(self.filename)
+        writer.close()
+
+    def test_invalid_compression(self):
+        with self.assertRaises(ValueError):
+            CaptureArchiveWriter(self.filename, compression='bz2')
+
+    def test_find_capture_archive(self):
+        self.assertIsNone(find_capture_archive(self.directory.name))
+        self.write_packets()
+        self.assertEqual(
+            find_capture_archive(self.directory.name),
+            self.filename)
+        self.assertEqual(find_capture_archive(self.filename), self.filename)
+
+    def test_is_capture_archive(self):
+        not_archive = os.path.join(self.directory.name, 'pdata0')
+        with open(not_archive, 'wb') as packet_file:
+            packet_file.write(self.packets[0])
+        self.assertFalse(is_capture_archive(not_archive))
+        self.assertFalse(is_capture_archive(self.directory.name))
+
+if __name__ == "__main__":
+    unittest.main()
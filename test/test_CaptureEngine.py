@@ -0,0 +1,143 @@
+"""
+Tests CaptureEngine.py.
+"""
+import socket
+import time
+import unittest
+
+from replayenhancer.CaptureEngine import CaptureEngine
+from replayenhancer.CaptureStats import CaptureStats
+
+
+class MockSocket:
+    """
+    Socket stand-in that returns a fixed list of datagrams.
+    """
+    def __init__(self, datagrams):
+        self.datagrams = list(datagrams)
+
+    def recv_into(self, buffer):
+        datagram = self.datagrams.pop(0)
+        buffer[:len(datagram)] = datagram
+        return len(datagram)
+
+
+class MockWriter:
+    """
+    Writer stand-in that keeps the packets written to it.
+    """
+    def __init__(self):
+        self.packets = list()
+        self.flushes = 0
+
+    def write(self, packet_data, timestamp):
+        self.packets.append(bytes(packet_data))
+
+    def flush(self):
+        self.flushes += 1
+
+
+class TestCaptureEngine(unittest.TestCase):
+    """
+    Tests against the CaptureEngine object.
+    """
+    datagrams = [bytes([index]) * (1000 + index) for index in range(10)]
+
+    def test_method_receive_flush(self):
+        writer = MockWriter()
+        engine = CaptureEngine(MockSocket(self.datagrams), writer, slots=16)
+        for _ in self.datagrams:
+            self.assertTrue(engine.receive())
+        engine.flush()
+
+        self.assertListEqual(writer.packets, self.datagrams)
+        self.assertEqual(writer.flushes, 1)
+        self.assertEqual(engine.packets_received, 10)
+        self.assertEqual(engine.packets_written, 10)
+        self.assertEqual(engine.buffered, 0)
+
+    def test_property_high_water_mark(self):
+        engine = CaptureEngine(
+            MockSocket(self.datagrams),
+            MockWriter(),
+            slots=16)
+        for _ in range(4):
+            engine.receive()
+        engine.flush()
+        for _ in range(3):
+            engine.receive()
+
+        self.assertEqual(engine.high_water_mark, 4)
+
+    def test_property_overflows(self):
+        writer = MockWriter()
+        engine = CaptureEngine(
+            MockSocket(self.datagrams),
+            writer,
+            slots=4,
+            batch_size=2)
+        results = [engine.receive() for _ in self.datagrams]
+        engine.flush()
+
+        self.assertListEqual(results, [True] * 4 + [False] * 6)
+        self.assertEqual(engine.overflows, 6)
+        self.assertEqual(engine.high_water_mark, 4)
+        self.assertListEqual(writer.packets, self.datagrams[:4])
+
+    def test_ring_wraparound(self):
+        writer = MockWriter()
+        engine = CaptureEngine(
+            MockSocket(self.datagrams),
+            writer,
+            slots=3,
+            batch_size=2)
+        for _ in self.datagrams:
+            engine.receive()
+            engine.flush()
+
+        self.assertListEqual(writer.packets, self.datagrams)
+        self.assertEqual(engine.overflows, 0)
+
+    def test_stats(self):
+        stats = CaptureStats()
+        engine = CaptureEngine(
+            MockSocket(self.datagrams),
+            MockWriter(),
+            stats=stats)
+        for _ in self.datagrams:
+            engine.receive()
+        engine.flush()
+
+        self.assertEqual(stats.packets, len(self.datagrams))
+        self.assertEqual(
+            stats.bytes,
+            sum(len(datagram) for datagram in self.datagrams))
+
+    def test_threads(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        writer = MockWriter()
+        engine = CaptureEngine(
+            receiver,
+            writer,
+            batch_size=4,
+            flush_interval=0.05)
+        engine.start()
+        try:
+            for datagram in self.datagrams:
+                sender.sendto(datagram, receiver.getsockname())
+            deadline = time.time() + 5
+            while engine.packets_written < len(self.datagrams) \
+                    and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            engine.stop()
+            sender.close()
+            receiver.close()
+
+        self.assertListEqual(writer.packets, self.datagrams)
+
+if __name__ == "__main__":
+    unittest.main()
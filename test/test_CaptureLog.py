@@ -0,0 +1,116 @@
+"""
+Tests CaptureLog.py.
+"""
+import os
+import tempfile
+import unittest
+
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogReader, CaptureLogWriter, find_capture_log, is_capture_log
+
+
+class TestCaptureLog(unittest.TestCase):
+    """
+    Tests reading and writing capture logs.
+    """
+    packets = [b'\x01' * 1367, b'\x02' * 1347, b'\x03' * 1028]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(
+            self.directory.name,
+            CAPTURE_LOG_FILENAME)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_packets(self, packets=None):
+        with CaptureLogWriter(self.filename) as writer:
+            for timestamp, packet in enumerate(
+                    self.packets if packets is None else packets):
+                writer.write(packet, float(timestamp))
+
+    def test_method_packets(self):
+        self.write_packets()
+        self.assertListEqual(
+            list(CaptureLogReader(self.filename)),
+            self.packets)
+
+    def test_method_packets_reverse(self):
+        self.write_packets()
+        self.assertListEqual(
+            list(CaptureLogReader(self.filename).packets(reverse=True)),
+            self.packets[::-1])
+
+    def test_method_timed_packets(self):
+        self.write_packets()
+        self.assertListEqual(
+            list(CaptureLogReader(self.filename).timed_packets()),
+            [(0.0, self.packets[0]),
+             (1.0, self.packets[1]),
+             (2.0, self.packets[2])])
+
+    def test_method_records(self):
+        self.write_packets()
+        reader = CaptureLogReader(self.filename)
+        with open(self.filename, 'rb') as log_file:
+            for (offset, length, _), packet in zip(
+                    reader.records(),
+                    self.packets):
+                log_file.seek(offset)
+                self.assertEqual(log_file.read(length), packet)
+
+    def test_method_records_start(self):
+        self.write_packets()
+        reader = CaptureLogReader(self.filename)
+        records = list(reader.records())
+        self.assertListEqual(
+            list(reader.records(records[1][0])),
+            records[1:])
+
+    def test_method_len(self):
+        self.write_packets()
+        self.assertEqual(len(CaptureLogReader(self.filename)), 3)
+
+    def test_append(self):
+        self.write_packets(self.packets[:1])
+        self.write_packets(self.packets[1:])
+        self.assertListEqual(
+            list(CaptureLogReader(self.filename)),
+            self.packets)
+
+    def test_torn_record(self):
+        self.write_packets()
+        with open(self.filename, 'r+b') as log_file:
+            log_file.truncate(os.path.getsize(self.filename) - 10)
+
+        self.assertListEqual(
+            list(CaptureLogReader(self.filename)),
+            self.packets[:2])
+
+        writer = CaptureLogWriter(self.filename)
+        self.assertEqual(writer.packet_count, 2)
+        writer.write(self.packets[2])
+        writer.close()
+        self.assertListEqual(
+            list(CaptureLogReader(self.filename)),
+            self.packets)
+
+    def test_not_capture_log(self):
+        with open(self.filename, 'wb') as log_file:
+            log_file.write(b'Not a capture log.')
+
+        self.assertFalse(is_capture_log(self.filename))
+        with self.assertRaises(ValueError):
+            CaptureLogReader(self.filename)
+
+    def test_find_capture_log(self):
+        self.write_packets()
+        self.assertEqual(find_capture_log(self.directory.name), self.filename)
+        self.assertEqual(find_capture_log(self.filename), self.filename)
+
+    def test_find_capture_log_missing(self):
+        self.assertIsNone(find_capture_log(self.directory.name))
+
+if __name__ == "__main__":
+    unittest.main()
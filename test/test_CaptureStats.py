@@ -0,0 +1,95 @@
+"""
+Tests CaptureStats.py.
+"""
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from replayenhancer.CaptureStats import CaptureStats
+
+
+class TestCaptureStats(unittest.TestCase):
+    """
+    Tests against the CaptureStats object.
+    """
+    def setUp(self):
+        self.instance = CaptureStats(gap_threshold=0.5)
+        for timestamp, length in [
+                (100.0, 1367),
+                (100.1, 1347),
+                (100.2, 1367),
+                (101.2, 1028),
+                (101.3, 1367),
+                (101.4, 42)]:
+            self.instance.record(length, timestamp)
+
+    def test_property_packets(self):
+        self.assertEqual(self.instance.packets, 6)
+
+    def test_property_bytes(self):
+        self.assertEqual(self.instance.bytes, 1367 * 3 + 1347 + 1028 + 42)
+
+    def test_property_packet_counts(self):
+        self.assertDictEqual(
+            self.instance.packet_counts,
+            {
+                'telemetry': 3,
+                'participant': 1,
+                'additional_participant': 1,
+                'unknown': 1})
+
+    def test_property_gaps(self):
+        self.assertEqual(self.instance.gap_count, 1)
+        self.assertAlmostEqual(self.instance.longest_gap, 1.0)
+        self.assertEqual(len(self.instance.gaps), 1)
+        offset, interval = self.instance.gaps[0]
+        self.assertAlmostEqual(offset, 0.2)
+        self.assertAlmostEqual(interval, 1.0)
+
+    def test_method_rates(self):
+        self.instance.rates(10.0)
+        self.instance.record(1367, 101.5)
+        self.instance.record(1367, 101.6)
+        packet_rates, byte_rate = self.instance.rates(12.0)
+        self.assertAlmostEqual(packet_rates['telemetry'], 1.0)
+        self.assertAlmostEqual(packet_rates['participant'], 0.0)
+        self.assertAlmostEqual(byte_rate, 1367.0)
+
+    def test_method_rates_first_call(self):
+        packet_rates, byte_rate = self.instance.rates(10.0)
+        self.assertEqual(packet_rates['telemetry'], 0.0)
+        self.assertEqual(byte_rate, 0.0)
+
+    def test_method_status_line(self):
+        engine = MagicMock()
+        engine.buffered = 3
+        engine.slots = 4096
+        engine.overflows = 0
+        status = self.instance.status_line(10.0, engine)
+        self.assertTrue(status.startswith("6 packets"))
+        self.assertIn("1 gaps", status)
+        self.assertIn("ring 3/4096, 0 overflows", status)
+
+    def test_method_summary(self):
+        engine = MagicMock()
+        engine.slots = 4096
+        engine.high_water_mark = 12
+        engine.overflows = 0
+        engine.packets_received = 6
+        engine.packets_written = 6
+
+        summary = self.instance.summary(engine)
+        self.assertEqual(summary['packets'], 6)
+        self.assertAlmostEqual(summary['duration'], 1.4)
+        self.assertEqual(summary['packet_types']['telemetry']['packets'], 3)
+        self.assertEqual(summary['gaps']['count'], 1)
+        self.assertEqual(summary['ring_buffer']['high_water_mark'], 12)
+        json.dumps(summary)
+
+    def test_method_summary_empty(self):
+        summary = CaptureStats().summary()
+        self.assertEqual(summary['packets'], 0)
+        self.assertIsNone(summary['bytes_per_second'])
+
+if __name__ == "__main__":
+    unittest.main()
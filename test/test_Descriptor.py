@@ -0,0 +1,73 @@
+"""
+Tests Descriptor.py.
+"""
+import json
+import os
+import tempfile
+import unittest
+from zlib import crc32
+
+from replayenhancer.Descriptor import DESCRIPTOR_VERSION, \
+    descriptor_version, load_descriptor, make_descriptor, packet_checksum, \
+    save_descriptor
+
+
+class TestDescriptor(unittest.TestCase):
+    """
+    Tests against the descriptor functions.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'descriptor.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_packet_checksum(self):
+        self.assertEqual(packet_checksum(b'packet'), crc32(b'packet'))
+
+    def test_make_descriptor(self):
+        self.assertDictEqual(
+            make_descriptor({
+                'race_end': (13, 1),
+                'race_finish': (9, None),
+                'race_start': (2, 3)}),
+            {
+                'version': DESCRIPTOR_VERSION,
+                'race_end': {'sequence': 13, 'checksum': 1},
+                'race_finish': {'sequence': 9},
+                'race_start': {'sequence': 2, 'checksum': 3}})
+
+    def test_descriptor_version(self):
+        self.assertEqual(descriptor_version({'race_end': 'hash'}), 1)
+        self.assertEqual(
+            descriptor_version(make_descriptor({
+                'race_end': (13, None),
+                'race_finish': (9, None),
+                'race_start': (2, None)})),
+            DESCRIPTOR_VERSION)
+
+    def test_save_load(self):
+        descriptor = make_descriptor({
+            'race_end': (13, 1),
+            'race_finish': (9, 2),
+            'race_start': (2, 3)})
+        save_descriptor(self.filename, descriptor)
+        self.assertDictEqual(load_descriptor(self.filename), descriptor)
+        self.assertFalse(os.path.exists(self.filename + '.tmp'))
+
+    def test_load_missing(self):
+        self.assertIsNone(load_descriptor(self.filename))
+
+    def test_load_invalid(self):
+        with open(self.filename, 'w') as descriptor_file:
+            descriptor_file.write('{')
+        self.assertIsNone(load_descriptor(self.filename))
+
+    def test_load_incomplete(self):
+        with open(self.filename, 'w') as descriptor_file:
+            json.dump({'race_end': 'hash'}, descriptor_file)
+        self.assertIsNone(load_descriptor(self.filename))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Tests DescriptorBuilder.py.
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from replayenhancer.Descriptor import make_descriptor, packet_checksum
+from replayenhancer.DescriptorBuilder import DescriptorBuilder, \
+    DescriptorWriter, state_summary
+from replayenhancer.RaceData import TelemetryData
+from test import test_ParticipantPacket, test_TelemetryDataPacket
+from test.test_RaceData import capture_packets
+
+
+def random_capture(seed):
+    """
+    Returns the packets of a capture of several races, restarts and
+    menu visits, ending with a finished race.
+    """
+    generator = random.Random(seed)
+    packets = list()
+    current_time = 0.0
+
+    def telemetry(race_state, game_state=2, session_state=5):
+        nonlocal current_time
+        current_time += 1.0
+        packets.append(
+            test_TelemetryDataPacket.TestTelemetryDataPacket.binary_data(
+                current_time=current_time,
+                race_state=race_state,
+                game_state=game_state,
+                session_state=session_state))
+        if generator.random() < 0.2:
+            packets.append(
+                test_ParticipantPacket.TestParticipantPacket.binary_data(
+                    car_name=str(current_time)))
+
+    for _ in range(generator.randrange(3)):
+        telemetry(0, game_state=1, session_state=0)
+
+    races = generator.randrange(1, 4)
+    for race in range(races):
+        for _ in range(generator.randrange(1, 4)):
+            telemetry(
+                generator.choice([0, 1]),
+                game_state=generator.choice([2, 2, 3]),
+                session_state=generator.choice([5, 5, 1]))
+        for _ in range(generator.randrange(1, 5)):
+            telemetry(2)
+        if race == races - 1 or generator.random() < 0.5:
+            for _ in range(generator.randrange(1, 4)):
+                telemetry(3)
+            if generator.random() < 0.7:
+                telemetry(0, game_state=1, session_state=0)
+
+    return packets
+
+
+class TestDescriptorBuilder(unittest.TestCase):
+    """
+    Tests against the DescriptorBuilder object.
+    """
+    @staticmethod
+    def build(packets):
+        builder = DescriptorBuilder()
+        for key, packet in enumerate(packets):
+            builder.add_packet(key, packet)
+        builder.finish()
+        return builder.descriptor
+
+    def test_descriptor(self):
+        self.assertDictEqual(
+            self.build(capture_packets()),
+            {'race_end': 13, 'race_finish': 9, 'race_start': 2})
+
+    def test_descriptor_finished_at_end(self):
+        self.assertDictEqual(
+            self.build(capture_packets()[:12]),
+            {'race_end': 11, 'race_finish': 9, 'race_start': 2})
+
+    def test_descriptor_not_finished(self):
+        self.assertIsNone(self.build(capture_packets()[:10]))
+
+    def test_method_add_packet_changed(self):
+        builder = DescriptorBuilder()
+        changes = [
+            builder.add_packet(key, packet)
+            for key, packet in enumerate(capture_packets())]
+        self.assertListEqual(
+            [key for key, changed in enumerate(changes) if changed],
+            [14])
+
+    def test_method_add_summary(self):
+        for seed in range(20):
+            packets = random_capture(seed)
+            states = [
+                (key, packet[3], packet[10]) if len(packet) == 1367
+                else (key, None, None)
+                for key, packet in enumerate(packets)]
+            split = random.Random(seed).randrange(len(packets))
+
+            builder = DescriptorBuilder()
+            builder.add_summary(state_summary(states[:split]))
+            builder.add_summary(state_summary(states[split:]))
+            builder.add_state(len(packets) - 1)
+            builder.finish()
+
+            self.assertEqual(
+                builder.descriptor,
+                self.build(packets),
+                "Seed {}".format(seed))
+
+    def test_descriptor_matches_telemetry_data(self):
+        for seed in range(20):
+            packets = random_capture(seed)
+            with tempfile.TemporaryDirectory() as directory:
+                for index, packet in enumerate(packets):
+                    with open(os.path.join(
+                            directory,
+                            'pdata{}'.format(index)), 'wb') as packet_file:
+                        packet_file.write(packet)
+                TelemetryData(directory)
+                with open(os.path.join(
+                        directory,
+                        'descriptor.json')) as descriptor_file:
+                    expected_result = json.load(descriptor_file)
+
+            self.assertDictEqual(
+                make_descriptor({
+                    key: (value, packet_checksum(packets[value]))
+                    for key, value in self.build(packets).items()}),
+                expected_result,
+                "Seed {}".format(seed))
+
+
+class TestDescriptorWriter(unittest.TestCase):
+    """
+    Tests against the DescriptorWriter object.
+    """
+    def test_write(self):
+        packets = capture_packets()
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'descriptor.json')
+            writer = DescriptorWriter(filename)
+            for packet in packets[:14]:
+                writer.write(packet)
+            self.assertFalse(os.path.exists(filename))
+
+            writer.write(packets[14])
+            writer.close()
+            with open(filename) as descriptor_file:
+                self.assertDictEqual(
+                    json.load(descriptor_file),
+                    make_descriptor({
+                        'race_end': (13, packet_checksum(packets[13])),
+                        'race_finish': (9, packet_checksum(packets[9])),
+                        'race_start': (2, packet_checksum(packets[2]))}))
+
+    def test_close_while_finished(self):
+        packets = capture_packets()[:12]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'descriptor.json')
+            writer = DescriptorWriter(filename)
+            for packet in packets:
+                writer.write(memoryview(packet))
+            writer.close()
+
+            self.assertDictEqual(
+                writer.descriptor['race_end'],
+                {'sequence': 11, 'checksum': packet_checksum(packets[11])})
+            self.assertTrue(os.path.exists(filename))
+
+if __name__ == "__main__":
+    unittest.main()
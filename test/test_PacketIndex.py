@@ -0,0 +1,182 @@
+"""
+Tests PacketIndex.py.
+"""
+import os
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+from replayenhancer.CaptureArchive import CAPTURE_ARCHIVE_FILENAME, \
+    CaptureArchiveWriter
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogWriter
+from replayenhancer.PacketIndex import INDEX_FILENAME, PacketIndex, \
+    UNKNOWN_PACKET_TYPE
+from replayenhancer.PacketSource import PacketDirectory, packet_source
+from test.test_RaceData import capture_packets
+
+
+class TestPacketIndex(unittest.TestCase):
+    """
+    Tests against the PacketIndex object.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, INDEX_FILENAME)
+        self.packets = capture_packets() + [b'\x00' * 10]
+        with CaptureLogWriter(os.path.join(
+                self.directory.name,
+                CAPTURE_LOG_FILENAME)) as writer:
+            for packet in self.packets:
+                writer.write(packet)
+        self.source = packet_source(self.directory.name)
+
+    def tearDown(self):
+        self.source.close()
+        self.directory.cleanup()
+
+    def test_method_build(self):
+        index = PacketIndex.build(self.source)
+        self.assertEqual(len(index), len(self.packets))
+        self.assertListEqual(
+            [entry.packet_type for entry in index][:3],
+            [0, 1, 0])
+        self.assertEqual(index[-1].packet_type, UNKNOWN_PACKET_TYPE)
+        self.assertEqual(index[2].race_state, 1)
+        self.assertEqual(index[2].current_time, -1.0)
+        self.assertIsNone(index[1].race_state)
+
+        for entry, packet in zip(index, self.packets):
+            self.assertEqual(
+                self.source.read(entry.sequence, entry.offset, entry.length),
+                packet)
+
+    def test_method_save_load(self):
+        index = PacketIndex.build(self.source)
+        index.save(self.filename)
+        self.assertListEqual(
+            PacketIndex.load(self.filename, self.source).entries,
+            index.entries)
+
+    def test_method_load_stale(self):
+        PacketIndex.build(self.source).save(self.filename)
+        with CaptureLogWriter(self.source.filename) as writer:
+            writer.write(self.packets[0])
+        self.assertIsNone(PacketIndex.load(self.filename, self.source))
+
+    def test_method_open_directory_rewritten(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for sequence, packet in enumerate(self.packets):
+            with open(os.path.join(
+                    directory.name,
+                    'pdata{}'.format(sequence)), 'wb') as packet_file:
+                packet_file.write(packet)
+        source = PacketDirectory(directory.name)
+        index = PacketIndex.open(source)
+
+        # The same number of packets, with the first recaptured.
+        recaptured = os.path.join(directory.name, 'recaptured')
+        with open(recaptured, 'wb') as packet_file:
+            packet_file.write(self.packets[1])
+        os.replace(recaptured, os.path.join(directory.name, 'pdata0'))
+
+        rewritten_source = PacketDirectory(directory.name)
+        self.assertEqual(len(rewritten_source), len(source))
+        self.assertNotEqual(rewritten_source.fingerprint, source.fingerprint)
+        rewritten_index = PacketIndex.open(rewritten_source)
+        self.assertEqual(index[0].length, len(self.packets[0]))
+        self.assertEqual(rewritten_index[0].length, len(self.packets[1]))
+        self.assertEqual(
+            rewritten_index[0].packet_type,
+            rewritten_index[1].packet_type)
+
+    def test_method_load_missing(self):
+        self.assertIsNone(PacketIndex.load(self.filename, self.source))
+
+    def test_method_load_invalid(self):
+        with open(self.filename, 'wb') as index_file:
+            index_file.write(b'Not an index')
+        self.assertIsNone(PacketIndex.load(self.filename, self.source))
+
+    def test_method_open(self):
+        index = PacketIndex.open(self.source)
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertListEqual(
+            PacketIndex.open(self.source).entries,
+            index.entries)
+
+    def test_method_telemetry(self):
+        self.assertListEqual(
+            [entry.sequence for entry in PacketIndex.build(
+                self.source).telemetry(5, 10)],
+            [6, 7, 8, 9])
+
+    def test_method_descriptor(self):
+        self.assertDictEqual(
+            PacketIndex.build(self.source).descriptor(),
+            {'race_end': 13, 'race_finish': 9, 'race_start': 2})
+
+    def test_method_descriptor_loaded(self):
+        PacketIndex.build(self.source).save(self.filename)
+        self.assertDictEqual(
+            PacketIndex.load(self.filename, self.source).descriptor(),
+            {'race_end': 13, 'race_finish': 9, 'race_start': 2})
+
+    def test_method_build_parallel(self):
+        expected_result = PacketIndex.build(self.source, workers=1)
+        sources = [self.source]
+        with CaptureArchiveWriter(os.path.join(
+                self.directory.name,
+                CAPTURE_ARCHIVE_FILENAME), chunk_packets=4) as writer:
+            for packet in self.packets:
+                writer.write(packet)
+        sources.append(packet_source(self.directory.name))
+        for sequence, packet in enumerate(self.packets):
+            with open(os.path.join(
+                    self.directory.name,
+                    'pdata{}'.format(sequence)), 'wb') as packet_file:
+                packet_file.write(packet)
+        sources.append(PacketDirectory(self.directory.name))
+
+        with patch('replayenhancer.PacketIndex.PARALLEL_PACKETS', 1):
+            for source in sources:
+                with self.subTest(kind=source.kind):
+                    index = PacketIndex.build(source, workers=2)
+                    self.assertListEqual(
+                        [entry[:2] + entry[3:] for entry in index],
+                        [entry[:2] + entry[3:]
+                         for entry in expected_result])
+                    self.assertDictEqual(
+                        index.descriptor(),
+                        expected_result.descriptor())
+                    source.close()
+
+    def test_method_build_parallel_broken(self):
+        expected_result = PacketIndex.build(self.source, workers=1)
+        with patch('replayenhancer.PacketIndex.PARALLEL_PACKETS', 1), \
+                patch.object(
+                    PacketIndex,
+                    '_build_parallel',
+                    side_effect=BrokenProcessPool), \
+                patch('replayenhancer.PacketIndex.tqdm') as tqdm:
+            # A progress bar of a tqdm before 4.32, with no reset.
+            tqdm.side_effect = lambda **_: MagicMock(spec=['update', 'close'])
+            index = PacketIndex.build(self.source, workers=2)
+
+        self.assertListEqual(index.entries, expected_result.entries)
+        self.assertEqual(tqdm.call_count, 2)
+
+    def test_method_build_reads_headers(self):
+        with patch.object(
+                self.source,
+                'read',
+                wraps=self.source.read) as read:
+            PacketIndex.build(self.source)
+        self.assertEqual(read.call_count, len(self.packets))
+        self.assertTrue(all(
+            length <= 24 for (_, _, length), _ in read.call_args_list))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests PacketManifest.py.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from replayenhancer.PacketManifest import MANIFEST_FILENAME, ManifestEntry, \
+    PacketManifest
+
+
+class TestPacketManifest(unittest.TestCase):
+    """
+    Tests against the PacketManifest object.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for index in (10, 2, 1):
+            self.write_packet(index)
+        os.utime(self.path('pdata1'), (1000.0, 1000.0))
+        # The directory was last changed well before the manifest.
+        os.utime(self.directory.name, (1000.0, 1000.0))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, filename):
+        return os.path.join(self.directory.name, filename)
+
+    def write_packet(self, index):
+        with open(self.path('pdata{}'.format(index)), 'wb') as packet_file:
+            packet_file.write(b'\x00' * index)
+
+    def test_build(self):
+        manifest = PacketManifest.build(self.directory.name)
+        self.assertListEqual(
+            [entry.filename for entry in manifest],
+            ['pdata1', 'pdata2', 'pdata10'])
+        self.assertEqual(manifest[0], ManifestEntry('pdata1', 1, 1000 * 10 ** 9))
+        self.assertEqual(manifest[2].size, 10)
+        self.assertListEqual(
+            manifest.filenames(),
+            [self.path('pdata1'), self.path('pdata2'), self.path('pdata10')])
+
+    def test_method_fingerprint(self):
+        fingerprint = PacketManifest.build(self.directory.name).fingerprint()
+        self.assertEqual(
+            PacketManifest.build(self.directory.name).fingerprint(),
+            fingerprint)
+
+        with open(self.path('pdata2'), 'wb') as packet_file:
+            packet_file.write(b'\x00' * 3)
+        self.assertNotEqual(
+            PacketManifest.build(self.directory.name).fingerprint(),
+            fingerprint)
+
+    def test_open_saves(self):
+        PacketManifest.open(self.directory.name)
+        self.assertTrue(os.path.exists(self.path(MANIFEST_FILENAME)))
+
+    @patch('replayenhancer.PacketManifest.CLOCK_RESOLUTION', 0)
+    def test_open_reuses(self):
+        expected_result = list(PacketManifest.open(self.directory.name))
+        with patch('replayenhancer.PacketManifest.os.scandir') as scandir:
+            manifest = PacketManifest.open(self.directory.name)
+        scandir.assert_not_called()
+        self.assertListEqual(list(manifest), expected_result)
+
+    def test_open_packet_added(self):
+        PacketManifest.open(self.directory.name)
+        self.write_packet(3)
+        self.assertIsNone(PacketManifest.load(self.directory.name))
+        self.assertListEqual(
+            [entry.filename for entry in PacketManifest.open(
+                self.directory.name)],
+            ['pdata1', 'pdata2', 'pdata3', 'pdata10'])
+
+    def test_open_sidecar_written(self):
+        expected_result = list(PacketManifest.open(self.directory.name))
+        with open(self.path('packet_index.bin.tmp'), 'wb'):
+            pass
+        os.replace(
+            self.path('packet_index.bin.tmp'),
+            self.path('packet_index.bin'))
+
+        with patch('replayenhancer.PacketManifest.natsorted') as natsorted:
+            manifest = PacketManifest.open(self.directory.name)
+        natsorted.assert_not_called()
+        self.assertListEqual(list(manifest), expected_result)
+        self.assertEqual(
+            PacketManifest.load(self.directory.name).directory_mtime,
+            os.stat(self.directory.name).st_mtime_ns)
+
+    def test_open_recently_checked(self):
+        expected_result = list(PacketManifest.open(self.directory.name))
+        with patch('replayenhancer.PacketManifest.natsorted') as natsorted:
+            manifest = PacketManifest.open(self.directory.name)
+        natsorted.assert_not_called()
+        self.assertListEqual(list(manifest), expected_result)
+
+    def test_open_packets_recaptured(self):
+        PacketManifest.open(self.directory.name)
+        for index in (1, 2, 10):
+            with open(self.path('recapture'), 'wb') as packet_file:
+                packet_file.write(b'\x00' * 2 * index)
+            os.replace(self.path('recapture'), self.path(
+                'pdata{}'.format(index)))
+
+        with patch('replayenhancer.PacketManifest.natsorted') as natsorted:
+            manifest = PacketManifest.open(self.directory.name)
+        natsorted.assert_not_called()
+        self.assertListEqual(
+            [(entry.filename, entry.size) for entry in manifest],
+            [('pdata1', 2), ('pdata2', 4), ('pdata10', 20)])
+        self.assertListEqual(
+            list(PacketManifest.load(self.directory.name)),
+            list(manifest))
+
+    def test_open_packet_renamed(self):
+        PacketManifest.open(self.directory.name)
+        os.rename(self.path('pdata2'), self.path('pdata3'))
+        self.assertIsNone(PacketManifest.load(self.directory.name))
+
+    def test_open_packet_added_same_tick(self):
+        os.utime(self.directory.name)
+        directory_mtime = os.stat(self.directory.name).st_mtime_ns
+        PacketManifest.open(self.directory.name)
+        self.write_packet(3)
+        os.utime(
+            self.directory.name,
+            ns=(directory_mtime, directory_mtime))
+
+        self.assertIsNone(PacketManifest.load(self.directory.name))
+
+    def test_open_invalid(self):
+        with open(self.path(MANIFEST_FILENAME), 'w') as manifest_file:
+            manifest_file.write('{')
+        self.assertEqual(len(PacketManifest.open(self.directory.name)), 3)
+        self.assertIsNotNone(PacketManifest.load(self.directory.name))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests PacketRegistry.py.
+"""
+import unittest
+from unittest.mock import MagicMock, sentinel
+
+from replayenhancer.PacketRegistry import PacketRegistry, packet_registry
+from replayenhancer.ParticipantPacket import ParticipantPacket
+from replayenhancer.TelemetryDataPacket import TelemetryDataPacket
+from test import test_ParticipantPacket, test_TelemetryDataPacket
+
+
+class TestPacketRegistry(unittest.TestCase):
+    """
+    Tests against the PacketRegistry object.
+    """
+    def setUp(self):
+        self.registry = packet_registry()
+        self.telemetry_data = test_TelemetryDataPacket \
+            .TestTelemetryDataPacket.binary_data()
+        self.participant_data = test_ParticipantPacket \
+            .TestParticipantPacket.binary_data()
+
+    def test_decode(self):
+        self.assertIsInstance(
+            self.registry.decode(self.telemetry_data),
+            TelemetryDataPacket)
+        self.assertIsInstance(
+            self.registry.decode(self.participant_data),
+            ParticipantPacket)
+
+    def test_decode_packet_types(self):
+        self.assertIsNone(
+            self.registry.decode(self.participant_data, {0}))
+        self.assertIsInstance(
+            self.registry.decode(self.telemetry_data, {0}),
+            TelemetryDataPacket)
+        self.assertEqual(sum(self.registry.unknown.values()), 0)
+
+    def test_decode_unknown_length(self):
+        self.assertIsNone(self.registry.decode(b'\x00' * 10))
+        self.assertIsNone(self.registry.decode(b''))
+        self.assertDictEqual(
+            dict(self.registry.unknown),
+            {(10, 0): 1, (0, None): 1})
+
+    def test_decode_unknown_packet_type(self):
+        packet_data = bytearray(self.telemetry_data)
+        packet_data[2] = 1
+        self.assertIsNone(self.registry.decode(packet_data))
+        self.assertDictEqual(dict(self.registry.unknown), {(1367, 1): 1})
+
+    def test_decode_malformed(self):
+        packet_data = bytearray(self.participant_data)
+        packet_data[3] = 0xFF
+        self.assertIsNone(self.registry.decode(packet_data))
+        self.assertDictEqual(dict(self.registry.malformed), {(1347, 1): 1})
+
+    def test_decoder_build_version(self):
+        registry = PacketRegistry()
+        registry.register(4, 0, sentinel.any_build)
+        registry.register(4, 0, sentinel.build, build_version=2)
+        self.assertIs(
+            registry.decoder(b'\x02\x00\x00\x00'),
+            sentinel.build)
+        self.assertIs(
+            registry.decoder(b'\x03\x00\x00\x00'),
+            sentinel.any_build)
+
+    def test_decode_lazy(self):
+        decoder = MagicMock()
+        registry = PacketRegistry()
+        registry.register(4, 0, decoder)
+        self.assertIsNone(registry.decode(b'\x00\x00\x01\x00'))
+        decoder.assert_not_called()
+
+        registry.decode(b'\x00\x00\x00\x00')
+        decoder.assert_called_once_with(b'\x00\x00\x00\x00')
+
+    def test_packet_types(self):
+        self.assertSetEqual(self.registry.packet_types(), {0, 1, 2})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+"""
+Tests PacketSource.py.
+"""
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import ANY, patch
+
+from replayenhancer.CaptureArchive import CAPTURE_ARCHIVE_FILENAME, \
+    CaptureArchiveWriter
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogReader, CaptureLogWriter
+from replayenhancer.PacketSource import DirectoryChunk, PacketArchive, \
+    PacketDirectory, PacketLog, map_file, packet_source, read_ahead
+
+
+class TestPacketSource(unittest.TestCase):
+    """
+    Tests against the packet sources.
+    """
+    packets = [b'\x01' * 1367, b'\x02' * 1347, b'\x03' * 1028]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_directory(self):
+        for index, packet in enumerate(self.packets):
+            with open(os.path.join(
+                    self.directory.name,
+                    'pdata{}'.format(index)), 'wb') as packet_file:
+                packet_file.write(packet)
+
+    def write_log(self):
+        filename = os.path.join(self.directory.name, CAPTURE_LOG_FILENAME)
+        with CaptureLogWriter(filename) as writer:
+            for packet in self.packets:
+                writer.write(packet)
+        return filename
+
+    def write_archive(self):
+        filename = os.path.join(
+            self.directory.name,
+            CAPTURE_ARCHIVE_FILENAME)
+        with CaptureArchiveWriter(filename, chunk_packets=2) as writer:
+            for packet in self.packets:
+                writer.write(packet)
+        return filename
+
+    def test_packet_source_directory(self):
+        self.write_directory()
+        self.assertIsInstance(
+            packet_source(self.directory.name),
+            PacketDirectory)
+
+    def test_packet_source_log(self):
+        filename = self.write_log()
+        self.assertIsInstance(packet_source(self.directory.name), PacketLog)
+        self.assertIsInstance(packet_source(filename), PacketLog)
+
+    def test_packet_source_archive(self):
+        self.write_log()
+        self.write_archive()
+        self.assertIsInstance(
+            packet_source(self.directory.name),
+            PacketArchive)
+
+    def test_packet_source_missing(self):
+        with self.assertRaises(NotADirectoryError):
+            packet_source(os.path.join(self.directory.name, 'missing'))
+
+    def test_method_read_directory(self):
+        self.write_directory()
+        source = packet_source(self.directory.name)
+        for sequence, offset, length, packet_data in source.records():
+            self.assertEqual(
+                source.read(sequence, offset, length),
+                packet_data)
+        self.assertListEqual(
+            list(source.packets(reverse=True)),
+            self.packets[::-1])
+
+    def test_method_read_log(self):
+        self.write_log()
+        source = packet_source(self.directory.name)
+        for sequence, offset, length, packet_data in source.records():
+            self.assertEqual(
+                source.read(sequence, offset, length),
+                packet_data)
+        source.close()
+        self.assertEqual(len(source), len(self.packets))
+
+    def test_method_read_log_memory_map(self):
+        filename = self.write_log()
+        source = packet_source(filename)
+        records = list(source.records())
+        packet_data = source.read(*records[1][:3])
+        self.assertIsInstance(packet_data, memoryview)
+        self.assertIs(packet_data.obj, map_file(filename).view.obj)
+        self.assertEqual(packet_data, self.packets[1])
+
+    def test_method_read_log_shared_mapping(self):
+        filename = self.write_log()
+        first_source = packet_source(filename)
+        second_source = packet_source(filename)
+        first_source.read(0, 12, 10)
+        second_source.read(0, 12, 10)
+        self.assertIs(first_source._mapping, second_source._mapping)
+
+    def test_method_read_log_no_memory_map(self):
+        self.write_log()
+        source = packet_source(self.directory.name, memory_map=False)
+        sequence, offset, length, packet_data = next(source.records())
+        self.assertIsInstance(source.read(sequence, offset, length), bytes)
+        source.close()
+
+    def test_method_read_log_grown(self):
+        filename = self.write_log()
+        source = packet_source(filename)
+        source.read(0, 12, 10)
+        with CaptureLogWriter(filename) as writer:
+            for packet in self.packets * 2:
+                writer.write(packet)
+        records = list(packet_source(filename, memory_map=False).records())
+        self.assertEqual(source.read(*records[-1][:3]), self.packets[-1])
+        source.close()
+
+    def test_method_read_archive(self):
+        self.write_archive()
+        source = packet_source(self.directory.name)
+        for sequence, offset, length, packet_data in reversed(
+                list(source.records())):
+            self.assertEqual(
+                source.read(sequence, offset, length),
+                packet_data)
+        self.assertEqual(source.read(0, 2, 3), self.packets[0][2:5])
+        source.close()
+        self.assertListEqual(
+            [packet_data for _, packet_data in source.timed_packets()],
+            self.packets)
+
+    def test_method_headers(self):
+        for write in (self.write_directory, self.write_log, self.write_archive):
+            with self.subTest(write=write.__name__):
+                write()
+                source = packet_source(self.directory.name)
+                self.assertListEqual(
+                    [(length, bytes(header))
+                     for _, _, length, header in source.headers(4)],
+                    [(len(packet), packet[:4]) for packet in self.packets])
+                source.close()
+
+    def test_method_chunks(self):
+        self.packets = [bytes([index]) * 10 for index in range(7)]
+        for write in (self.write_directory, self.write_log, self.write_archive):
+            with self.subTest(write=write.__name__):
+                write()
+                source = packet_source(self.directory.name)
+                chunks = source.chunks(3)
+                self.assertListEqual(
+                    [(chunk.start, len(chunk)) for chunk in chunks],
+                    [(0, 3), (3, 3), (6, 1)])
+                self.assertListEqual(
+                    [header
+                     for chunk in chunks
+                     for header in chunk.headers(4)],
+                    list(source.headers(4)))
+                source.close()
+
+    def test_method_chunks_directory(self):
+        self.write_directory()
+        chunk = PacketDirectory(self.directory.name).chunks(2)[1]
+        self.assertIsInstance(chunk, DirectoryChunk)
+        with patch('replayenhancer.PacketSource.PacketManifest') as manifest:
+            self.assertListEqual(
+                list(chunk.headers(4)),
+                [(2, 0, 1028, self.packets[2][:4])])
+        manifest.open.assert_not_called()
+
+    def test_method_chunks_log(self):
+        self.write_log()
+        chunk = packet_source(self.directory.name).chunks(2)[1]
+        with patch(
+                'replayenhancer.CaptureLog.CaptureLogReader.records',
+                autospec=True,
+                side_effect=CaptureLogReader.records) as records:
+            self.assertListEqual(
+                [(sequence, length, bytes(header))
+                 for sequence, _, length, header in chunk.headers(4)],
+                [(2, 1028, self.packets[2][:4])])
+        records.assert_called_once_with(ANY, chunk.record_offset)
+
+    def test_read_ahead_directory(self):
+        self.packets = [bytes([index]) * 10 for index in range(20)]
+        self.write_directory()
+        source = packet_source(self.directory.name)
+        self.assertListEqual(
+            list(read_ahead(
+                source,
+                ((sequence, 0, None) for sequence in range(19, -1, -1)),
+                depth=3,
+                workers=2)),
+            self.packets[::-1])
+
+    def test_read_ahead_closed_early(self):
+        self.packets = [bytes([index]) * 10 for index in range(20)]
+        self.write_directory()
+        packets = read_ahead(
+            packet_source(self.directory.name),
+            ((sequence, 0, None) for sequence in range(20)),
+            depth=4)
+        self.assertEqual(next(packets), self.packets[0])
+        with patch(
+                'replayenhancer.PacketSource.ThreadPoolExecutor.shutdown',
+                autospec=True,
+                side_effect=ThreadPoolExecutor.shutdown) as shutdown:
+            packets.close()
+        shutdown.assert_called_once_with(ANY, wait=False)
+
+    def test_read_ahead_log(self):
+        self.write_log()
+        source = packet_source(self.directory.name)
+        with patch('replayenhancer.PacketSource.ThreadPoolExecutor') \
+                as executor:
+            self.assertListEqual(
+                list(read_ahead(
+                    source,
+                    [record[:3] for record in source.records()])),
+                self.packets)
+        executor.assert_not_called()
+        source.close()
+
+if __name__ == "__main__":
+    unittest.main()
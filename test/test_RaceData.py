@@ -1,12 +1,169 @@
 """
 Tests RaceData.py.
 """
+import json
+import os
 import sys
+import tempfile
 import unittest
+from hashlib import md5
+from struct import Struct, pack_into
 from unittest.mock import MagicMock, PropertyMock, patch, sentinel
 
+from replayenhancer.CaptureArchive import CAPTURE_ARCHIVE_FILENAME, \
+    CaptureArchiveWriter
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogWriter
+from replayenhancer.Descriptor import make_descriptor, packet_checksum
 from replayenhancer.RaceData import RaceData, Driver, \
-    ClassificationEntry, SectorTime, StartingGridEntry
+    ClassificationEntry, SectorTime, StartingGridEntry, TelemetryData
+from test import test_AdditionalParticipantPacket, test_ParticipantPacket, \
+    test_TelemetryDataPacket
+
+
+def capture_packets():
+    """
+    Returns the packets of a short race: a menu packet, the grid, three
+    laps of racing, the finish and a return to the menu.
+    """
+    def telemetry(current_time, race_state, game_state=2, session_state=5):
+        binary_data = test_TelemetryDataPacket.TestTelemetryDataPacket \
+            .binary_data
+        return binary_data(
+            current_time=current_time,
+            race_state=race_state,
+            game_state=game_state,
+            session_state=session_state)
+
+    def participant(car_name):
+        binary_data = test_ParticipantPacket.TestParticipantPacket \
+            .binary_data
+        return binary_data(car_name=car_name)
+
+    return [
+        telemetry(0.0, 0, game_state=1, session_state=0),
+        participant("Menu"),
+        telemetry(-1.0, 1),
+        telemetry(-2.0, 1),
+        telemetry(-3.0, 1),
+        participant("Grid"),
+        telemetry(1.0, 2),
+        telemetry(2.0, 2),
+        telemetry(3.0, 2),
+        telemetry(4.0, 2),
+        telemetry(5.0, 3),
+        telemetry(6.0, 3),
+        telemetry(7.0, 3),
+        participant("Finish"),
+        telemetry(8.0, 0, game_state=1, session_state=0)]
+
+
+def race_packets(drivers, laps, *, interval=2.0, sector_time=10.0,
+                 pit_stop=None, leave=None, viewed=0):
+    """
+    Returns the packets of a race at Monza of `drivers` cars over `laps`
+    laps: a menu packet, the grid, the race until every car finishes
+    and a return to the menu.
+
+    Driver `index` takes `sector_time` plus `index` tenths of a second
+    over each sector, and a telemetry packet is sent every `interval`
+    seconds. If `pit_stop` is given, driver 1 stops in the pits at the
+    end of that lap. If `leave` is given, driver 1 leaves the race at
+    that race time, and the drivers after it move down a participant
+    index. The camera follows driver `viewed`.
+    """
+    participant_info = Struct('hhhHBBBBf')
+    participant_offset = 464
+    track_length_offset = participant_offset + participant_info.size * 56
+    track_length = 5782.521
+    pit_entry = (22, 0, -437)
+    pit_exit = (64, 0, -1)
+
+    names = ['Driver {}'.format(index) for index in range(drivers)]
+    sectors = laps * 3
+
+    def completed(index, race_time):
+        return min(
+            sectors,
+            max(0, int(race_time // (sector_time + index / 10))))
+
+    def participating(race_time):
+        return [
+            index for index in range(drivers)
+            if leave is None or race_time < leave or index != 1]
+
+    def telemetry(race_time, race_state, game_state=2, session_state=5):
+        indices = participating(race_time)
+        progress = {
+            index: completed(index, race_time) for index in indices}
+        current_time = -1.0 if race_time < 0 \
+            else race_time \
+            - progress[viewed] // 3 * 3 * (sector_time + viewed / 10)
+        packet_data = bytearray(
+            test_TelemetryDataPacket.TestTelemetryDataPacket.binary_data(
+                current_time=current_time,
+                race_state=race_state,
+                game_state=game_state,
+                session_state=session_state,
+                num_participants=len(indices),
+                viewed_participant_index=indices.index(viewed),
+                laps_in_event=laps,
+                event_time_remaining=0.0))
+        pack_into('f', packet_data, track_length_offset, track_length)
+
+        order = sorted(indices, key=lambda x: (-progress[x], x))
+        for position, index in enumerate(order, 1):
+            lap, sector = divmod(progress[index], 3)
+            world_position = (0, 0, 1000)
+            if index == 1 and pit_stop is not None:
+                if lap + 1 == pit_stop and sector == 2:
+                    world_position = pit_entry
+                elif lap == pit_stop and sector == 0:
+                    world_position = pit_exit
+            participant_info.pack_into(
+                packet_data,
+                participant_offset
+                + participant_info.size * indices.index(index),
+                *world_position,
+                0,
+                (1 << 7) + position,
+                lap,
+                min(lap + 1, laps),
+                sector + 1,
+                sector_time + index / 10 if progress[index] else -123.0)
+
+        return bytes(packet_data)
+
+    def participants(race_time):
+        participant_names = [
+            names[index] for index in participating(race_time)]
+        participant_names += [''] * (-len(participant_names) % 16)
+        yield test_ParticipantPacket.TestParticipantPacket.binary_data(
+            name=participant_names[:16])
+        for offset in range(16, len(participant_names), 16):
+            yield test_AdditionalParticipantPacket \
+                .TestAdditionalParticipantPacket.binary_data(
+                    offset=offset,
+                    name=participant_names[offset:offset + 16])
+
+    packets = [
+        telemetry(-1.0, 0, game_state=1, session_state=0),
+        telemetry(-1.0, 1),
+        telemetry(-1.0, 1)]
+    packets.extend(participants(-1.0))
+
+    race_time = 0.0
+    while completed(drivers - 1, race_time) < sectors:
+        race_time += interval
+        packets.append(telemetry(
+            race_time,
+            2 if completed(0, race_time) < sectors else 3))
+        if leave is not None and race_time - interval < leave <= race_time:
+            packets.extend(participants(race_time))
+    packets.append(telemetry(race_time + interval, 3))
+    packets.append(telemetry(race_time, 0, game_state=1, session_state=0))
+
+    return packets
 
 
 class TestRaceData(unittest.TestCase):
@@ -250,6 +407,190 @@ class TestRaceData(unittest.TestCase):
         pass
 
 
+class TestRaceDataSeek(unittest.TestCase):
+    """
+    Tests seeking a RaceData read from a race.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for index, packet in enumerate(race_packets(4, 3, pit_stop=2)):
+            with open(os.path.join(
+                    self.directory.name,
+                    'pdata{}'.format(index)), 'wb') as packet_file:
+                packet_file.write(packet)
+
+        race_data = RaceData(self.directory.name, snapshot_interval=None)
+        self.states = [self.state(race_data)]
+        while True:
+            try:
+                race_data.get_data()
+            except StopIteration:
+                break
+            self.states.append(self.state(race_data))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def state(race_data):
+        return (
+            race_data.elapsed_time,
+            race_data.race_state,
+            [(entry.position, entry.driver_name, entry.laps_complete,
+              entry.race_time, entry.stops,
+              [(sector_time.time, sector_time.sector, sector_time.invalid)
+               for sector_time in entry.driver.sector_times])
+             for entry in race_data.all_driver_classification])
+
+    def expected_state(self, time):
+        return next(state for state in self.states if state[0] >= time)
+
+    def test_snapshots(self):
+        race_data = RaceData(self.directory.name, snapshot_interval=20.0)
+        race_data.seek(90.0)
+        self.assertListEqual(
+            race_data._snapshot_times,
+            [0.0, 20.0, 40.0, 60.0, 80.0])
+
+    def test_method_seek_backward(self):
+        race_data = RaceData(self.directory.name, snapshot_interval=20.0)
+        race_data.seek(90.0)
+        for time in (75.0, 31.0, 40.0, 0.0):
+            race_data.seek(time)
+            self.assertEqual(self.state(race_data), self.expected_state(time))
+
+    def test_method_seek_forward(self):
+        race_data = RaceData(self.directory.name, snapshot_interval=20.0)
+        race_data.seek(90.0)
+        race_data.seek(10.0)
+        with patch.object(race_data.capture, 'seek') as seek:
+            race_data.seek(15.0)
+        seek.assert_not_called()
+        self.assertEqual(self.state(race_data), self.expected_state(15.0))
+
+        race_data.seek(65.0)
+        self.assertEqual(self.state(race_data), self.expected_state(65.0))
+
+    def test_method_seek_continue(self):
+        race_data = RaceData(self.directory.name, snapshot_interval=20.0)
+        race_data.seek(90.0)
+        race_data.seek(30.0)
+        states = [self.state(race_data)]
+        while True:
+            try:
+                race_data.get_data()
+            except StopIteration:
+                break
+            states.append(self.state(race_data))
+        self.assertListEqual(
+            states,
+            self.states[self.states.index(self.expected_state(30.0)):])
+
+    def test_property_classification_per_version(self):
+        race_data = RaceData(self.directory.name, snapshot_interval=20.0)
+        classification = race_data.classification
+        version = race_data.version
+        self.assertEqual(race_data.classification, classification)
+        self.assertIsNot(race_data.classification, classification)
+
+        race_data.get_data()
+        self.assertGreater(race_data.version, version)
+        self.assertNotEqual(race_data.classification, classification)
+
+        race_data.seek(50.0)
+        classification = race_data.classification
+        race_data.seek(20.0)
+        self.assertFalse(any(
+            entry in race_data.classification for entry in classification))
+        self.assertEqual(self.state(race_data), self.expected_state(20.0))
+
+    def test_property_all_driver_classification_unshared(self):
+        race_data = RaceData(self.directory.name, snapshot_interval=None)
+        race_data.get_data(30.0)
+        positions = [entry.position for entry in race_data.classification]
+        for entry in race_data.all_driver_classification:
+            entry.position = None
+
+        self.assertListEqual(
+            [entry.position for entry in race_data.classification],
+            positions)
+
+class TestRaceDataRoster(unittest.TestCase):
+    """
+    Tests a RaceData read from a race that a driver leaves.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def race_data(self, **kwargs):
+        for index, packet in enumerate(race_packets(4, 3, **kwargs)):
+            with open(os.path.join(
+                    self.directory.name,
+                    'pdata{}'.format(index)), 'wb') as packet_file:
+                packet_file.write(packet)
+        return RaceData(self.directory.name, snapshot_interval=None)
+
+    def test_driver_leaves(self):
+        race_data = self.race_data(leave=25.0, viewed=3)
+        race_data.get_data(30.0)
+
+        self.assertNotIn('Driver 1', race_data.drivers)
+        self.assertIn('Driver 1', race_data._dropped_drivers)
+        self.assertListEqual(
+            [race_data._driver(index).name for index in range(3)],
+            ['Driver 0', 'Driver 2', 'Driver 3'])
+        self.assertIsNone(race_data._driver(3))
+        self.assertListEqual(
+            [(entry.driver_name, entry.viewed_driver)
+             for entry in race_data.classification],
+            [('Driver 0', False), ('Driver 2', False), ('Driver 3', True)])
+        self.assertListEqual(
+            [entry.position for entry in race_data.classification],
+            [1, 2, 3])
+
+    def test_elapsed_time_driver_leaves(self):
+        race_data = self.race_data(leave=25.0, viewed=3)
+        elapsed_times = list()
+        while True:
+            try:
+                race_data.get_data()
+            except StopIteration:
+                break
+            if race_data.race_state == 2:
+                elapsed_times.append(race_data.elapsed_time)
+
+        self.assertGreater(len(elapsed_times), 20)
+        for elapsed_time, race_time in zip(
+                elapsed_times,
+                range(2, 1000, 2)):
+            self.assertAlmostEqual(elapsed_time, race_time, places=3)
+
+    def test_participant_without_driver(self):
+        race_data = self.race_data()
+        race_data.get_data(10.0)
+        sector_times = len(race_data.drivers['Driver 2'].sector_times)
+        race_data._driver_table[2] = None
+
+        race_data.get_data(40.0)
+        self.assertEqual(
+            len(race_data.drivers['Driver 2'].sector_times),
+            sector_times)
+        self.assertGreater(
+            len(race_data.drivers['Driver 1'].sector_times),
+            sector_times)
+
+    def test_viewed_driver_without_driver(self):
+        race_data = self.race_data()
+        race_data.get_data(10.0)
+        race_data._driver_table[0] = None
+
+        with self.assertRaises(StopIteration):
+            race_data.get_data()
+
+
 class TestClassificationEntry(unittest.TestCase):
     """
     Unit tests for ClassificationEntry object.
@@ -334,6 +675,71 @@ class TestDriver(unittest.TestCase):
         instance = Driver(sentinel.index, sentinel.name)
         self.assertIsNone(instance.best_lap)
 
+    def test_method_copy(self):
+        instance = Driver(sentinel.index, sentinel.name)
+        instance.add_sector_time(SectorTime(10.0, 1, 0))
+        instance.stops = 1
+        copy = instance.copy()
+        instance.add_sector_time(SectorTime(11.0, 2, 1))
+
+        self.assertEqual(copy.name, sentinel.name)
+        self.assertEqual(copy.stops, 1)
+        self.assertEqual(len(copy.sector_times), 1)
+        self.assertFalse(copy.sector_times[0].invalid)
+        self.assertTrue(instance.sector_times[0].invalid)
+
+    def test_properties_read_while_racing(self):
+        instance = Driver(sentinel.index, sentinel.name)
+        test_data = [
+            (12.000, 3, False),
+            (30.000, 1, False),
+            (45.000, 2, False),
+            (40.000, 3, False),
+            (29.000, 1, True),
+            (44.000, 2, False),
+            (39.000, 3, False),
+            (31.000, 1, False),
+            (43.000, 2, False),
+            (41.000, 3, False),
+            (28.000, 1, False),
+            (46.000, 2, True),
+        ]
+        for data in test_data:
+            instance.add_sector_time(SectorTime(*data))
+            # Reads the running totals as the race is processed.
+            _ = instance.best_lap, instance.lap_times, instance.race_time, \
+                instance.best_sector_1, instance.last_lap_invalid
+
+        self.assertEqual(instance.lap_times, [115.0, 112.0, 115.0])
+        self.assertEqual(instance.best_lap, 115.0)
+        self.assertEqual(instance.last_lap_time, 115.0)
+        self.assertFalse(instance.last_lap_invalid)
+        self.assertEqual(instance.best_sector_1, 30.0)
+        self.assertEqual(instance.best_sector_2, 43.0)
+        self.assertEqual(instance.best_sector_3, 12.0)
+        self.assertEqual(instance.race_time, 428.0)
+        self.assertEqual(instance.laps_complete, 4)
+
+    def test_method_copy_running_totals(self):
+        instance = Driver(sentinel.index, sentinel.name)
+        for data in [(30.0, 1, False), (45.0, 2, False), (40.0, 3, False),
+                     (35.0, 1, False), (43.0, 2, False), (39.0, 3, False),
+                     (36.0, 1, False)]:
+            instance.add_sector_time(SectorTime(*data))
+        self.assertEqual(instance.best_lap, 115.0)
+        copy = instance.copy()
+        instance.add_sector_time(SectorTime(44.0, 2, True))
+
+        self.assertEqual(copy.best_lap, 115.0)
+        self.assertEqual(copy.race_time, 268.0)
+        self.assertEqual(instance.best_lap, 115.0)
+        self.assertEqual(instance.best_sector_1, 30.0)
+        self.assertEqual(instance.race_time, 312.0)
+        copy.add_sector_time(SectorTime(44.0, 2, False))
+        copy.add_sector_time(SectorTime(34.0, 3, False))
+        self.assertEqual(copy.best_lap, 114.0)
+        self.assertEqual(instance.lap_times, [115.0, 117.0])
+
     def test_property_best_lap_valid(self):
         instance = Driver(sentinel.index, sentinel.name)
         test_data = [
@@ -669,6 +1075,24 @@ class TestDriver(unittest.TestCase):
 
         self.assertEqual(instance.best_sector_3, expected_value)
 
+    def test_property_completed_lap_time(self):
+        instance = Driver(sentinel.index, sentinel.name)
+        instance.add_sector_time(SectorTime(12.0, 3, False))
+        for lap in range(10):
+            for sector in (1, 2, 3):
+                instance.add_sector_time(
+                    SectorTime(30.0 + lap, sector, lap == 4))
+                self.assertEqual(
+                    instance.completed_lap_time,
+                    sum(instance.lap_times))
+        instance.add_sector_time(SectorTime(25.0, 1, False))
+
+        self.assertEqual(instance.completed_lap_time, 1035.0)
+
+    def test_property_completed_lap_time_no_laps(self):
+        instance = Driver(sentinel.index, sentinel.name)
+        self.assertEqual(instance.completed_lap_time, 0)
+
     def test_property_index(self):
         instance = Driver(sentinel.index, sentinel.name)
         expected_result = sentinel.index
@@ -1098,5 +1522,229 @@ class TestStartingGridEntry(unittest.TestCase):
         expected_result = sentinel.position
         self.assertEqual(instance.position, expected_result)
 
+class TestTelemetryData(unittest.TestCase):
+    """
+    Tests against the TelemetryData object.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.packets = capture_packets()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_directory(self):
+        for index, packet in enumerate(self.packets):
+            with open(os.path.join(
+                    self.directory.name,
+                    'pdata{}'.format(index)), 'wb') as packet_file:
+                packet_file.write(packet)
+
+    def write_log(self):
+        with CaptureLogWriter(os.path.join(
+                self.directory.name,
+                CAPTURE_LOG_FILENAME)) as writer:
+            for packet in self.packets:
+                writer.write(packet)
+
+    def write_archive(self):
+        with CaptureArchiveWriter(
+                os.path.join(self.directory.name, CAPTURE_ARCHIVE_FILENAME),
+                chunk_packets=4) as writer:
+            for packet in self.packets:
+                writer.write(packet)
+
+    def read_descriptor(self):
+        with open(os.path.join(
+                self.directory.name,
+                'descriptor.json')) as descriptor_file:
+            return json.load(descriptor_file)
+
+    def expected_descriptor(self):
+        return make_descriptor({
+            'race_end': (13, packet_checksum(self.packets[13])),
+            'race_finish': (9, packet_checksum(self.packets[9])),
+            'race_start': (2, packet_checksum(self.packets[2]))})
+
+    def test_sequences(self):
+        self.write_directory()
+        instance = TelemetryData(self.directory.name)
+        list(instance)
+        self.assertListEqual(
+            list(instance.sequences),
+            [3, 4, 5, 6, 7, 8, 9, 10, 11, 12])
+
+    def test_method_seek(self):
+        self.write_directory()
+        instance = TelemetryData(self.directory.name)
+        next(instance)
+        instance.seek(8)
+        self.assertListEqual(
+            [packet.current_time for packet in instance
+             if packet.packet_type == 0],
+            [3.0, 4.0, 5.0, 6.0, 7.0])
+        self.assertListEqual(list(instance.sequences), [8, 9, 10, 11, 12])
+
+    def test_init_not_directory(self):
+        with self.assertRaises(NotADirectoryError):
+            TelemetryData(os.path.join(self.directory.name, 'missing'))
+
+    def test_descriptor_directory(self):
+        self.write_directory()
+        TelemetryData(self.directory.name)
+        self.assertDictEqual(
+            self.read_descriptor(),
+            self.expected_descriptor())
+
+    def test_descriptor_log(self):
+        self.write_log()
+        TelemetryData(self.directory.name)
+        self.assertDictEqual(
+            self.read_descriptor(),
+            self.expected_descriptor())
+
+    def test_packets_directory(self):
+        self.write_directory()
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name)],
+            [md5(packet).hexdigest() for packet in self.packets[3:13]])
+
+    def test_packets_log(self):
+        self.write_log()
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(os.path.join(
+                self.directory.name,
+                CAPTURE_LOG_FILENAME))],
+            [md5(packet).hexdigest() for packet in self.packets[3:13]])
+
+    def test_packets_log_memory_map(self):
+        self.write_log()
+        for packet in TelemetryData(self.directory.name):
+            self.assertIsInstance(packet._packet_data, memoryview)
+
+    def test_packets_archive(self):
+        self.write_archive()
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name)],
+            [md5(packet).hexdigest() for packet in self.packets[3:13]])
+        self.assertDictEqual(
+            self.read_descriptor(),
+            self.expected_descriptor())
+
+    def test_packet_count_log(self):
+        self.write_log()
+        self.assertEqual(
+            TelemetryData(self.directory.name).packet_count,
+            len(self.packets))
+
+    def test_packets_no_read_ahead(self):
+        self.write_directory()
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name,
+                read_ahead=0)],
+            [md5(packet).hexdigest() for packet in self.packets[3:13]])
+
+    def test_packets_telemetry_only(self):
+        self.write_log()
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name,
+                telemetry_only=True)],
+            [md5(packet).hexdigest() for packet in self.packets[3:13]
+             if len(packet) == 1367])
+
+    def test_packets_descriptor_v1(self):
+        self.write_directory()
+        with open(os.path.join(
+                self.directory.name,
+                'descriptor.json'), 'w') as descriptor_file:
+            json.dump({
+                'race_end': md5(self.packets[11]).hexdigest(),
+                'race_finish': md5(self.packets[8]).hexdigest(),
+                'race_start': md5(self.packets[4]).hexdigest()},
+                descriptor_file)
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name)],
+            [md5(packet).hexdigest() for packet in self.packets[5:11]])
+        self.assertDictEqual(
+            self.read_descriptor(),
+            make_descriptor({
+                'race_end': (11, packet_checksum(self.packets[11])),
+                'race_finish': (8, packet_checksum(self.packets[8])),
+                'race_start': (4, packet_checksum(self.packets[4]))}))
+
+    def test_packets_descriptor_v1_not_found(self):
+        self.write_directory()
+        with open(os.path.join(
+                self.directory.name,
+                'descriptor.json'), 'w') as descriptor_file:
+            json.dump({
+                'race_end': md5(b'missing').hexdigest(),
+                'race_finish': md5(self.packets[8]).hexdigest(),
+                'race_start': md5(self.packets[4]).hexdigest()},
+                descriptor_file)
+        self.assertEqual(len(list(TelemetryData(self.directory.name))), 10)
+        self.assertDictEqual(
+            self.read_descriptor(),
+            self.expected_descriptor())
+
+    def test_packets_descriptor_v2(self):
+        self.write_directory()
+        with open(os.path.join(
+                self.directory.name,
+                'descriptor.json'), 'w') as descriptor_file:
+            json.dump(make_descriptor({
+                'race_end': (11, None),
+                'race_finish': (8, None),
+                'race_start': (4, None)}), descriptor_file)
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name)],
+            [md5(packet).hexdigest() for packet in self.packets[5:11]])
+
+    def test_packets_descriptor_v2_checksum_mismatch(self):
+        self.write_directory()
+        with open(os.path.join(
+                self.directory.name,
+                'descriptor.json'), 'w') as descriptor_file:
+            json.dump(make_descriptor({
+                'race_end': (11, packet_checksum(self.packets[11])),
+                'race_finish': (8, packet_checksum(self.packets[8])),
+                'race_start': (4, packet_checksum(self.packets[3]))}),
+                descriptor_file)
+        self.assertEqual(len(list(TelemetryData(self.directory.name))), 10)
+        self.assertDictEqual(
+            self.read_descriptor(),
+            self.expected_descriptor())
+
+    def test_packets_reverse(self):
+        self.write_log()
+        self.assertListEqual(
+            [packet.data_hash for packet in TelemetryData(
+                self.directory.name,
+                reverse=True)],
+            [md5(packet).hexdigest() for packet in self.packets[12:2:-1]])
+
+    def test_packets_unknown_counted(self):
+        self.packets.insert(7, b'\x00' * 10)
+        self.write_log()
+        telemetry_data = TelemetryData(self.directory.name)
+        self.assertEqual(len(list(telemetry_data)), 10)
+        self.assertDictEqual(
+            dict(telemetry_data.registry.unknown),
+            {(10, 0): 1})
+
+    def test_index_saved(self):
+        self.write_directory()
+        telemetry_data = TelemetryData(self.directory.name)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.directory.name,
+            'packet_index.bin')))
+        self.assertEqual(telemetry_data.index[2].race_state, 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests RacePipeline.py.
+"""
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, call, sentinel
+
+from replayenhancer.RacePipeline import Duration, RacePipeline, SyncPoints, \
+    TotalTime
+
+
+def race_state(elapsed_time, laps_complete=(0, 0), *, laps_in_event=0,
+               race_state=2, event_time_remaining=0.0):
+    return SimpleNamespace(
+        elapsed_time=elapsed_time,
+        drivers={
+            index: SimpleNamespace(laps_complete=laps)
+            for index, laps in enumerate(laps_complete)},
+        laps_in_event=laps_in_event,
+        race_state=race_state,
+        event_time_remaining=event_time_remaining)
+
+
+class TestRacePipeline(unittest.TestCase):
+    """
+    Tests against the RacePipeline object.
+    """
+    def test_method_run(self):
+        race_data = MagicMock()
+        race_data.get_data.side_effect = [
+            sentinel.packet, sentinel.packet, StopIteration]
+        consumer = MagicMock()
+
+        RacePipeline(race_data, [consumer]).run()
+
+        self.assertEqual(race_data.get_data.call_count, 3)
+        self.assertListEqual(
+            consumer.method_calls,
+            [call.update(race_data)] * 3 + [call.finish(race_data)])
+
+
+class TestDuration(unittest.TestCase):
+    """
+    Tests against the Duration object.
+    """
+    def test_method_finish(self):
+        instance = Duration()
+        instance.update(race_state(10.0))
+        instance.finish(race_state(42.5))
+        self.assertEqual(instance.duration, 42.5)
+
+
+class TestSyncPoints(unittest.TestCase):
+    """
+    Tests against the SyncPoints object.
+    """
+    def test_all_laps_complete(self):
+        instance = SyncPoints()
+        for state in [
+                race_state(30.0),
+                race_state(60.0, (1, 0)),
+                race_state(62.0, (1, 0)),
+                race_state(65.0, (1, 1)),
+                race_state(90.0, (2, 1))]:
+            instance.update(state)
+        instance.finish(race_state(100.0, (2, 2)))
+
+        self.assertEqual(instance.start_time, 50.0)
+        self.assertEqual(instance.end_time, 75.0)
+
+    def test_same_update(self):
+        instance = SyncPoints()
+        instance.update(race_state(30.0))
+        instance.update(race_state(60.0, (1, 1)))
+        instance.finish(race_state(60.0, (1, 1)))
+
+        self.assertEqual(instance.start_time, 50.0)
+        self.assertEqual(instance.end_time, 70.0)
+
+    def test_laps_not_complete(self):
+        instance = SyncPoints()
+        instance.update(race_state(60.0, (1, 0)))
+        instance.finish(race_state(90.0, (2, 0)))
+
+        self.assertEqual(instance.start_time, 50.0)
+        self.assertEqual(instance.end_time, 110.0)
+
+    def test_no_laps_complete(self):
+        instance = SyncPoints()
+        instance.update(race_state(60.0))
+        instance.finish(race_state(90.0))
+
+        self.assertEqual(instance.start_time, 0.0)
+        self.assertEqual(instance.end_time, 60.0)
+
+
+class TestTotalTime(unittest.TestCase):
+    """
+    Tests against the TotalTime object.
+    """
+    def test_timed_race(self):
+        instance = TotalTime()
+        for state in [
+                race_state(0.0, race_state=1, event_time_remaining=900.0),
+                race_state(1.0, race_state=2, event_time_remaining=599.2),
+                race_state(2.0, race_state=2, event_time_remaining=598.2)]:
+            instance.update(state)
+        instance.finish(race_state(2.0))
+
+        self.assertEqual(instance.total_time, 600)
+
+    def test_lap_race(self):
+        instance = TotalTime()
+        for state in [
+                race_state(0.0, laps_in_event=5, race_state=1),
+                race_state(1.0, laps_in_event=5, event_time_remaining=9.2)]:
+            instance.update(state)
+        instance.finish(race_state(1.0))
+
+        self.assertIsNone(instance.total_time)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests RaceTimeline.py.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from replayenhancer.RaceData import RaceData
+from replayenhancer.RacePipeline import RacePipeline
+from replayenhancer.RaceTimeline import RaceTimeline, TIMELINE_FILENAME, \
+    TimelineRecorder, capture_identity, _CODE_FILES
+from test.test_RaceData import race_packets
+
+
+class StateRecorder:
+    """Records the race-wide state of a race at each packet."""
+    def __init__(self):
+        self.states = list()
+        self.final = None
+
+    @staticmethod
+    def state(race_data, classification):
+        return [
+            (entry.position, entry.driver_name, entry.viewed_driver,
+             entry.laps_complete, entry.race_time, entry.best_lap,
+             entry.stops,
+             [(sector_time.time, sector_time.sector, sector_time.invalid)
+              for sector_time in entry.driver.sector_times])
+            for entry in classification]
+
+    def update(self, race_data):
+        self.states.append((
+            race_data.elapsed_time,
+            race_data.race_state,
+            self.state(race_data, race_data.classification)))
+
+    def finish(self, race_data):
+        self.final = self.state(
+            race_data,
+            race_data.all_driver_classification)
+
+
+class TestRaceTimeline(unittest.TestCase):
+    """
+    Tests against the RaceTimeline object.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for sequence, packet_data in enumerate(
+                race_packets(4, 3, pit_stop=2)):
+            with open(os.path.join(
+                    self.directory.name,
+                    'pdata{}'.format(sequence)), 'wb') as packet_file:
+                packet_file.write(packet_data)
+
+        self.filename = os.path.join(self.directory.name, TIMELINE_FILENAME)
+
+        race_data = RaceData(self.directory.name)
+        self.identity = capture_identity(race_data.capture)
+        self.expected = StateRecorder()
+        recorder = TimelineRecorder(self.identity)
+        RacePipeline(race_data, [self.expected, recorder]).run()
+        self.timeline = recorder.timeline
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record(self):
+        self.assertEqual(len(self.timeline), len(self.expected.states))
+        self.assertEqual(self.timeline.laps_in_event, 3)
+        self.assertListEqual(
+            [entry[2] for entry in self.timeline.starting_grid],
+            ['Driver 0', 'Driver 1', 'Driver 2', 'Driver 3'])
+        self.assertListEqual(
+            [(self.timeline.names[number], stops)
+             for _, number, stops in self.timeline.stops],
+            [('Driver 1', 1)])
+
+    def test_replay(self):
+        result = StateRecorder()
+        RacePipeline(self.timeline.replay(), [result]).run()
+        self.assertListEqual(result.states, self.expected.states)
+        self.assertListEqual(result.final, self.expected.final)
+
+    def test_method_get_data_at_time(self):
+        timeline_data = self.timeline.replay()
+        timeline_data.get_data(50.0)
+        self.assertGreaterEqual(timeline_data.elapsed_time, 50.0)
+        self.assertLess(timeline_data.elapsed_time, 52.0)
+
+    def test_save_load(self):
+        self.timeline.save(self.filename)
+        timeline = RaceTimeline.load(self.filename, self.identity)
+
+        result = StateRecorder()
+        RacePipeline(timeline.replay(), [result]).run()
+        self.assertListEqual(result.states, self.expected.states)
+        self.assertListEqual(result.final, self.expected.final)
+
+    def test_load_missing(self):
+        self.assertIsNone(RaceTimeline.load(self.filename, self.identity))
+
+    def test_load_other_capture(self):
+        self.timeline.save(self.filename)
+        identity = dict(self.identity, packet_count=1)
+        self.assertIsNone(RaceTimeline.load(self.filename, identity))
+
+    def test_load_other_code_version(self):
+        self.timeline.save(self.filename)
+        with patch('replayenhancer.RaceTimeline.code_version') \
+                as code_version:
+            code_version.return_value = 'other'
+            self.assertIsNone(
+                RaceTimeline.load(self.filename, self.identity))
+
+    def test_code_files(self):
+        directory = os.path.dirname(
+            sys.modules[RaceTimeline.__module__].__file__)
+        for filename in _CODE_FILES:
+            with self.subTest(filename=filename):
+                self.assertTrue(os.path.exists(
+                    os.path.join(directory, filename)))
+
+    def test_load_invalid(self):
+        with open(self.filename, 'w') as timeline_file:
+            timeline_file.write('{')
+        self.assertIsNone(RaceTimeline.load(self.filename, self.identity))
+
+if __name__ == "__main__":
+    unittest.main()
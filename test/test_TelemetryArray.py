@@ -0,0 +1,117 @@
+"""
+Tests TelemetryArray.py.
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import numpy
+
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogWriter
+from replayenhancer.TelemetryArray import PACKET_DTYPE, TELEMETRY_DTYPE, \
+    decode_telemetry, load_telemetry
+from replayenhancer.TelemetryDataPacket import TelemetryDataPacket
+from test.test_RaceData import capture_packets
+
+
+def random_packet(seed):
+    """Returns a telemetry packet of random data."""
+    generator = random.Random(seed)
+    packet_data = bytearray(
+        generator.getrandbits(8)
+        for _ in range(PACKET_DTYPE.itemsize))
+    packet_data[2] &= 0xFC
+    return bytes(packet_data)
+
+
+class TestTelemetryArray(unittest.TestCase):
+    """
+    Tests against the columnar telemetry decoding.
+    """
+    def test_dtype(self):
+        self.assertEqual(
+            PACKET_DTYPE.itemsize,
+            TelemetryDataPacket._packet_struct.size)
+        self.assertEqual(
+            TELEMETRY_DTYPE['participant_info'].shape,
+            (56,))
+
+    def test_decode_telemetry(self):
+        packets = [random_packet(seed) for seed in range(10)]
+        telemetry = decode_telemetry(b''.join(packets))
+        self.assertEqual(len(telemetry), len(packets))
+
+        for row, packet_data in zip(telemetry, packets):
+            packet = TelemetryDataPacket(packet_data)
+            for field in (
+                    'build_version_number', 'viewed_participant_index',
+                    'laps_in_event', 'joypad', 'steering', 'crash_state',
+                    'enforced_pit_stop_lap', 'game_state', 'session_state',
+                    'race_state', 'd_pad'):
+                self.assertEqual(row[field], getattr(packet, field), field)
+            for field in (
+                    'current_time', 'event_time_remaining', 'odometer',
+                    'track_length'):
+                numpy.testing.assert_equal(
+                    row[field],
+                    numpy.float32(getattr(packet, field)))
+            for field in ('tyre_tread_temp', 'extents_centre', 'wings'):
+                numpy.testing.assert_array_equal(
+                    row[field],
+                    numpy.array(
+                        getattr(packet, field),
+                        dtype=row[field].dtype))
+
+            for participant, info in zip(
+                    row['participant_info'],
+                    packet.participant_info):
+                numpy.testing.assert_array_equal(
+                    participant['world_position'],
+                    numpy.array(info.world_position, dtype='f4'))
+                self.assertEqual(
+                    participant['race_position'],
+                    info.race_position)
+                self.assertEqual(
+                    participant['is_active'],
+                    bool(info.is_active))
+                self.assertEqual(
+                    participant['laps_completed'],
+                    info.laps_completed)
+                self.assertEqual(
+                    participant['invalid_lap'],
+                    bool(info.invalid_lap))
+                self.assertEqual(participant['sector'], info.sector)
+                self.assertEqual(
+                    participant['current_lap'],
+                    info.current_lap)
+
+    def test_decode_telemetry_not_telemetry(self):
+        packet_data = bytearray(random_packet(0))
+        packet_data[2] |= 1
+        with self.assertRaises(ValueError):
+            decode_telemetry(bytes(packet_data))
+
+    def test_load_telemetry(self):
+        packets = capture_packets()
+        with tempfile.TemporaryDirectory() as directory:
+            with CaptureLogWriter(os.path.join(
+                    directory,
+                    CAPTURE_LOG_FILENAME)) as writer:
+                for packet in packets:
+                    writer.write(packet)
+            telemetry = load_telemetry(directory)
+
+        sequences = [
+            sequence for sequence, packet in enumerate(packets)
+            if len(packet) == 1367]
+        self.assertListEqual(telemetry['sequence'].tolist(), sequences)
+        self.assertListEqual(
+            telemetry['race_state'].tolist(),
+            [TelemetryDataPacket(packets[sequence]).race_state
+             for sequence in sequences])
+        self.assertEqual(telemetry['participant_info'].shape, (12, 56))
+
+if __name__ == "__main__":
+    unittest.main()
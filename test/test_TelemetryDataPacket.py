@@ -5,7 +5,6 @@ from unittest.mock import patch
 import unittest
 from struct import pack
 from hashlib import md5
-from collections import deque
 
 from replayenhancer.TelemetryDataPacket \
     import ParticipantInfo, TelemetryDataPacket
@@ -809,6 +808,38 @@ class TestTelemetryDataPacket(unittest.TestCase):
         expected_result = TelemetryDataPacket
         self.assertIsInstance(instance, expected_result)
 
+    def test_init_memoryview(self):
+        binary_data = self.binary_data()
+        instance = TelemetryDataPacket(memoryview(binary_data))
+        self.assertEqual(instance.data_hash, md5(binary_data).hexdigest())
+        self.assertEqual(
+            instance.participant_info[-1].race_position,
+            TelemetryDataPacket(binary_data).participant_info[-1]
+            .race_position)
+
+    def test_init_lazy(self):
+        binary_data = self.binary_data()
+        eager = TelemetryDataPacket(binary_data)
+        lazy = TelemetryDataPacket(binary_data, lazy=True)
+        with self.assertRaises(AttributeError):
+            TelemetryDataPacket.participant_info.__get__(lazy)
+        for field in (
+                'current_time', 'data_hash', 'odometer', 'extents_centre',
+                'air_pressure', 'wind_direction_y', 'track_length',
+                'wings', 'd_pad'):
+            self.assertEqual(getattr(lazy, field), getattr(eager, field))
+        self.assertListEqual(
+            [participant.world_position
+             for participant in lazy.participant_info],
+            [participant.world_position
+             for participant in eager.participant_info])
+        with self.assertRaises(AttributeError):
+            lazy.extra_field = None
+
+    def test_init_lazy_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            TelemetryDataPacket(self.binary_data(), lazy=True).missing
+
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_init_wrong_packet_length(self, _):
         test_binary_data = pack("H", 42)
@@ -1279,13 +1310,13 @@ class TestTelemetryDataPacket(unittest.TestCase):
     def test_property_tyre_flags(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_flags
-        self.assertListEqual(instance.tyre_flags, expected_result)
+        self.assertTupleEqual(instance.tyre_flags, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_terrain(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_terrain
-        self.assertListEqual(instance.terrain, expected_result)
+        self.assertTupleEqual(instance.terrain, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_y(self, _):
@@ -1312,13 +1343,13 @@ class TestTelemetryDataPacket(unittest.TestCase):
     def test_property_tyre_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_temp
-        self.assertListEqual(instance.tyre_temp, expected_result)
+        self.assertTupleEqual(instance.tyre_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_grip(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_grip
-        self.assertListEqual(instance.tyre_grip, expected_result)
+        self.assertTupleEqual(instance.tyre_grip, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_height_above_ground(self, _):
@@ -1342,55 +1373,55 @@ class TestTelemetryDataPacket(unittest.TestCase):
     def test_property_tyre_wear(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_wear
-        self.assertListEqual(instance.tyre_wear, expected_result)
+        self.assertTupleEqual(instance.tyre_wear, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_brake_damage(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_brake_damage
-        self.assertListEqual(instance.brake_damage, expected_result)
+        self.assertTupleEqual(instance.brake_damage, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_suspension_damage(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_suspension_damage
-        self.assertListEqual(instance.suspension_damage, expected_result)
+        self.assertTupleEqual(instance.suspension_damage, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_brake_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_brake_temp
-        self.assertListEqual(instance.brake_temp, expected_result)
+        self.assertTupleEqual(instance.brake_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_tread_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_tread_temp
-        self.assertListEqual(instance.tyre_tread_temp, expected_result)
+        self.assertTupleEqual(instance.tyre_tread_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_layer_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_layer_temp
-        self.assertListEqual(instance.tyre_layer_temp, expected_result)
+        self.assertTupleEqual(instance.tyre_layer_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_carcass_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_carcass_temp
-        self.assertListEqual(instance.tyre_carcass_temp, expected_result)
+        self.assertTupleEqual(instance.tyre_carcass_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_rim_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_rim_temp
-        self.assertListEqual(instance.tyre_rim_temp, expected_result)
+        self.assertTupleEqual(instance.tyre_rim_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_tyre_internal_air_temp(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_tyre_internal_air_temp
-        self.assertListEqual(instance.tyre_internal_air_temp, expected_result)
+        self.assertTupleEqual(instance.tyre_internal_air_temp, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_wheel_local_position_y(self, _):
@@ -1432,7 +1463,7 @@ class TestTelemetryDataPacket(unittest.TestCase):
     def test_property_air_pressure(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_air_pressure
-        self.assertListEqual(instance.air_pressure, expected_result)
+        self.assertTupleEqual(instance.air_pressure, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_engine_speed(self, _):
@@ -1500,38 +1531,23 @@ class TestTelemetryDataPacket(unittest.TestCase):
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
     def test_property_participant_info(self, _):
         instance = TelemetryDataPacket(self.binary_data())
-        expected_result = list
+        expected_result = tuple
         self.assertIsInstance(instance.participant_info, expected_result)
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
-    def test_property_track_length(self, mock_participant_info):
-        def remove_participant_info_data(*args):
-            for _ in range(9):
-                args[0].popleft()
-        mock_participant_info.side_effect = remove_participant_info_data
-
+    def test_property_track_length(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_track_length
         self.assertAlmostEqual(instance.track_length, expected_result, delta=0.001)
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
-    def test_property_wings(self, mock_participant_info):
-        def remove_participant_info_data(*args):
-            for _ in range(9):
-                args[0].popleft()
-        mock_participant_info.side_effect = remove_participant_info_data
-
+    def test_property_wings(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_wings
-        self.assertListEqual(instance.wings, expected_result)
+        self.assertTupleEqual(instance.wings, tuple(expected_result))
 
     @patch('replayenhancer.TelemetryDataPacket.ParticipantInfo', autospec=True)
-    def test_property_d_pad(self, mock_participant_info):
-        def remove_participant_info_data(*args):
-            for _ in range(9):
-                args[0].popleft()
-        mock_participant_info.side_effect = remove_participant_info_data
-
+    def test_property_d_pad(self, _):
         instance = TelemetryDataPacket(self.binary_data())
         expected_result = self.expected_d_pad
         self.assertEqual(instance.d_pad, expected_result)
@@ -1624,7 +1640,7 @@ class TestParticipantInfo(unittest.TestCase):
         except KeyError:
             test_data.append(cls.expected_last_sector_time)
 
-        return deque(tuple(test_data))
+        return tuple(test_data)
 
     def test_init(self):
         instance = ParticipantInfo(self.binary_data())
@@ -1687,4 +1703,4 @@ class TestParticipantInfo(unittest.TestCase):
     def test_property_world_position(self):
         instance = ParticipantInfo(self.binary_data())
         expected_result = self.expected_world_position
-        self.assertListEqual(instance.world_position, expected_result)
+        self.assertTupleEqual(instance.world_position, tuple(expected_result))
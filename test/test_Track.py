@@ -37,6 +37,15 @@ class TestTrack(unittest.TestCase):
             expected_result = Track
             self.assertIsInstance(instance, expected_result)
 
+    def test_init_track(self):
+        with patch('replayenhancer.Track.open', mock_open()) as mock_file:
+            instance = Track(
+                42.0,
+                track=self.track_data["Test Track:Short"])
+        mock_file.assert_not_called()
+        self.assertEqual(instance.track_length, 42.0)
+        self.assertTrue(instance.at_pit_entry([0, -99, 0]))
+
     @unittest.skipIf(sys.version_info >= (3, 5), "Not supported.")
     def test_init_pre35(self):
         with patch('builtins.open', mock_open()), \
@@ -0,0 +1,89 @@
+"""
+Tests TrackRegistry.py.
+"""
+import os
+import tempfile
+import unittest
+
+from replayenhancer.Track import Track
+from replayenhancer.TrackRegistry import TrackRegistry, track_registry
+
+
+class TestTrackRegistry(unittest.TestCase):
+    """
+    Tests against the TrackRegistry object.
+    """
+    track_data = [
+        {
+            "display_name": "Test Track Short",
+            "length": 42.0,
+            "pit_entry": [0, 0],
+            "pit_exit": [100, 100],
+            "pit_radius": 2
+        },
+        {
+            "display_name": "Test Track Kart",
+            "length": 15.0
+        },
+        {
+            "display_name": "Test Track Long",
+            "length": 69.0
+        },
+        {
+            "display_name": "Test Track Short Reverse",
+            "length": 42.0
+        }
+    ]
+
+    def setUp(self):
+        self.instance = TrackRegistry(self.track_data)
+
+    def test_init(self):
+        self.assertEqual(len(self.instance), 3)
+
+    def test_method_match(self):
+        for track_length, expected_result in [
+                (42.0, "Test Track Short"),
+                (40.0, "Test Track Short"),
+                (56.0, "Test Track Long"),
+                (0.0, "Test Track Kart"),
+                (1000.0, "Test Track Long")]:
+            with self.subTest(track_length=track_length):
+                self.assertEqual(
+                    self.instance.match(track_length)['display_name'],
+                    expected_result)
+
+    def test_method_match_equally_near(self):
+        self.assertEqual(
+            self.instance.match(28.5)['display_name'],
+            "Test Track Short")
+        self.assertEqual(
+            self.instance.match(55.5)['display_name'],
+            "Test Track Short")
+
+    def test_method_match_empty(self):
+        self.assertIsNone(TrackRegistry(()).match(42.0))
+
+    def test_method_track(self):
+        track = self.instance.track(42.0)
+        self.assertIsInstance(track, Track)
+        self.assertTrue(track.at_pit_entry([0, -99, 0]))
+        self.assertIs(self.instance.track(42.0), track)
+        self.assertFalse(self.instance.track(15.0).at_pit_entry([0, -99, 0]))
+
+    def test_method_track_empty(self):
+        track = TrackRegistry(()).track(42.0)
+        self.assertFalse(track.at_pit_entry([0, -99, 0]))
+
+    def test_method_load_missing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            instance = TrackRegistry.load(
+                os.path.join(directory, 'track_data.json'))
+        self.assertEqual(len(instance), 0)
+
+    def test_track_registry(self):
+        self.assertIs(track_registry(), track_registry())
+        self.assertGreater(len(track_registry()), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests capturearchive script.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from replayenhancer.CaptureArchive import CAPTURE_ARCHIVE_FILENAME
+from replayenhancer.CaptureLog import CAPTURE_LOG_FILENAME, \
+    CaptureLogReader
+from replayenhancer.capturearchive import main as capturearchive
+from replayenhancer.PacketSource import PacketArchive, packet_source
+
+
+@patch('replayenhancer.capturearchive.print')
+class Testcapturearchive(unittest.TestCase):
+    """
+    Tests capturearchive script.
+    """
+    packets = [bytes([value]) * (1367, 1347, 1028)[value % 3]
+               for value in range(10)]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.capture = os.path.join(self.directory.name, 'packetdata-1')
+        os.makedirs(self.capture)
+        for index, packet in enumerate(self.packets):
+            with open(os.path.join(
+                    self.capture,
+                    'pdata{}'.format(index)), 'wb') as packet_file:
+                packet_file.write(packet)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_pack(self, _):
+        capturearchive(['pack', self.capture])
+        source = packet_source(self.capture)
+        self.assertIsInstance(source, PacketArchive)
+        self.assertListEqual(list(source.packets()), self.packets)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.capture,
+            'pdata0')))
+
+    def test_pack_remove(self, _):
+        capturearchive(['pack', '--remove', '-c', 'lzma', self.capture])
+        self.assertListEqual(
+            os.listdir(self.capture),
+            [CAPTURE_ARCHIVE_FILENAME])
+
+    def test_unpack(self, _):
+        capturearchive(['pack', self.capture])
+        destination = os.path.join(self.directory.name, 'unpacked')
+        capturearchive(['unpack', self.capture, destination])
+        self.assertListEqual(
+            list(packet_source(destination).packets()),
+            self.packets)
+
+    def test_unpack_log(self, _):
+        capturearchive(['pack', self.capture])
+        destination = os.path.join(self.directory.name, 'unpacked')
+        capturearchive(['unpack', '--log', self.capture, destination])
+        self.assertListEqual(
+            list(CaptureLogReader(os.path.join(
+                destination,
+                CAPTURE_LOG_FILENAME))),
+            self.packets)
+
+    def test_output_multiple_sources(self, _):
+        with patch('sys.stderr'), self.assertRaises(SystemExit):
+            capturearchive([
+                'pack',
+                '-o', 'capture.archive',
+                self.capture,
+                self.capture])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,16 +18,20 @@ class Testpacketcapture(unittest.TestCase):
     def test(self, mock_socket, mock_os):
         mock_os.path.exists.return_value = False
 
-        mock_data = MagicMock()
+        mock_data = b'Packet data'
+
+        def recv_into(buffer):
+            buffer[:len(mock_data)] = mock_data
+            return len(mock_data)
 
         mock_udp_socket = MagicMock()
-        mock_udp_socket.recvfrom.return_value = (mock_data, None)
+        mock_udp_socket.recv_into.side_effect = recv_into
 
         mock_socket.socket.return_value = mock_udp_socket
 
         m = mock_open()
         with patch('replayenhancer.packetcapture.open', m) as mock_file_open:
-            packetcapture(runonce=True)
+            packetcapture([], runonce=True)
 
             mock_socket.socket.assert_called_once_with(
                 mock_socket.AF_INET,
@@ -43,12 +47,12 @@ class Testpacketcapture(unittest.TestCase):
             self.assertEqual('packetdata', exist_args[0].split('-')[0])
             self.assertEqual('packetdata', make_args[0].split('-')[0])
 
-            mock_udp_socket.recvfrom.called_with(65565)
-
             args, kwargs = mock_file_open.call_args
             self.assertTrue('wb' in args)
             mock_file = m()
-            mock_file.write.assert_called_once_with(mock_data)
+            self.assertEqual(mock_file.write.call_count, 1)
+            args, _ = mock_file.write.call_args
+            self.assertEqual(bytes(args[0]), mock_data)
             mock_file.close.assert_called_once_with()
 
             rm_args, _ = mock_os.rmdir.call_args
@@ -60,16 +64,20 @@ class Testpacketcapture(unittest.TestCase):
     def test_pre35(self, mock_socket, mock_os):
         mock_os.path.exists.return_value = False
 
-        mock_data = MagicMock()
+        mock_data = b'Packet data'
+
+        def recv_into(buffer):
+            buffer[:len(mock_data)] = mock_data
+            return len(mock_data)
 
         mock_udp_socket = MagicMock()
-        mock_udp_socket.recvfrom.return_value = (mock_data, None)
+        mock_udp_socket.recv_into.side_effect = recv_into
 
         mock_socket.socket.return_value = mock_udp_socket
 
         m = mock_open()
         with patch('builtins.open', m) as mock_file_open:
-            packetcapture(runonce=True)
+            packetcapture([], runonce=True)
 
             mock_socket.socket.assert_called_once_with(
                 mock_socket.AF_INET,
@@ -85,16 +93,66 @@ class Testpacketcapture(unittest.TestCase):
             self.assertEqual('packetdata', exist_args[0].split('-')[0])
             self.assertEqual('packetdata', make_args[0].split('-')[0])
 
-            mock_udp_socket.recvfrom.called_with(65565)
-
             args, kwargs = mock_file_open.call_args
             self.assertTrue('wb' in args)
             mock_file = m()
-            mock_file.write.assert_called_once_with(mock_data)
+            self.assertEqual(mock_file.write.call_count, 1)
+            args, _ = mock_file.write.call_args
+            self.assertEqual(bytes(args[0]), mock_data)
             mock_file.close.assert_called_once_with()
 
             rm_args, _ = mock_os.rmdir.call_args
             self.assertEqual('packetdata', rm_args[0].split('-')[0])
 
+    @unittest.skipIf(sys.version_info < (3, 5), "Not supported.")
+    @patch('replayenhancer.packetcapture.CaptureLogWriter', autospec=True)
+    @patch('replayenhancer.packetcapture.os', autospec=True)
+    @patch('replayenhancer.packetcapture.socket', autospec=True)
+    def test_log(self, mock_socket, mock_os, mock_writer):
+        mock_os.path.exists.return_value = False
+
+        mock_data = b'Packet data'
+
+        def recv_into(buffer):
+            buffer[:len(mock_data)] = mock_data
+            return len(mock_data)
+
+        mock_udp_socket = MagicMock()
+        mock_udp_socket.recv_into.side_effect = recv_into
+
+        mock_socket.socket.return_value = mock_udp_socket
+
+        m = mock_open()
+        with patch('replayenhancer.packetcapture.open', m) as mock_file_open:
+            packetcapture(['--log'], runonce=True)
+
+            args, _ = mock_writer.call_args
+            self.assertEqual('capture.log', args[0].split('/')[-1])
+            mock_log = mock_writer.return_value
+            self.assertEqual(mock_log.write.call_count, 1)
+            args, _ = mock_log.write.call_args
+            self.assertEqual(bytes(args[0]), mock_data)
+            mock_log.close.assert_called_once_with()
+            mock_file_open.assert_not_called()
+
+    @unittest.skipIf(sys.version_info < (3, 5), "Not supported.")
+    @patch('replayenhancer.packetcapture.os', autospec=True)
+    @patch('replayenhancer.packetcapture.socket', autospec=True)
+    def test_receive_buffer(self, mock_socket, mock_os):
+        mock_os.path.exists.return_value = False
+
+        mock_udp_socket = MagicMock()
+        mock_udp_socket.recv_into.return_value = 0
+
+        mock_socket.socket.return_value = mock_udp_socket
+
+        with patch('replayenhancer.packetcapture.open', mock_open()):
+            packetcapture(['--receive-buffer', '4194304'], runonce=True)
+
+            mock_udp_socket.setsockopt.assert_any_call(
+                mock_socket.SOL_SOCKET,
+                mock_socket.SO_RCVBUF,
+                4194304)
+
 if __name__ == "__main__":
     unittest.main()
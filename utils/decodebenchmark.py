@@ -0,0 +1,63 @@
+"""
+Measures packet decoding throughput.
+
+Decodes synthetic packets of each type repeatedly and reports packets
+per second. Run from the repository root:
+
+    python -m utils.decodebenchmark [packets]
+"""
+import sys
+import timeit
+
+from replayenhancer.AdditionalParticipantPacket \
+    import AdditionalParticipantPacket
+from replayenhancer.ParticipantPacket import ParticipantPacket
+from replayenhancer.TelemetryArray import decode_telemetry
+from replayenhancer.TelemetryDataPacket import TelemetryDataPacket
+
+
+def synthetic_packet(length, packet_type):
+    """Returns an otherwise empty packet of the given length and type."""
+    packet_data = bytearray(length)
+    packet_data[2] = packet_type
+    return bytes(packet_data)
+
+
+def main(packets=20000):
+    """Prints the decoding throughput of each packet class."""
+    telemetry_data = synthetic_packet(1367, 0)
+    participant_data = synthetic_packet(1347, 1)
+    additional_participant_data = synthetic_packet(1028, 2)
+
+    for name, decode in (
+            ('TelemetryDataPacket',
+             lambda: TelemetryDataPacket(telemetry_data)),
+            ('TelemetryDataPacket (lazy)',
+             lambda: TelemetryDataPacket(telemetry_data, lazy=True)),
+            ('  with participant_info',
+             lambda: TelemetryDataPacket(
+                 telemetry_data,
+                 lazy=True).participant_info),
+            ('ParticipantPacket',
+             lambda: ParticipantPacket(participant_data)),
+            ('AdditionalParticipantPacket',
+             lambda: AdditionalParticipantPacket(
+                 additional_participant_data))):
+        seconds = min(timeit.repeat(decode, number=packets, repeat=3))
+        print("{:<28} {:>10.0f} packets/s {:>8.2f} us/packet".format(
+            name,
+            packets / seconds,
+            seconds / packets * 1e6))
+
+    capture_data = telemetry_data * packets
+    seconds = min(timeit.repeat(
+        lambda: decode_telemetry(capture_data),
+        number=1,
+        repeat=3))
+    print("{:<28} {:>10.0f} packets/s {:>8.2f} us/packet".format(
+        'decode_telemetry (columnar)',
+        packets / seconds,
+        seconds / packets * 1e6))
+
+if __name__ == '__main__':
+    main(*[int(argument) for argument in sys.argv[1:]])
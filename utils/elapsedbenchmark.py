@@ -0,0 +1,66 @@
+"""
+Measures how the time RaceData spends on each packet grows through a
+long race.
+
+Writes a synthetic race of 100 laps, decodes its packets ahead of time
+and reports the time RaceData spends on each packet over the first and
+the last tenth of the race. The elapsed time is kept from the running
+lap totals of the viewed driver, so the two should be about equal. Run
+from the repository root:
+
+    python -m utils.elapsedbenchmark [laps] [cars]
+"""
+import sys
+import tempfile
+from time import perf_counter
+
+from replayenhancer.RaceData import RaceData, TelemetryData
+from utils.racebenchmark import write_race
+
+
+def process(directory, packets):
+    """
+    Returns the seconds a new RaceData takes to process each of the
+    decoded packets.
+    """
+    race_data = RaceData(directory, snapshot_interval=None)
+    race_data.telemetry_data = iter(packets)
+
+    times = list()
+    while True:
+        start = perf_counter()
+        try:
+            race_data.get_data()
+        except StopIteration:
+            break
+        times.append(perf_counter() - start)
+    return times
+
+
+def main(laps=100, drivers=8):
+    """
+    Prints the time RaceData takes per packet at the start and at the
+    end of the race.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_race(directory, drivers, laps)
+
+        # The packets after the first, which RaceData reads on
+        # creation, decoded in advance.
+        packets = [
+            packet for packet in TelemetryData(directory, lazy=False)
+            if packet.packet_type == 0][1:]
+
+        times = min(
+            (process(directory, packets) for _ in range(3)),
+            key=sum)
+        tenth = len(times) // 10
+        first = sum(times[:tenth]) / tenth * 1e6
+        last = sum(times[-tenth:]) / tenth * 1e6
+        print("{} laps {} cars {} packets".format(laps, drivers, len(times)))
+        print("first tenth {:>8.1f} us/packet".format(first))
+        print(" last tenth {:>8.1f} us/packet ({:.2f}x)".format(
+            last, last / first))
+
+if __name__ == '__main__':
+    main(*[int(argument) for argument in sys.argv[1:]])
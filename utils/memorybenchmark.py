@@ -0,0 +1,70 @@
+"""
+Measures the memory held by decoded packets and drivers.
+
+Keeps a number of decoded packets alive, as itertools.tee does in
+RaceData.get_data, and reports the memory allocated per packet. Run
+from the repository root:
+
+    python -m utils.memorybenchmark [packets]
+"""
+import sys
+import tracemalloc
+
+from replayenhancer.ParticipantPacket import ParticipantPacket
+from replayenhancer.RaceData import Driver, SectorTime
+from replayenhancer.TelemetryDataPacket import TelemetryDataPacket
+from utils.decodebenchmark import synthetic_packet
+
+
+def allocated(build, count):
+    """Returns the bytes allocated per object by build, kept alive."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(index) for index in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    return (after - before) / count
+
+
+def accessed(packet, field):
+    """Returns a packet after accessing one of its fields."""
+    getattr(packet, field)
+    return packet
+
+
+def race_driver(_):
+    """Returns a driver with 50 laps of sector times."""
+    driver = Driver(0, "Driver")
+    for lap in range(50):
+        for sector in (1, 2, 3):
+            driver.add_sector_time(SectorTime(30.0 + lap, sector, False))
+    return driver
+
+
+def main(packets=2000):
+    """Prints the memory held per packet and per driver."""
+    telemetry_data = synthetic_packet(1367, 0)
+    participant_data = synthetic_packet(1347, 1)
+
+    for name, build, count in (
+            ('TelemetryDataPacket',
+             lambda _: TelemetryDataPacket(telemetry_data),
+             packets),
+            ('TelemetryDataPacket (lazy)',
+             lambda _: TelemetryDataPacket(telemetry_data, lazy=True),
+             packets),
+            ('  with participant_info',
+             lambda _: accessed(
+                 TelemetryDataPacket(telemetry_data, lazy=True),
+                 'participant_info'),
+             packets),
+            ('ParticipantPacket',
+             lambda _: ParticipantPacket(participant_data),
+             packets),
+            ('Driver (150 sector times)', race_driver, packets // 10)):
+        print("{:<28} {:>10.0f} bytes".format(name, allocated(build, count)))
+
+if __name__ == '__main__':
+    main(*[int(argument) for argument in sys.argv[1:]])
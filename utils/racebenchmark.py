@@ -0,0 +1,69 @@
+"""
+Measures the processing of telemetry packets by RaceData.
+
+Writes a synthetic race for each field size, decodes its packets ahead
+of time and reports the time RaceData spends on each packet, with the
+classification read once per packet as the standings do. Run from the
+repository root:
+
+    python -m utils.racebenchmark [laps]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from replayenhancer.RaceData import RaceData, TelemetryData
+from test.test_RaceData import race_packets
+
+FIELD_SIZES = (32, 56)
+
+
+def write_race(directory, drivers, laps):
+    """Writes the packets of a synthetic race to a capture directory."""
+    for sequence, packet_data in enumerate(
+            race_packets(drivers, laps, interval=0.5)):
+        with open(os.path.join(
+                directory,
+                'pdata{}'.format(sequence)), 'wb') as packet_file:
+            packet_file.write(packet_data)
+
+
+def process(directory, packets):
+    """
+    Returns the seconds a new RaceData takes to process the decoded
+    packets.
+    """
+    race_data = RaceData(directory, snapshot_interval=None)
+    race_data.telemetry_data = iter(packets)
+
+    start = perf_counter()
+    while True:
+        try:
+            race_data.get_data()
+        except StopIteration:
+            break
+        _ = race_data.classification
+    return perf_counter() - start
+
+
+def main(laps=5):
+    """Prints the time RaceData takes per packet for each field size."""
+    for drivers in FIELD_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            write_race(directory, drivers, laps)
+
+            # The packets after the first, which RaceData reads on
+            # creation, decoded in advance.
+            packets = [
+                packet for packet in TelemetryData(directory, lazy=False)
+                if packet.packet_type == 0][1:]
+
+            seconds = min(process(directory, packets) for _ in range(3))
+            print("{:>2} cars {:>8} packets {:>10.1f} us/packet".format(
+                drivers,
+                len(packets),
+                seconds / len(packets) * 1e6))
+
+if __name__ == '__main__':
+    main(*[int(argument) for argument in sys.argv[1:]])